@@ -0,0 +1,68 @@
+"""Check that the simulation core imports within its time budget."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent
+
+# Modules a worker needs, and heavy modules it should never pull in
+core_modules = ["src.playing"]
+heavy_modules = ["pandas", "matplotlib"]
+
+
+def measure_import_time(module: str, repeat: int = 5) -> tuple[float, list[str]]:
+    """Measure how long a module takes to import in a fresh interpreter.
+
+    Args:
+        module (str): Module to import.
+        repeat (int, optional): Number of fresh interpreters to time, the
+                                fastest counts. Defaults to 5.
+
+    Returns:
+        import_ms (float): Cumulative import time of the module in ms.
+        heavy (list): Heavy modules that were imported along with it.
+    """
+    check = (
+        f"import sys, {module}; "
+        f"print(*[m for m in {heavy_modules} if m in sys.modules])"
+    )
+    times = []
+    heavy: list[str] = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", check],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        heavy = result.stdout.split()
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                times.append(int(fields[1]) / 1000)
+    return min(times), heavy
+
+
+def main(budget_ms: float = 200.0) -> None:
+    """Fail if a core module is over budget or imports a heavy module.
+
+    Args:
+        budget_ms (float, optional): Import time budget in ms. Defaults to 200.
+    """
+    failed = False
+    for module in core_modules:
+        import_ms, heavy = measure_import_time(module)
+        print(f"{module}: {import_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        if import_ms > budget_ms:
+            print(f"  over budget by {import_ms - budget_ms:.1f} ms")
+            failed = True
+        if heavy:
+            print(f"  imports {', '.join(heavy)}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(*[float(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,356 @@
+"""Benchmark the hot functions and the games played per second.
+
+Run from the repository root with `python -m benchmarks.throughput`. Results are
+written as JSON and compared against a stored baseline, failing when a metric
+got worse by more than the threshold. Baselines depend on the machine, so none
+is committed: store or refresh one with `--save-baseline` on a quiet machine
+before comparing, after a deliberate change in speed too.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src import batch
+from src.counting import CountingStrategy, hi_lo, illustrious_18
+from src.game_logic import create_deck, draw_card, should_draw
+from src.hand import Hand
+from src.playing import play_multiple_decks, play_single_game
+from src.session import SimulationSession
+from src.stats import SimulationStats
+
+root = Path(__file__).resolve().parent.parent
+default_baseline = root / "benchmarks" / "baseline.json"
+
+n_players = 4
+n_decks = 8
+games_pr_deck = 40
+ceartainty = 0.85
+batch_tables = 1024
+bet_spread: dict[float, float] = {2: 2, 3: 4, 4: 8}
+
+
+def _shoe_deal() -> tuple[Callable[[], Any], int]:
+    """Deal single cards, shuffling when the cut card is reached."""
+    shoe = create_deck(n_decks, seed=0)
+
+    def run() -> None:
+        if shoe.needs_shuffle:
+            shoe.shuffle()
+        shoe.deal()
+
+    return run, 1
+
+
+def _draw_card() -> tuple[Callable[[], Any], int]:
+    """Draw the two starting cards of a hand."""
+    shoe = create_deck(n_decks, seed=0)
+
+    def run() -> None:
+        if shoe.needs_shuffle:
+            shoe.shuffle()
+        draw_card(shoe, Hand(), 2)
+
+    return run, 1
+
+
+def _hand_add() -> tuple[Callable[[], Any], int]:
+    """Add three cards, including an ace, to a new hand."""
+
+    def run() -> None:
+        hand = Hand()
+        hand.add(9)
+        hand.add(0)
+        hand.add(5)
+
+    return run, 3
+
+
+def _should_draw() -> tuple[Callable[[], Any], int]:
+    """Decide whether a hard 14 should draw, which counts the shoe."""
+    shoe = create_deck(n_decks, seed=0)
+    hand = Hand()
+    hand.add(9)
+    hand.add(3)
+
+    def run() -> None:
+        should_draw(hand, shoe, False, ceartainty)
+
+    return run, 1
+
+
+def _play_game() -> tuple[Callable[[], Any], int]:
+    """Play a game at a table with the scalar engine."""
+    shoe = create_deck(n_decks, seed=0)
+
+    def run() -> None:
+        play_single_game(n_players, n_decks, shoe, True, ceartainty)
+
+    return run, 1
+
+
+def _play_game_bets() -> tuple[Callable[[], Any], int]:
+    """Play a game with a Hi-Lo bet spread and no index plays."""
+    shoe = create_deck(n_decks, seed=0, counting=hi_lo)
+    counting = CountingStrategy(hi_lo, bet_spread)
+
+    def run() -> None:
+        play_single_game(n_players, n_decks, shoe, True, ceartainty, None, counting)
+
+    return run, 1
+
+
+def _play_game_counting() -> tuple[Callable[[], Any], int]:
+    """Play a game with a Hi-Lo bet spread and index plays."""
+    shoe = create_deck(n_decks, seed=0, counting=hi_lo)
+    counting = CountingStrategy(hi_lo, bet_spread, illustrious_18)
+
+    def run() -> None:
+        play_single_game(n_players, n_decks, shoe, True, ceartainty, None, counting)
+
+    return run, 1
+
+
+def _batch_play_game() -> tuple[Callable[[], Any], int]:
+    """Play a game at every table of a batch, timed per table."""
+    shoe = batch.BatchShoe(batch_tables, n_decks, rng=np.random.default_rng(0))
+
+    def run() -> None:
+        batch.play_game(shoe, n_players, True, ceartainty)
+
+    return run, batch_tables
+
+
+def _batch_play_game_bets() -> tuple[Callable[[], Any], int]:
+    """Play a batch game with a Hi-Lo bet spread and no index plays."""
+    shoe = batch.BatchShoe(
+        batch_tables, n_decks, rng=np.random.default_rng(0), counting=hi_lo
+    )
+    counting = CountingStrategy(hi_lo, bet_spread)
+
+    def run() -> None:
+        batch.play_game(shoe, n_players, True, ceartainty, counting=counting)
+
+    return run, batch_tables
+
+
+def _batch_play_game_counting() -> tuple[Callable[[], Any], int]:
+    """Play a batch game with a Hi-Lo bet spread and index plays."""
+    shoe = batch.BatchShoe(
+        batch_tables, n_decks, rng=np.random.default_rng(0), counting=hi_lo
+    )
+    counting = CountingStrategy(hi_lo, bet_spread, illustrious_18)
+
+    def run() -> None:
+        batch.play_game(shoe, n_players, True, ceartainty, counting=counting)
+
+    return run, batch_tables
+
+
+def _stats_update() -> tuple[Callable[[], Any], int]:
+    """Add a block of games to the statistics, timed per game."""
+    rng = np.random.default_rng(0)
+    game_scores = rng.choice([-2.0, -1.0, 0.0, 1.0, 1.5, 2.0], (batch_tables, 4))
+    dealer_hands = rng.choice([0, 17, 18, 19, 20, 21], batch_tables)
+    stats = SimulationStats(n_players)
+
+    def run() -> None:
+        stats.update(game_scores, dealer_hands)
+
+    return run, batch_tables
+
+
+micro_benchmarks = {
+    "Shoe.deal": _shoe_deal,
+    "draw_card": _draw_card,
+    "Hand.add": _hand_add,
+    "should_draw": _should_draw,
+    "game_logic.play_game": _play_game,
+    "game_logic.play_game/hi_lo_bets": _play_game_bets,
+    "game_logic.play_game/hi_lo": _play_game_counting,
+    "batch.play_game": _batch_play_game,
+    "batch.play_game/hi_lo_bets": _batch_play_game_bets,
+    "batch.play_game/hi_lo": _batch_play_game_counting,
+    "SimulationStats.update": _stats_update,
+}
+
+
+def time_micro(name: str, repeat: int = 5) -> float:
+    """Time one micro benchmark.
+
+    Args:
+        name (str): Name of the benchmark in micro_benchmarks.
+        repeat (int, optional): Number of timings, the fastest counts.
+                                Defaults to 5.
+
+    Returns:
+        float: Time of each unit of work in ns.
+    """
+    run, units = micro_benchmarks[name]()
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / (number * units) * 1e9
+
+
+def core_counts() -> list[int]:
+    """Get the numbers of workers to measure throughput with.
+
+    Returns:
+        list: 1, half and all of the cores, without duplicates.
+    """
+    n_cores = os.cpu_count() or 1
+    return sorted({1, max(n_cores // 2, 1), n_cores})
+
+
+def time_throughput(engine: str, n_workers: int, n_games: int) -> float:
+    """Measure how many hands a run plays each second.
+
+    The workers are started and warmed up before the timed run.
+
+    Args:
+        engine (str): Engine to play with.
+        n_workers (int): Number of worker processes, 1 to play serially.
+        n_games (int): Number of games in the timed run.
+
+    Returns:
+        float: Hands played each second, one hand for each player in a game.
+    """
+    executor = "serial" if n_workers == 1 else "process"
+    with SimulationSession(executor=executor, processes=n_workers) as session:
+        play_multiple_decks(
+            n_players,
+            n_decks,
+            n_games // 10,
+            True,
+            games_pr_deck,
+            ceartainty,
+            engine=engine,
+            session=session,
+            seed=1,
+        )
+        start = time.perf_counter()
+        play_multiple_decks(
+            n_players,
+            n_decks,
+            n_games,
+            True,
+            games_pr_deck,
+            ceartainty,
+            engine=engine,
+            session=session,
+            seed=0,
+        )
+        elapsed = time.perf_counter() - start
+    return n_games * n_players / elapsed
+
+
+def run_benchmarks(scale: float = 1.0) -> dict[str, Any]:
+    """Run every benchmark.
+
+    Args:
+        scale (float, optional): Factor on the number of games of the
+                                 throughput runs. Defaults to 1.0.
+
+    Returns:
+        results (dict): Machine details and every metric with its unit and
+                        whether higher values are better.
+    """
+    metrics: dict[str, dict[str, Any]] = {}
+    for name in micro_benchmarks:
+        metrics[f"micro/{name}"] = {
+            "value": time_micro(name),
+            "unit": "ns",
+            "higher_is_better": False,
+        }
+        print(f"micro/{name}: {metrics[f'micro/{name}']['value']:.0f} ns")
+    for engine, n_games in (("scalar", 20_000), ("batch", 400_000)):
+        for n_workers in core_counts():
+            name = f"throughput/{engine}/{n_workers}_cores"
+            metrics[name] = {
+                "value": time_throughput(engine, n_workers, int(n_games * scale)),
+                "unit": "hands/s",
+                "higher_is_better": True,
+            }
+            print(f"{name}: {metrics[name]['value']:.0f} hands/s")
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.1
+) -> list[str]:
+    """Find the metrics that got worse than the baseline.
+
+    Args:
+        results (dict): Results of run_benchmarks.
+        baseline (dict): Earlier results of run_benchmarks.
+        threshold (float, optional): Largest relative change for the worse that
+                                     is not a regression. Defaults to 0.1.
+
+    Returns:
+        regressions (list): Names of the metrics that regressed.
+    """
+    regressions = []
+    for name, metric in results["metrics"].items():
+        if name not in baseline["metrics"]:
+            continue
+        base = baseline["metrics"][name]["value"]
+        change = metric["value"] / base - 1
+        worse = -change if metric["higher_is_better"] else change
+        status = "REGRESSION" if worse > threshold else "ok"
+        print(f"{name}: {base:.0f} -> {metric['value']:.0f} ({change:+.1%}) {status}")
+        if worse > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, save them and compare them to the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="file to write results to")
+    parser.add_argument("--baseline", type=Path, default=default_baseline)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store results as baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed relative slowdown"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="factor on games in throughput"
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scale)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        return
+    if not args.baseline.exists():
+        sys.exit(
+            f"No baseline at {args.baseline}, store one with --save-baseline first"
+        )
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
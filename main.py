@@ -1,9 +1,17 @@
 """Main script to run everything from."""
 
+from pathlib import Path
+
 import numpy as np
 
-from src.playing import play_multiple_decks
-from src.visualization.plotting import plot_score_vs_ceartainty, plot_score_vs_dealer
+from src.playing import (
+    optimize_ceartainty,
+    play_cached,
+    play_multiple_decks,
+    play_until_precise,
+    sweep_ceartainty,
+)
+from src.session import SimulationSession
 
 
 def main(
@@ -13,6 +21,12 @@ def main(
     use_split: bool = True,
     games_pr_deck: int = 40,
     ceartainty: float = 0.85,
+    seed: int | None = None,
+    checkpoint_dir: str | None = None,
+    resume: bool = False,
+    cache_dir: str | None = None,
+    target_se: float | None = None,
+    optimize: bool = False,
 ) -> None:
     """Runthe main blackjack loop.
 
@@ -23,27 +37,107 @@ def main(
         use_split (bool, optional): Should split be used. Defaults to True.
         games_pr_deck (int, optional): Number of games for each deck. Defaults to 40.
         ceartainty (float, optional): When should a card be drawn. Defaults to 0.85.
+        seed (int, optional): Seed of the shoes. Defaults to None.
+        checkpoint_dir (str, optional): Folder for progress. Defaults to None.
+        resume (bool, optional): Continue from saved progress. Defaults to False.
+        cache_dir (str, optional): Folder of cached results. Defaults to None.
+        target_se (float, optional): Play until the standard error of every
+            player is this small, with n_games as the most games. Defaults to None.
+        optimize (bool, optional): Race the ceartainties for the best one of each
+            player instead of playing n_games for all of them. Defaults to False.
     """
-    all_game_scores, all_dealer_hands = play_multiple_decks(
-        n_players, n_decks, n_games, use_split, games_pr_deck, ceartainty
+    # Plotting pulls in matplotlib, so it is only imported when used
+    from src.visualization.plotting import (
+        plot_score_vs_ceartainty,
+        plot_score_vs_dealer,
     )
 
-    plot_score_vs_dealer(all_game_scores, all_dealer_hands, use_split)
+    checkpoint = Path(checkpoint_dir) / "main.npz" if checkpoint_dir else None
+    try:
+        with SimulationSession() as session:
+            if target_se is not None:
+                *_, stats = play_until_precise(
+                    n_players,
+                    n_decks,
+                    use_split,
+                    games_pr_deck,
+                    ceartainty,
+                    target_se=target_se,
+                    max_games=n_games,
+                    session=session,
+                    seed=seed,
+                    cache_dir=cache_dir,
+                )
+            elif cache_dir is not None:
+                stats = play_cached(
+                    n_players,
+                    n_decks,
+                    n_games,
+                    use_split,
+                    games_pr_deck,
+                    ceartainty,
+                    session=session,
+                    seed=seed,
+                    cache_dir=cache_dir,
+                )
+            else:
+                stats = play_multiple_decks(
+                    n_players,
+                    n_decks,
+                    n_games,
+                    use_split,
+                    games_pr_deck,
+                    ceartainty,
+                    session=session,
+                    seed=seed,
+                    checkpoint=checkpoint,
+                    resume=resume,
+                )
 
-    ceartainty_results = []
+            plot_score_vs_dealer(stats, use_split)
 
-    for ceartainty in np.arange(0, 1.05, 0.05):
-        # Call play_multiple_decks with current ceartainty value
-        all_game_scores, all_dealer_hands = play_multiple_decks(
-            n_players, n_decks, n_games, use_split, games_pr_deck, ceartainty
-        )
+            if optimize:
+                best, mean, interval, _ = optimize_ceartainty(
+                    n_players,
+                    n_decks,
+                    use_split,
+                    games_pr_deck,
+                    np.arange(0, 1.05, 0.05),
+                    max_games=n_games,
+                    session=session,
+                    seed=seed,
+                )
+                for player in range(n_players):
+                    print(
+                        f"Player {player + 1}: ceartainty {best[player]:.2f}, "
+                        f"average score {mean[player]:.4f} "
+                        f"[{interval[player, 0]:.4f}, {interval[player, 1]:.4f}]"
+                    )
+                return
 
-        # Append results to all_results
-        ceartainty_results.append(
-            (ceartainty, sum(all_game_scores) / n_games)  # type: ignore
-        )
+            # Every ceartainty plays the same shoes, so the curve compares decisions
+            ceartainty_results = sweep_ceartainty(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                np.arange(0, 1.05, 0.05),
+                seed=seed,
+                session=session,
+                checkpoint_dir=checkpoint_dir,
+                resume=resume,
+                cache_dir=cache_dir,
+            )
+    except KeyboardInterrupt:
+        if checkpoint_dir is not None:
+            print(
+                f"Interrupted, the progress is saved in {checkpoint_dir}. "
+                "Run again with resume=True to continue."
+            )
+        raise
 
-    plot_score_vs_ceartainty(ceartainty_results)  # type: ignore
+    plot_score_vs_ceartainty(ceartainty_results)
 
 
 if __name__ == "__main__":
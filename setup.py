@@ -11,7 +11,6 @@ SETUP_REQUIRES = [
 INSTALL_REQUIRES = [
     "matplotlib",
     "numpy",
-    "pandas",
 ]
 
 EXTRAS_REQUIRE = {
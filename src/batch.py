@@ -0,0 +1,849 @@
+"""Vectorized engine that plays many tables in lockstep."""
+
+from typing import Sequence
+
+import numpy as np
+
+from src import history, telemetry
+from src.counting import CountingStrategy, CountingSystem
+from src.hand import card_values
+from src.lookups import (
+    action_double,
+    action_hit,
+    action_split,
+    action_stand,
+    action_surrender,
+    draw_thresholds,
+    outcome_blackjack,
+    pair_states,
+    role_kept,
+    role_split_off,
+    role_unsplit,
+    soft_states,
+)
+from src.rules import Rules, default_rules
+from src.shoe import basic_cards
+from src.stats import SimulationStats
+
+values = np.array(card_values, dtype=np.int16)
+threshold_table = np.zeros(32, dtype=np.int64)
+threshold_table[list(draw_thresholds)] = list(draw_thresholds.values())
+# Shoes are shuffled in blocks, each from its own random generator, so a shoe
+# is dealt the same cards however the tables are split between tasks
+shuffle_block = 256
+
+
+class BatchShoe:
+    """Many independent shoes, shuffled and dealt as one array."""
+
+    def __init__(
+        self,
+        n_shoes: int,
+        n_decks: int,
+        penetration: float = 0.5,
+        rng: np.random.Generator | Sequence[np.random.Generator] | None = None,
+        counting: CountingSystem | None = None,
+    ) -> None:
+        """Fill every shoe and shuffle them.
+
+        Args:
+            n_shoes (int): Number of shoes.
+            n_decks (int): Number of decks in each shoe.
+            penetration (float, optional): Fraction of a shoe dealt before the
+                                           cut card is reached. Defaults to 0.5.
+            rng (np.random.Generator | Sequence, optional): Random generator
+                used for shuffling every shoe, or one generator for each block
+                of shuffle_block shoes. Defaults to a freshly seeded one.
+            counting (CountingSystem, optional): System to keep the running
+                                                 count of every shoe with.
+                                                 Defaults to None.
+        """
+        self.n_decks = n_decks
+        self.counting = counting
+        self.tags = np.array(counting.tags) if counting is not None else None
+        self.initial_count = (
+            counting.initial_count(n_decks) if counting is not None else 0
+        )
+        self.running_count = np.zeros(n_shoes, dtype=np.int64)
+        if rng is None or isinstance(rng, np.random.Generator):
+            self.rngs = [rng if rng is not None else np.random.default_rng()]
+            self.block_size = max(n_shoes, 1)
+        else:
+            self.rngs = list(rng)
+            self.block_size = shuffle_block
+            if len(self.rngs) * shuffle_block < n_shoes:
+                raise ValueError("Need a random generator for every block of shoes")
+        self.size = 52 * n_decks
+        self.cut_card = int(self.size * penetration)
+        self.cards = np.tile(basic_cards, (n_shoes, 4 * n_decks))
+        self.cursor = np.zeros(n_shoes, dtype=np.int64)
+        self.counts = np.zeros((n_shoes, len(basic_cards)), dtype=np.int64)
+        self.shuffle(np.arange(n_shoes))
+
+    def shuffle(self, idx: np.ndarray) -> None:
+        """Shuffle every card back into some of the shoes.
+
+        Args:
+            idx (np.ndarray): Shoes to shuffle.
+        """
+        if telemetry.enabled:
+            telemetry.count(telemetry.shuffles, idx.size)
+        blocks = idx // self.block_size
+        for block in np.unique(blocks):
+            shoes = idx[blocks == block]
+            self.cards[shoes] = self.rngs[block].permuted(self.cards[shoes], axis=1)
+        self.cursor[idx] = 0
+        self.counts[idx] = 4 * self.n_decks
+        self.running_count[idx] = self.initial_count
+
+    def deal(self, idx: np.ndarray) -> np.ndarray:
+        """Deal one card from each of some of the shoes.
+
+        Args:
+            idx (np.ndarray): Shoes to deal from, each at most once.
+
+        Returns:
+            cards (np.ndarray): The dealt cards.
+        """
+        dry = idx[self.cursor[idx] >= self.size]
+        if dry.size:
+            self.shuffle(dry)
+        cards: np.ndarray = self.cards[idx, self.cursor[idx]]
+        self.cursor[idx] += 1
+        self.counts[idx, cards] -= 1
+        if self.tags is not None:
+            self.running_count[idx] += self.tags[cards]
+        return cards
+
+    @property
+    def needs_shuffle(self) -> np.ndarray:
+        """np.ndarray: Has the cut card been passed in each shoe."""
+        return self.cursor > self.cut_card
+
+    def true_count(self, idx: np.ndarray) -> np.ndarray:
+        """Get the true count of some of the shoes.
+
+        Args:
+            idx (np.ndarray): Shoes to count in.
+
+        Returns:
+            np.ndarray: Running count per deck left, the running count if the
+                        system is unbalanced.
+        """
+        true_count: np.ndarray
+        if self.counting is None or not self.counting.balanced:
+            true_count = self.running_count[idx].astype(float)
+        else:
+            true_count = (
+                self.running_count[idx] * 52 / np.maximum(self.remaining(idx), 1)
+            )
+        return true_count
+
+    def count_below(self, idx: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+        """Count the cards left in some of the shoes lower than a threshold.
+
+        Args:
+            idx (np.ndarray): Shoes to count in.
+            thresholds (np.ndarray): Value of card for each shoe.
+
+        Returns:
+            np.ndarray: Number of cards lower than threshold.
+        """
+        below = np.arange(len(basic_cards)) < thresholds[:, None]
+        counts: np.ndarray = (self.counts[idx] * below).sum(axis=1)
+        return counts
+
+    def remaining(self, idx: np.ndarray) -> np.ndarray:
+        """Count the cards left in some of the shoes.
+
+        Args:
+            idx (np.ndarray): Shoes to count in.
+
+        Returns:
+            np.ndarray: Number of cards left.
+        """
+        remaining: np.ndarray = self.size - self.cursor[idx]
+        return remaining
+
+
+class BatchHand:
+    """One hand at each of many tables, tracked like Hand."""
+
+    __slots__ = (
+        "hard_total",
+        "has_ace",
+        "n_cards",
+        "first_card",
+        "is_pair",
+        "split_role",
+    )
+
+    def __init__(self, n_tables: int) -> None:
+        """Create an empty hand at every table.
+
+        Args:
+            n_tables (int): Number of tables.
+        """
+        self.hard_total = np.zeros(n_tables, dtype=np.int16)
+        self.has_ace = np.zeros(n_tables, dtype=bool)
+        self.n_cards = np.zeros(n_tables, dtype=np.int8)
+        self.first_card = np.full(n_tables, -1, dtype=np.int8)
+        self.is_pair = np.zeros(n_tables, dtype=bool)
+        self.split_role = np.full(n_tables, role_unsplit, dtype=np.int8)
+
+    def add(self, idx: np.ndarray, cards: np.ndarray) -> None:
+        """Add a card to the hand at some of the tables.
+
+        Args:
+            idx (np.ndarray): Tables receiving a card, each at most once.
+            cards (np.ndarray): The card for each table.
+        """
+        n_cards = self.n_cards[idx]
+        self.is_pair[idx] = (n_cards == 1) & (cards == self.first_card[idx])
+        first = n_cards == 0
+        self.first_card[idx[first]] = cards[first]
+        self.n_cards[idx] = n_cards + 1
+        self.hard_total[idx] += values[cards]
+        self.has_ace[idx] |= cards == 0
+
+    def clear(self, idx: np.ndarray) -> None:
+        """Empty the hand at some of the tables.
+
+        Args:
+            idx (np.ndarray): Tables to clear.
+        """
+        self.hard_total[idx] = 0
+        self.has_ace[idx] = False
+        self.n_cards[idx] = 0
+        self.first_card[idx] = -1
+        self.is_pair[idx] = False
+        self.split_role[idx] = role_unsplit
+
+    @property
+    def is_soft(self) -> np.ndarray:
+        """np.ndarray: Does the hand count an ace as 11."""
+        return self.has_ace & (self.hard_total < 12)
+
+    @property
+    def state(self) -> np.ndarray:
+        """np.ndarray: Row of the decision table for the hands total."""
+        return np.where(
+            self.is_soft,
+            soft_states + self.total,
+            np.minimum(self.hard_total, soft_states - 1),
+        )
+
+    @property
+    def total(self) -> np.ndarray:
+        """np.ndarray: Best value of the hand."""
+        total: np.ndarray = self.hard_total + 10 * self.is_soft
+        return total
+
+    @property
+    def score(self) -> np.ndarray:
+        """np.ndarray: Value of the hand, 0 if it is bust."""
+        total = self.total
+        return np.where(total > 21, 0, total)
+
+    @property
+    def is_blackjack(self) -> np.ndarray:
+        """np.ndarray: Is the hand 21 on its first two cards."""
+        is_blackjack: np.ndarray = (self.total == 21) & (self.n_cards == 2)
+        return is_blackjack
+
+    @property
+    def outcome(self) -> np.ndarray:
+        """np.ndarray: Row of the payout table for the finished hand."""
+        total = self.total
+        return np.where(
+            (total == 21) & (self.n_cards == 2),
+            outcome_blackjack,
+            np.where(total > 21, 0, total),
+        )
+
+
+def should_draw(
+    hand: BatchHand,
+    shoe: BatchShoe,
+    idx: np.ndarray,
+    is_dealer: bool,
+    ceartainty: float,
+    counting: CountingStrategy | None = None,
+    upcard: np.ndarray | None = None,
+    rules: Rules = default_rules,
+) -> np.ndarray:
+    """Decide at which tables a card should be drawn.
+
+    Args:
+        hand (BatchHand): Current hands.
+        shoe (BatchShoe): Current shoes.
+        idx (np.ndarray): Tables to decide for.
+        is_dealer (bool): Is the current player the dealer.
+        ceartainty (float): How safe must a draw be to take a card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the ceartainty.
+                                               Defaults to None.
+        upcard (np.ndarray, optional): Dealers visible card at every table,
+                                       for the index plays. Defaults to None.
+        rules (Rules, optional): Rules the dealer draws by.
+                                 Defaults to default_rules.
+
+    Returns:
+        np.ndarray: Should a card be drawn at each table.
+    """
+    hard_total = hand.hard_total[idx]
+    total = hard_total + 10 * (hand.has_ace[idx] & (hard_total < 12))
+    if is_dealer:
+        dealer_draws: np.ndarray = rules.dealer_draws[
+            np.where(
+                total > hard_total,
+                soft_states + total,
+                np.minimum(hard_total, soft_states - 1),
+            )
+        ]
+        return dealer_draws
+    need = np.clip(21 - hard_total, 0, len(threshold_table) - 1)
+    chance_of_getting_desired_card = shoe.count_below(
+        idx, threshold_table[need]
+    ) / shoe.remaining(idx)
+    draw: np.ndarray = (total <= 17) & (
+        (hard_total < 11) | (chance_of_getting_desired_card > ceartainty)
+    )
+    if counting is not None and upcard is not None:
+        state = np.where(
+            total > hard_total,
+            soft_states + total,
+            np.minimum(hard_total, soft_states - 1),
+        )
+        up = upcard[idx]
+        deviate = (
+            (total <= 17)
+            & (hard_total >= 11)
+            & (counting.index_thresholds[state, up] <= shoe.true_count(idx))
+        )
+        action = counting.index_actions[state, up]
+        draw = np.where(deviate & (action == action_stand), False, draw)
+        draw = np.where(deviate & (action == action_hit), True, draw)
+    return draw
+
+
+def decide(
+    state: np.ndarray,
+    upcard: np.ndarray,
+    counting: CountingStrategy | None = None,
+    true_count: np.ndarray | None = None,
+    rules: Rules = default_rules,
+    split_role: np.ndarray | int = role_unsplit,
+) -> np.ndarray:
+    """Look up the action at every table, taking index plays into account.
+
+    Args:
+        state (np.ndarray): Row of the decision table for the hand at each table.
+        upcard (np.ndarray): Dealers visible card at each table.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (np.ndarray, optional): True count at each table.
+                                           Defaults to None.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+        split_role (np.ndarray | int, optional): Role of the hand in a split at
+                                                 each table.
+                                                 Defaults to role_unsplit.
+
+    Returns:
+        np.ndarray: Action to take at each table.
+    """
+    action: np.ndarray = rules.hand_decisions[split_role, state, upcard]
+    if counting is not None and true_count is not None:
+        deviation = counting.index_actions[state, upcard]
+        action = np.where(
+            (counting.index_thresholds[state, upcard] <= true_count)
+            & rules.allowed_actions[split_role, deviation],
+            deviation,
+            action,
+        )
+    return action
+
+
+def should_double(
+    hand: BatchHand,
+    upcard: np.ndarray,
+    counting: CountingStrategy | None = None,
+    true_count: np.ndarray | None = None,
+    rules: Rules = default_rules,
+) -> np.ndarray:
+    """Determine at which tables the player should double down.
+
+    Args:
+        hand (BatchHand): Current hands.
+        upcard (np.ndarray): Dealers visible card at each table.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (np.ndarray, optional): True count at each table.
+                                           Defaults to None.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+
+    Returns:
+        np.ndarray: Should the player double down at each table.
+    """
+    double: np.ndarray = (
+        decide(hand.state, upcard, counting, true_count, rules, hand.split_role)
+        == action_double
+    )
+    return double
+
+
+def should_split(
+    hand: BatchHand,
+    upcard: np.ndarray,
+    counting: CountingStrategy | None = None,
+    true_count: np.ndarray | None = None,
+    rules: Rules = default_rules,
+) -> np.ndarray:
+    """Determine at which tables the player should split.
+
+    Args:
+        hand (BatchHand): Current hands.
+        upcard (np.ndarray): Dealers visible card at each table.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (np.ndarray, optional): True count at each table.
+                                           Defaults to None.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+
+    Returns:
+        np.ndarray: Should the player split at each table.
+    """
+    split: np.ndarray = hand.is_pair & (
+        decide(
+            pair_states + hand.first_card,
+            upcard,
+            counting,
+            true_count,
+            rules,
+            hand.split_role,
+        )
+        == action_split
+    )
+    return split
+
+
+def should_surrender(
+    hand: BatchHand,
+    upcard: np.ndarray,
+    counting: CountingStrategy | None = None,
+    true_count: np.ndarray | None = None,
+    rules: Rules = default_rules,
+) -> np.ndarray:
+    """Determine at which tables the player should surrender the first two cards.
+
+    The decisions only hold surrenders when the rules allow them, and a pair
+    the player would rather split is not surrendered.
+
+    Args:
+        hand (BatchHand): The first two cards of the hands.
+        upcard (np.ndarray): Dealers visible card at each table.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (np.ndarray, optional): True count at each table.
+                                           Defaults to None.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+
+    Returns:
+        np.ndarray: Should the player surrender at each table.
+    """
+    state = np.where(hand.is_pair, pair_states + hand.first_card, hand.state)
+    surrender: np.ndarray = (
+        decide(state, upcard, counting, true_count, rules) == action_surrender
+    )
+    return surrender
+
+
+def draw_until_bust_or_hold(
+    hand: BatchHand,
+    shoe: BatchShoe,
+    idx: np.ndarray,
+    is_dealer: bool,
+    ceartainty: float,
+    counting: CountingStrategy | None = None,
+    upcard: np.ndarray | None = None,
+    rules: Rules = default_rules,
+) -> None:
+    """Draw cards at some tables until each hand is bust or should hold.
+
+    Args:
+        hand (BatchHand): Current hands.
+        shoe (BatchShoe): Current shoes.
+        idx (np.ndarray): Tables to play.
+        is_dealer (bool): Is the current player the dealer.
+        ceartainty (float): How safe must a draw be to take a card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the ceartainty.
+                                               Defaults to None.
+        upcard (np.ndarray, optional): Dealers visible card at every table,
+                                       for the index plays. Defaults to None.
+        rules (Rules, optional): Rules the dealer draws by.
+                                 Defaults to default_rules.
+    """
+    while idx.size:
+        idx = idx[
+            should_draw(hand, shoe, idx, is_dealer, ceartainty, counting, upcard, rules)
+        ]
+        if idx.size:
+            hand.add(idx, shoe.deal(idx))
+
+
+def check_outcome(
+    dealers_hand: BatchHand, hand: BatchHand, rules: Rules = default_rules
+) -> np.ndarray:
+    """Calculate the outcome of a hand at every table.
+
+    Args:
+        dealers_hand (BatchHand): Dealers hands.
+        hand (BatchHand): Player hands.
+        rules (Rules, optional): Rules the hands are paid by.
+                                 Defaults to default_rules.
+
+    Returns:
+        outcomes (np.ndarray): Outcome of the hand at each table.
+    """
+    outcomes: np.ndarray = rules.outcomes[
+        hand.split_role, hand.outcome, dealers_hand.outcome
+    ]
+    return outcomes
+
+
+def split_pairs(
+    hands: list[BatchHand],
+    n_hands: np.ndarray,
+    acting: np.ndarray,
+    shoe: BatchShoe,
+    upcard: np.ndarray,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> None:
+    """Split the pairs of one player at every table, as long as the rules allow.
+
+    Hand k of the player at a table is hands[k], and only exists while k is
+    below n_hands at the table. A split pair keeps its place and the hand split
+    off goes to the next free place, both dealt their second card if the rules
+    say so.
+
+    Args:
+        hands (list): Hands of the player, grown as pairs are split.
+        n_hands (np.ndarray): Number of hands of the player at each table,
+                              counted up as pairs are split.
+        acting (np.ndarray): May the player act at each table.
+        shoe (BatchShoe): Current shoes.
+        upcard (np.ndarray): Dealers visible card at each table.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        rules (Rules, optional): Rules that limit the splits and decide when the
+                                 second cards are dealt.
+                                 Defaults to default_rules.
+    """
+    everyone = np.arange(len(n_hands))
+    k = 0
+    while k < len(hands):
+        room = acting & (n_hands > k) & (n_hands <= rules.max_splits)
+        if not room.any():
+            k += 1
+            continue
+        true_count = shoe.true_count(everyone) if counting is not None else None
+        split = everyone[
+            room & should_split(hands[k], upcard, counting, true_count, rules)
+        ]
+        if not split.size:
+            k += 1
+            continue
+        pair_cards = hands[k].first_card[split]
+        places = n_hands[split]
+        n_hands[split] += 1
+        while len(hands) <= places.max():
+            hands.append(BatchHand(len(n_hands)))
+        hands[k].clear(split)
+        hands[k].add(split, pair_cards)
+        hands[k].split_role[split] = role_kept
+        second_cards = []
+        for _ in range(rules.split_cards):
+            hands[k].add(split, shoe.deal(split))
+            second_cards.append(shoe.deal(split))
+        for place in np.unique(places):
+            moved = places == place
+            hands[place].add(split[moved], pair_cards[moved])
+            for cards in second_cards:
+                hands[place].add(split[moved], cards[moved])
+            hands[place].split_role[split[moved]] = role_split_off
+
+
+def play_game(
+    shoe: BatchShoe,
+    n_players: int,
+    use_split: bool,
+    ceartainty: float,
+    records: np.ndarray | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Play one game of blackjack at every table.
+
+    Args:
+        shoe (BatchShoe): One shoe for each table.
+        n_players (int): Number of players.
+        use_split (bool): Should split be used.
+        ceartainty (float): How safe must a draw be to take a card.
+        records (np.ndarray, optional): Records of src.history.history_dtype to
+                                        fill in with the game at each table.
+                                        Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player bets and
+                                               deviates with, counting with the
+                                               system of the shoes.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
+
+    Returns:
+        returns (np.ndarray): The result of the game for all players at all
+                              tables, in units.
+        dealer_score (np.ndarray): Final value of the dealers hand at each
+                                   table, 0 if bust.
+    """
+    timer = telemetry.StageTimer() if telemetry.enabled else None
+    everyone = np.arange(len(shoe.cursor))
+    shoe.shuffle(everyone[shoe.needs_shuffle])
+    bets = counting.bets(shoe.true_count(everyone)) if counting is not None else None
+    # Only index plays need the true count once the bets are placed
+    deviations = counting if counting is not None and counting.deviates else None
+
+    # Dealer draws first card
+    dealers_hand = BatchHand(len(everyone))
+    dealers_hand.add(everyone, shoe.deal(everyone))
+    upcard = dealers_hand.first_card
+    # And the hole card if the dealer peeks, only counted once it is turned over
+    running_count = shoe.running_count.copy()
+    for _ in range(rules.hole_cards):
+        dealers_hand.add(everyone, shoe.deal(everyone))
+    hole_tags = shoe.running_count - running_count
+    shoe.running_count -= hole_tags
+    # The players only act where the dealer did not peek at a blackjack
+    acting = ~dealers_hand.is_blackjack
+
+    multiplyer = np.ones((len(everyone), n_players))
+    surrendered = np.zeros((len(everyone), n_players), dtype=bool)
+    player_hands = []
+    split_hands = []
+    for i in range(n_players):
+        current_hand = BatchHand(len(everyone))
+        current_hand.add(everyone, shoe.deal(everyone))
+        current_hand.add(everyone, shoe.deal(everyone))
+        if timer is not None:
+            timer.lap(telemetry.deal)
+        true_count = shoe.true_count(everyone) if deviations is not None else None
+        surrendered[:, i] = acting & should_surrender(
+            current_hand, upcard, deviations, true_count, rules
+        )
+        playing = acting & ~surrendered[:, i]
+        hands = [current_hand]
+        n_hands = np.ones(len(everyone), dtype=np.int64)
+        if use_split:
+            split_pairs(hands, n_hands, playing, shoe, upcard, deviations, rules)
+        # The hands split off are played before the hand kept in place
+        for k in [*range(1, len(hands)), 0]:
+            hand = hands[k]
+            tables = playing & (n_hands > k)
+            true_count = shoe.true_count(everyone) if deviations is not None else None
+            double = tables & should_double(hand, upcard, deviations, true_count, rules)
+            doubled = everyone[double]
+            hand.add(doubled, shoe.deal(doubled))
+            draw_until_bust_or_hold(
+                hand,
+                shoe,
+                everyone[tables & ~double],
+                False,
+                ceartainty,
+                deviations,
+                upcard,
+                rules,
+            )
+            hand_multiplyer = np.where(double, 2.0, 1.0)
+            if k == 0:
+                multiplyer[:, i] = hand_multiplyer
+            else:
+                split_hands.append((hand, everyone[tables], i, hand_multiplyer))
+        player_hands.append(current_hand)
+        if timer is not None:
+            timer.lap(telemetry.decide)
+
+    shoe.running_count += hole_tags
+    draw_until_bust_or_hold(
+        dealers_hand, shoe, everyone[acting], True, ceartainty, rules=rules
+    )
+    if timer is not None:
+        timer.lap(telemetry.dealer)
+
+    returns = multiplyer * np.stack(
+        [
+            check_outcome(dealers_hand, current_hand, rules)
+            for current_hand in player_hands
+        ],
+        axis=1,
+    )
+    # A surrendered hand gives up half its bet, whatever the dealer has
+    returns[surrendered] = -0.5
+
+    for split_hand, split, i, hand_multiplyer in split_hands:
+        returns[split, i] += (
+            check_outcome(dealers_hand, split_hand, rules) * hand_multiplyer
+        )[split]
+    if bets is not None:
+        returns *= bets[:, None]
+
+    if timer is not None:
+        timer.lap(telemetry.settle)
+        n_splits = sum(split.size for _, split, _, _ in split_hands)
+        telemetry.count(telemetry.games, len(everyone))
+        telemetry.count(telemetry.hands, len(everyone) * n_players + n_splits)
+        telemetry.count(telemetry.splits, n_splits)
+        telemetry.count(
+            telemetry.doubles,
+            int((multiplyer == 2).sum())
+            + sum(
+                int((hand_multiplyer[split] == 2).sum())
+                for _, split, _, hand_multiplyer in split_hands
+            ),
+        )
+
+    if records is not None:
+        actions = np.where(multiplyer == 2, history.doubled, 0).astype(np.uint8)
+        for _, split, i, _ in split_hands:
+            actions[split, i] |= history.split
+        actions[surrendered] |= history.surrendered
+        actions |= history.blackjack * np.stack(
+            [
+                current_hand.is_blackjack
+                & rules.pays_blackjack[current_hand.split_role]
+                for current_hand in player_hands
+            ],
+            axis=1,
+        ).astype(np.uint8)
+        records["upcard"] = upcard
+        records["dealer_total"] = dealers_hand.score
+        records["player_total"] = np.stack(
+            [current_hand.score for current_hand in player_hands], axis=1
+        )
+        records["action"] = actions
+        records["payout"] = returns
+
+    return returns, dealers_hand.score
+
+
+def play_multiple_games(
+    n_players: int,
+    n_decks: int,
+    n_tables: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainty: float,
+    seed: (
+        int
+        | np.random.SeedSequence
+        | Sequence[int | np.random.SeedSequence | None]
+        | None
+    ) = None,
+    n_games: int | None = None,
+    game_scores: np.ndarray | None = None,
+    dealer_hands: np.ndarray | None = None,
+    hand_history: history.HandHistory | None = None,
+    first_game: int = 0,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
+    """Play multiple games of blackjack at many tables in lockstep.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        n_tables (int): Number of tables, each with its own deck.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainty (float): How safe must a draw be to take a card.
+        seed (int | np.random.SeedSequence | Sequence, optional): Seed for
+            shuffling, or a list with a seed for each block of shuffle_block
+            tables. Defaults to None.
+        n_games (int, optional): Total number of games, the last table plays
+                                 whatever is left after the others have played
+                                 games_pr_deck each. Defaults to all tables
+                                 playing games_pr_deck.
+        game_scores (np.ndarray, optional): Array to write the score of every
+                                            game into, game g of table t at row
+                                            t * games_pr_deck + g.
+                                            Defaults to None.
+        dealer_hands (np.ndarray, optional): Array to write the dealers final
+                                             value of every game into, laid out
+                                             like game_scores. Defaults to None.
+        hand_history (HandHistory, optional): Log to write every game into,
+                                              laid out like game_scores from
+                                              row first_game. Defaults to None.
+        first_game (int, optional): Row of the first game in hand_history.
+                                    Defaults to 0.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
+
+    Returns:
+        stats (SimulationStats): Statistics of every game played.
+    """
+    if n_games is None:
+        n_games = n_tables * games_pr_deck
+    games = np.full(n_tables, games_pr_deck)
+    games[-1] = n_games - (n_tables - 1) * games_pr_deck
+
+    if isinstance(seed, Sequence):
+        rng: np.random.Generator | list[np.random.Generator] = [
+            np.random.default_rng(s) for s in seed
+        ]
+    else:
+        rng = np.random.default_rng(seed)
+    shoe = BatchShoe(
+        n_tables,
+        n_decks,
+        penetration=rules.penetration,
+        rng=rng,
+        counting=counting.system if counting is not None else None,
+    )
+    records = None
+    if hand_history is not None:
+        records = np.empty(n_tables, dtype=hand_history.dtype)
+    stats = SimulationStats(n_players)
+    for game in range(games_pr_deck):
+        scores, dealer_scores = play_game(
+            shoe, n_players, use_split, ceartainty, records, counting, rules
+        )
+        counted = games > game
+        if not counted.all():
+            scores, dealer_scores = scores[counted], dealer_scores[counted]
+        stats.update(scores, dealer_scores)
+        rows = np.flatnonzero(counted) * games_pr_deck + game
+        if game_scores is not None:
+            game_scores[rows] = scores
+        if dealer_hands is not None:
+            dealer_hands[rows] = dealer_scores
+        if hand_history is not None and records is not None:
+            hand_history.write(first_game + rows, records[counted])
+        if telemetry.enabled:
+            telemetry.flush()
+    return stats
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,103 @@
+"""Per-game results shared between processes without copying."""
+
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import Any
+
+import numpy as np
+
+score_dtype = np.float32
+dealer_dtype = np.int8
+
+
+class GameBuffer:
+    """Scores and dealer totals of every game in one shared memory block.
+
+    The process that creates the buffer owns it and frees it when closed.
+    Workers receive it pickled, which only sends its name, and write their
+    games straight into it.
+    """
+
+    def __init__(self, n_games: int, n_players: int, name: str | None = None) -> None:
+        """Create a new buffer, or attach to an existing one.
+
+        Args:
+            n_games (int): Number of games.
+            n_players (int): Number of players.
+            name (str, optional): Name of an existing buffer to attach to.
+                                  Defaults to creating a new one.
+        """
+        self.n_games = n_games
+        self.n_players = n_players
+        self._scores_size = n_games * n_players * np.dtype(score_dtype).itemsize
+        size = max(self._scores_size + n_games * np.dtype(dealer_dtype).itemsize, 1)
+        self.owner = name is None
+        self._memory = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=size
+        )
+        self.scores = np.ndarray(
+            (n_games, n_players), dtype=score_dtype, buffer=self._memory.buf
+        )
+        self.dealer_hands = np.ndarray(
+            n_games,
+            dtype=dealer_dtype,
+            buffer=self._memory.buf,
+            offset=self._scores_size,
+        )
+
+    @property
+    def name(self) -> str:
+        """str: Name of the shared memory block."""
+        return self._memory.name
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle the buffer by name only.
+
+        Returns:
+            dict: What is needed to attach to the buffer.
+        """
+        return {"n_games": self.n_games, "n_players": self.n_players, "name": self.name}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attach to the buffer in the receiving process.
+
+        Args:
+            state (dict): What is needed to attach to the buffer.
+        """
+        self.__init__(  # type: ignore[misc]
+            state["n_games"], state["n_players"], name=state["name"]
+        )
+
+    def close(self) -> None:
+        """Detach from the buffer, freeing it if this process owns it."""
+        del self.scores, self.dealer_hands
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+    def __enter__(self) -> "GameBuffer":
+        """Enter the buffer.
+
+        Returns:
+            GameBuffer: The buffer.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Detach from the buffer.
+
+        Args:
+            exc_type (type, optional): Type of a raised exception.
+            exc_value (BaseException, optional): Raised exception.
+            traceback (TracebackType, optional): Traceback of a raised exception.
+        """
+        self.close()
+
+
+if __name__ == "__main__":
+    pass
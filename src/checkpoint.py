@@ -0,0 +1,150 @@
+"""Checkpoints that let an interrupted run continue where it stopped."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.stats import SimulationStats
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Join overlapping and touching ranges of shoes.
+
+    Args:
+        ranges (list): First shoe and shoe to stop before of each range.
+
+    Returns:
+        merged (list): The same shoes in as few ranges as possible, in order.
+    """
+    merged: list[tuple[int, int]] = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(stop, merged[-1][1]))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def remaining_ranges(
+    n_shoes: int, done: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """Find the ranges of shoes that have not been played.
+
+    Args:
+        n_shoes (int): Number of shoes in the run.
+        done (list): Ranges of shoes already played.
+
+    Returns:
+        remaining (list): First shoe and shoe to stop before of each gap.
+    """
+    remaining = []
+    start = 0
+    for done_start, done_stop in merge_ranges(done):
+        if done_start > start:
+            remaining.append((start, done_start))
+        start = max(start, done_stop)
+    if start < n_shoes:
+        remaining.append((start, n_shoes))
+    return remaining
+
+
+def save_checkpoint(
+    path: str | Path,
+    config: dict[str, Any],
+    stats: SimulationStats,
+    done: list[tuple[int, int]],
+) -> None:
+    """Write the progress of a run to disk.
+
+    The file is written next to the old checkpoint and then moved over it, so
+    an interruption while saving leaves the old checkpoint intact.
+
+    Args:
+        path (str | Path): File to write, an .npz archive.
+        config (dict): Settings of the run, including its root seed.
+        stats (SimulationStats): Statistics of the games played so far.
+        done (list): Ranges of shoes played so far.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    arrays = stats.to_arrays()
+    arrays["config"] = np.array(json.dumps(config, sort_keys=True))
+    arrays["done"] = np.array(merge_ranges(done), dtype=np.int64).reshape(-1, 2)
+    with open(temporary, "wb") as file:
+        np.savez_compressed(file, **arrays)  # type: ignore[arg-type]
+    os.replace(temporary, path)
+
+
+def read_checkpoint(
+    path: str | Path,
+) -> tuple[dict[str, Any], SimulationStats, list[tuple[int, int]]] | None:
+    """Read a checkpoint without checking which run wrote it.
+
+    Args:
+        path (str | Path): File written by save_checkpoint.
+
+    Returns:
+        config (dict): Settings of the run that wrote the checkpoint.
+        stats (SimulationStats): Statistics of the games played so far.
+        done (list): Ranges of shoes played so far.
+        Or None if there is no checkpoint.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path) as archive:
+        config = json.loads(str(archive["config"]))
+        done = [(int(start), int(stop)) for start, stop in archive["done"]]
+        stats = SimulationStats.from_arrays(archive)
+    return config, stats, done
+
+
+def load_checkpoint(
+    path: str | Path, config: dict[str, Any]
+) -> tuple[SimulationStats, list[tuple[int, int]]] | None:
+    """Read the progress of a run from disk.
+
+    Args:
+        path (str | Path): File written by save_checkpoint.
+        config (dict): Settings of the run being resumed.
+
+    Raises:
+        ValueError: If the checkpoint was written by a run with other settings.
+
+    Returns:
+        stats (SimulationStats): Statistics of the games played so far.
+        done (list): Ranges of shoes played so far.
+        Or None if there is no checkpoint.
+    """
+    saved = read_checkpoint(path)
+    if saved is None:
+        return None
+    saved_config, stats, done = saved
+    if saved_config != json.loads(json.dumps(config, sort_keys=True)):
+        raise ValueError(f"Checkpoint {path} was written by a run with other settings")
+    return stats, done
+
+
+def checkpoint_seed(path: str | Path) -> int | None:
+    """Get the root seed a checkpointed run was started with.
+
+    Args:
+        path (str | Path): File written by save_checkpoint.
+
+    Returns:
+        int: The root seed, None if there is no checkpoint.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path) as archive:
+        seed: int = json.loads(str(archive["config"]))["seed"]
+    return seed
+
+
+if __name__ == "__main__":
+    pass
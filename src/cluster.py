@@ -0,0 +1,427 @@
+"""Coordinator and workers that play a run across several machines."""
+
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from typing import Any
+
+import numpy as np
+
+from src.counting import CountingStrategy
+from src.playing import plan_chunks, play_shoes
+from src.rules import Rules, default_rules
+from src.stats import SimulationStats
+
+
+class Coordinator:
+    """Hands out ranges of shoes to workers and merges what they send back.
+
+    A range handed to a worker is leased to it. The worker keeps the lease
+    alive with heartbeats, and a range whose lease runs out, because its
+    worker died or lost its connection, is handed out again. Every range
+    deals the same cards whoever plays it, so only the first result for a
+    range is kept.
+    """
+
+    def __init__(
+        self, tasks: list[tuple[Any, ...]], n_players: int, lease_seconds: float = 30.0
+    ) -> None:
+        """Queue the tasks.
+
+        Args:
+            tasks (list): Arguments of play_shoes for every range of shoes.
+            n_players (int): Number of players.
+            lease_seconds (float, optional): Time a worker may go without a
+                                             heartbeat before its ranges are
+                                             handed out again.
+                                             Defaults to 30.0.
+        """
+        self.tasks = tasks
+        self.lease_seconds = lease_seconds
+        self.stats = SimulationStats(n_players)
+        self._queue = list(range(len(tasks)))
+        self._leases: dict[int, tuple[str, float]] = {}
+        self._done: set[int] = set()
+        self._requeued = 0
+        self._lock = threading.Lock()
+
+    def _requeue_expired(self) -> None:
+        """Queue the ranges whose lease has run out again."""
+        now = time.monotonic()
+        for task_id, (_, deadline) in list(self._leases.items()):
+            if deadline < now:
+                del self._leases[task_id]
+                self._queue.insert(0, task_id)
+                self._requeued += 1
+
+    def get_task(self, worker: str) -> tuple[int, tuple[Any, ...]] | None:
+        """Lease the next range of shoes to a worker.
+
+        Args:
+            worker (str): Name of the worker.
+
+        Returns:
+            task (tuple): Id and play_shoes arguments of the range, None if no
+                          range is waiting.
+        """
+        with self._lock:
+            self._requeue_expired()
+            if not self._queue:
+                return None
+            task_id = self._queue.pop(0)
+            self._leases[task_id] = (worker, time.monotonic() + self.lease_seconds)
+            return task_id, self.tasks[task_id]
+
+    def heartbeat(self, worker: str) -> None:
+        """Renew the leases of a worker.
+
+        Args:
+            worker (str): Name of the worker.
+        """
+        with self._lock:
+            deadline = time.monotonic() + self.lease_seconds
+            for task_id, (holder, _) in self._leases.items():
+                if holder == worker:
+                    self._leases[task_id] = (worker, deadline)
+
+    def submit(self, task_id: int, stats: SimulationStats) -> None:
+        """Merge the result of a range.
+
+        Args:
+            task_id (int): Id of the range.
+            stats (SimulationStats): Statistics of the games in the range.
+        """
+        with self._lock:
+            self._leases.pop(task_id, None)
+            if task_id in self._done:
+                return
+            if task_id in self._queue:
+                self._queue.remove(task_id)
+            self._done.add(task_id)
+            self.stats.merge(stats)
+
+    def is_done(self) -> bool:
+        """Check if every range has been played.
+
+        Returns:
+            bool: Has every range been played.
+        """
+        with self._lock:
+            return len(self._done) == len(self.tasks)
+
+    def result(self) -> SimulationStats:
+        """Get the statistics merged so far.
+
+        Returns:
+            stats (SimulationStats): Statistics of every range played.
+        """
+        with self._lock:
+            return self.stats
+
+    def progress(self) -> tuple[int, int, int]:
+        """Count the ranges played, leased and handed out again.
+
+        Returns:
+            done (int): Ranges played.
+            leased (int): Ranges being played.
+            requeued (int): Times a lease ran out.
+        """
+        with self._lock:
+            return len(self._done), len(self._leases), self._requeued
+
+
+class CoordinatorManager(BaseManager):
+    """Manager that connects to a coordinator over TCP."""
+
+
+CoordinatorManager.register("coordinator")
+
+# Coordinator of the run, in the process serving it
+_served: Coordinator | None = None
+
+
+def _serve(tasks: list[tuple[Any, ...]], n_players: int, lease_seconds: float) -> None:
+    """Create the coordinator in the process serving it.
+
+    Args:
+        tasks (list): Arguments of play_shoes for every range of shoes.
+        n_players (int): Number of players.
+        lease_seconds (float): Time a worker may go without a heartbeat before
+                               its ranges are handed out again.
+    """
+    global _served
+    _served = Coordinator(tasks, n_players, lease_seconds)
+
+
+def served_coordinator() -> Coordinator | None:
+    """Get the coordinator of the serving process.
+
+    Returns:
+        Coordinator: The coordinator, None outside of the serving process.
+    """
+    return _served
+
+
+class ServingManager(BaseManager):
+    """Manager that serves a coordinator from a process of its own."""
+
+
+ServingManager.register("coordinator", callable=served_coordinator)
+
+
+def is_loopback(host: str) -> bool:
+    """Check if a host can only be reached from this machine.
+
+    Args:
+        host (str): Host name or address.
+
+    Returns:
+        bool: Does the host resolve to a loopback address.
+    """
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def _connect(address: tuple[str, int], authkey: bytes, timeout: float = 30.0) -> Any:
+    """Connect to a coordinator, waiting for it to start listening.
+
+    Args:
+        address (tuple): Host and port of the coordinator.
+        authkey (bytes): Shared secret of the coordinator.
+        timeout (float, optional): Seconds to keep trying. Defaults to 30.0.
+
+    Returns:
+        Any: Proxy of the coordinator, with the methods of Coordinator.
+    """
+    manager = CoordinatorManager(address=address, authkey=authkey)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+    return manager.coordinator()  # type: ignore[attr-defined]
+
+
+def run_worker(
+    address: tuple[str, int],
+    authkey: bytes,
+    poll_interval: float = 0.5,
+    heartbeat_interval: float = 5.0,
+) -> int:
+    """Play ranges of shoes for a coordinator until its run is done.
+
+    Args:
+        address (tuple): Host and port of the coordinator.
+        authkey (bytes): Shared secret of the coordinator.
+        poll_interval (float, optional): Seconds to wait when no range is
+                                         waiting. Defaults to 0.5.
+        heartbeat_interval (float, optional): Seconds between heartbeats.
+                                              Defaults to 5.0.
+
+    Returns:
+        int: Number of ranges played.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    coordinator = _connect(address, authkey)
+    stop = threading.Event()
+
+    def beat() -> None:
+        # Proxies open a connection for each thread, so this one is its own
+        heartbeat_coordinator = _connect(address, authkey)
+        while not stop.wait(heartbeat_interval):
+            try:
+                heartbeat_coordinator.heartbeat(worker)
+            except (EOFError, OSError):
+                return
+
+    heart = threading.Thread(target=beat, daemon=True)
+    heart.start()
+    played = 0
+    try:
+        while True:
+            task = coordinator.get_task(worker)
+            if task is None:
+                if coordinator.is_done():
+                    break
+                time.sleep(poll_interval)
+                continue
+            task_id, args = task
+            coordinator.submit(task_id, play_shoes(*args))
+            played += 1
+    except (EOFError, OSError):
+        # The coordinator has gone away, so the run is over
+        pass
+    finally:
+        stop.set()
+    return played
+
+
+def play_distributed(
+    n_players: int,
+    n_decks: int,
+    n_games: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainty: float = 0.9,
+    engine: str = "scalar",
+    seed: int | None = None,
+    address: tuple[str, int] = ("127.0.0.1", 0),
+    authkey: bytes | None = None,
+    n_local_workers: int = 0,
+    chunk_size: int | str = "auto",
+    expected_workers: int = 8,
+    lease_seconds: float = 30.0,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
+    """Coordinate a run played by workers on any number of machines.
+
+    The coordinator listens on address. Workers join with run_worker, or
+    `python -m src.cluster HOST PORT --authkey KEY` on another machine, and
+    leave when the run is done. The statistics are the same as those of
+    play_multiple_decks with the seed, however many workers join or die along
+    the way.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        n_games (int): Total number of games.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainty (float, optional): How safe must a draw be to take a card.
+                                      Defaults to 0.9.
+        engine (str, optional): Engine to play with. Defaults to "scalar".
+        seed (int, optional): Root seed every deck is shuffled from.
+                              Defaults to a random one.
+        address (tuple, optional): Host and port to listen on, port 0 picks a
+                                   free one. Defaults to ("127.0.0.1", 0).
+        authkey (bytes, optional): Shared secret workers must present. Defaults
+                                   to a random one, printed for the workers
+                                   to join with when other machines can
+                                   reach the address.
+        n_local_workers (int, optional): Worker processes to start on this
+                                         machine. Defaults to 0.
+        chunk_size (int | str, optional): Number of games in each range, or
+                                          "auto". Defaults to "auto".
+        expected_workers (int, optional): Number of workers the ranges are
+                                          sized for. Defaults to 8.
+        lease_seconds (float, optional): Time a worker may go without a
+                                         heartbeat before its ranges are
+                                         handed out again.
+                                         Defaults to 30.0.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with, scores
+                                               are then in units.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
+
+    Returns:
+        stats (SimulationStats): Statistics of every game played.
+    """
+    if counting is not None:
+        rules.check_bet(counting.max_bet)
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    if authkey is None:
+        authkey = secrets.token_bytes(32)
+        if not is_loopback(address[0]):
+            print(f"Workers join with --authkey {authkey.hex()}")
+    tasks = [
+        (
+            n_players,
+            n_decks,
+            n_games,
+            use_split,
+            games_pr_deck,
+            ceartainty,
+            engine,
+            seed,
+            start,
+            stop,
+            None,
+            None,
+            None,
+            counting,
+            rules,
+        )
+        for start, stop in plan_chunks(
+            n_games,
+            games_pr_deck,
+            max(expected_workers, n_local_workers, 1),
+            engine=engine,
+            chunk_size=chunk_size,
+        )
+    ]
+    manager = ServingManager(address=address, authkey=authkey)
+    manager.start(_serve, (tasks, n_players, lease_seconds))
+    try:
+        coordinator: Any = manager.coordinator()  # type: ignore[attr-defined]
+        workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(manager.address, authkey),
+                kwargs={"heartbeat_interval": lease_seconds / 3},
+                daemon=True,
+            )
+            for _ in range(n_local_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            while not coordinator.is_done():
+                time.sleep(0.1)
+        finally:
+            for worker in workers:
+                worker.join(timeout=lease_seconds)
+                if worker.is_alive():
+                    worker.terminate()
+        stats: SimulationStats = coordinator.result()
+    finally:
+        manager.shutdown()
+    return stats
+
+
+def main() -> None:
+    """Join a coordinator as a worker."""
+    parser = argparse.ArgumentParser(description="Play shoes for a coordinator.")
+    parser.add_argument("host")
+    parser.add_argument("port", type=int)
+    parser.add_argument(
+        "--authkey",
+        default=os.environ.get("BLACKJACK_AUTHKEY"),
+        help="hex key the coordinator printed, or set BLACKJACK_AUTHKEY",
+    )
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    if args.authkey is None:
+        parser.error("the authkey of the coordinator is required")
+    try:
+        authkey = bytes.fromhex(args.authkey)
+    except ValueError:
+        parser.error("the authkey must be hex, as the coordinator printed it")
+    address = (args.host, args.port)
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(address, authkey))
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Card counting systems, bet spreads and index plays."""
+
+from bisect import bisect_right
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+from src.hand import card_values
+from src.lookups import (
+    action_double,
+    action_play,
+    action_split,
+    action_stand,
+    n_states,
+    pair_states,
+    soft_states,
+)
+
+n_ranks = len(card_values)
+# Bets are whole multiples of this many units
+bet_step = 0.5
+
+
+class CountingSystem:
+    """Tag for every card value, added to a running count as cards are dealt.
+
+    The true count of a balanced system is the running count per deck left in
+    the shoe. Unbalanced systems are played on the running count itself, which
+    starts below zero so that it ends the shoe at the pivot instead.
+    """
+
+    def __init__(self, name: str, tags: Mapping[int, int]) -> None:
+        """Create a counting system.
+
+        Args:
+            name (str): Name of the system.
+            tags (Mapping): Tag of each card value, aces are 1 and ten valued
+                            cards 10.
+        """
+        self.name = name
+        self.tags = tuple(tags[card_values[rank]] for rank in range(n_ranks))
+        # Sum of the tags of one deck, 0 for balanced systems
+        self.imbalance = 4 * sum(self.tags)
+
+    @property
+    def balanced(self) -> bool:
+        """bool: Do the tags of a deck add up to zero."""
+        return self.imbalance == 0
+
+    def initial_count(self, n_decks: int) -> int:
+        """Get the running count of a freshly shuffled shoe.
+
+        Args:
+            n_decks (int): Number of decks in the shoe.
+
+        Returns:
+            int: The running count before the first card.
+        """
+        return -self.imbalance * (n_decks - 1)
+
+    def settings(self) -> dict[str, Any]:
+        """Describe the system, ready for json.
+
+        Returns:
+            dict: Name and tag of every rank.
+        """
+        return {"name": self.name, "tags": list(self.tags)}
+
+
+hi_lo = CountingSystem(
+    "Hi-Lo", {1: -1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1}
+)
+ko = CountingSystem(
+    "KO", {1: -1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1, 8: 0, 9: 0, 10: -1}
+)
+omega_ii = CountingSystem(
+    "Omega II", {1: 0, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 1, 8: 0, 9: -1, 10: -2}
+)
+systems = {system.name: system for system in (hi_lo, ko, omega_ii)}
+
+# Hi-Lo deviations from the Illustrious 18, each taken when the true count is
+# at least the index. Insurance is left out, as it is never offered.
+illustrious_18 = (
+    ("hard", 16, 10, 0, action_stand),
+    ("hard", 15, 10, 4, action_stand),
+    ("pair", 10, 5, 5, action_split),
+    ("pair", 10, 6, 4, action_split),
+    ("hard", 10, 10, 4, action_double),
+    ("hard", 12, 3, 2, action_stand),
+    ("hard", 12, 2, 3, action_stand),
+    ("hard", 11, 1, 1, action_double),
+    ("hard", 9, 2, 1, action_double),
+    ("hard", 10, 1, 4, action_double),
+    ("hard", 9, 7, 3, action_double),
+    ("hard", 16, 9, 5, action_stand),
+    ("hard", 13, 2, -1, action_stand),
+    ("hard", 12, 4, 0, action_stand),
+    ("hard", 12, 5, -2, action_stand),
+    ("hard", 12, 6, -1, action_stand),
+    ("hard", 13, 3, -2, action_stand),
+)
+
+
+def ranks_of_value(value: int) -> list[int]:
+    """Get the ranks of a card value.
+
+    Args:
+        value (int): Card value, aces are 1.
+
+    Returns:
+        list: Every rank worth the value.
+    """
+    return [rank for rank in range(n_ranks) if card_values[rank] == value]
+
+
+def compile_index_plays(
+    index_plays: Iterable[tuple[str, int, int, float, int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compile index plays into tables indexed like the decision table.
+
+    Args:
+        index_plays (Iterable): Kind of hand ("hard", "soft" or "pair"), its
+                                total or pair value, the upcard value, the
+                                lowest true count and the action to take.
+
+    Raises:
+        ValueError: If an index play has an unknown kind of hand.
+
+    Returns:
+        thresholds (np.ndarray): Lowest true count of the index play for each
+                                 player state and upcard, inf if there is none.
+        actions (np.ndarray): Action of the index play for each player state
+                              and upcard.
+    """
+    thresholds = np.full((n_states, n_ranks), np.inf)
+    actions = np.full((n_states, n_ranks), action_play, dtype=np.int8)
+    for kind, total, upcard, true_count, action in index_plays:
+        if kind == "hard":
+            rows = [min(total, soft_states - 1)]
+        elif kind == "soft":
+            rows = [soft_states + total]
+        elif kind == "pair":
+            rows = [pair_states + rank for rank in ranks_of_value(total)]
+        else:
+            raise ValueError(f"Unknown kind of hand: {kind}")
+        cells = np.ix_(rows, ranks_of_value(upcard))
+        thresholds[cells] = true_count
+        actions[cells] = action
+    return thresholds, actions
+
+
+class CountingStrategy:
+    """Counting system with the bets and deviations keyed on its true count."""
+
+    def __init__(
+        self,
+        system: CountingSystem,
+        bet_spread: Mapping[float, float] | None = None,
+        index_plays: Iterable[tuple[str, int, int, float, int]] = (),
+    ) -> None:
+        """Create a strategy.
+
+        Args:
+            system (CountingSystem): System to keep the count with.
+            bet_spread (Mapping, optional): Bet in units from each true count
+                                            and up, one unit below the lowest.
+                                            Defaults to always betting one.
+            index_plays (Iterable, optional): Deviations from the decision
+                                              table, see compile_index_plays.
+                                              Defaults to none.
+
+        Raises:
+            ValueError: If a bet is not a positive multiple of half a unit.
+        """
+        self.system = system
+        spread = sorted((bet_spread or {}).items())
+        for _, units in spread:
+            if units <= 0 or units % bet_step:
+                raise ValueError(f"Bets must be positive multiples of {bet_step}")
+        self.bet_counts = [float(true_count) for true_count, _ in spread]
+        self.bet_units = [1.0] + [float(units) for _, units in spread]
+        # Checked against the rules, see Rules.check_bet
+        self.max_bet = max(self.bet_units)
+        self.index_plays = tuple(index_plays)
+        # Without index plays the engines skip the true count and deviations
+        self.deviates = bool(self.index_plays)
+        self.index_thresholds, self.index_actions = compile_index_plays(
+            self.index_plays
+        )
+        # Nested lists are faster to index one item at a time than arrays
+        self._thresholds = self.index_thresholds.tolist()
+        self._actions = self.index_actions.tolist()
+
+    def bet(self, true_count: float) -> float:
+        """Get the bet at a true count.
+
+        Args:
+            true_count (float): True count before the game.
+
+        Returns:
+            float: Bet in units.
+        """
+        return self.bet_units[bisect_right(self.bet_counts, true_count)]
+
+    def bets(self, true_counts: np.ndarray) -> np.ndarray:
+        """Get the bet at each of many true counts.
+
+        Args:
+            true_counts (np.ndarray): True count before the game at each table.
+
+        Returns:
+            np.ndarray: Bet in units at each table.
+        """
+        units: np.ndarray = np.array(self.bet_units)[
+            np.searchsorted(self.bet_counts, true_counts, side="right")
+        ]
+        return units
+
+    def index_count(self, state: int, upcard: int) -> float:
+        """Get the true count the index play for a hand is taken from.
+
+        Args:
+            state (int): Row of the decision table for the hand.
+            upcard (int): Dealers visible card.
+
+        Returns:
+            float: Lowest true count of the index play, inf if there is none.
+        """
+        index_count: float = self._thresholds[state][upcard]
+        return index_count
+
+    def deviation(self, state: int, upcard: int, true_count: float) -> int:
+        """Get the index play for a hand.
+
+        Args:
+            state (int): Row of the decision table for the hand.
+            upcard (int): Dealers visible card.
+            true_count (float): Current true count.
+
+        Returns:
+            int: Action of the index play, action_play if none applies.
+        """
+        if true_count >= self._thresholds[state][upcard]:
+            action: int = self._actions[state][upcard]
+            return action
+        return action_play
+
+    def settings(self) -> dict[str, Any]:
+        """Describe the strategy, ready for json.
+
+        Returns:
+            dict: The system, bet spread and index plays.
+        """
+        return {
+            "system": self.system.settings(),
+            "bet_spread": [
+                list(step) for step in zip(self.bet_counts, self.bet_units[1:])
+            ],
+            "index_plays": [list(play) for play in self.index_plays],
+        }
+
+
+if __name__ == "__main__":
+    pass
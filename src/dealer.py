@@ -0,0 +1,117 @@
+"""Exact probabilities of how the dealers hand ends."""
+
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+
+from src.hand import card_values
+from src.stats import n_dealer_totals
+
+# Cards are grouped by value, all ten valued cards share the last bin
+n_values = 10
+cache_size = 2**18
+
+
+def value_counts(shoe_counts: Iterable[int]) -> tuple[int, ...]:
+    """Group a rank histogram by card value.
+
+    Args:
+        shoe_counts (Iterable): Number of cards of each rank.
+
+    Returns:
+        counts (tuple): Number of cards of each value, aces first.
+    """
+    counts = [0] * n_values
+    for rank, count in enumerate(shoe_counts):
+        counts[card_values[rank] - 1] += int(count)
+    return tuple(counts)
+
+
+@lru_cache(maxsize=cache_size)
+def final_totals(
+    hard_total: int,
+    has_ace: bool,
+    counts: tuple[int, ...],
+    hit_soft_17: bool = False,
+) -> tuple[float, ...]:
+    """Calculate the chance of each final value of a dealers hand.
+
+    The dealer draws until the hand is worth 17 or more, counting an ace as 11
+    whenever it does not bust the hand.
+
+    Args:
+        hard_total (int): Value of the hand counting aces as 1.
+        has_ace (bool): Does the hand hold an ace.
+        counts (tuple): Number of cards of each value left, aces first.
+        hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                      Defaults to False.
+
+    Returns:
+        chances (tuple): Chance of each final value, index 0 is bust.
+    """
+    is_soft = has_ace and hard_total < 12
+    total = hard_total + 10 if is_soft else hard_total
+    chances = [0.0] * n_dealer_totals
+    if total > 21:
+        chances[0] = 1.0
+        return tuple(chances)
+    if total > 17 or (total == 17 and not (hit_soft_17 and is_soft)):
+        chances[total] = 1.0
+        return tuple(chances)
+
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count == 0:
+            continue
+        next_counts = counts[:index] + (count - 1,) + counts[index + 1 :]
+        weight = count / remaining
+        for final, chance in enumerate(
+            final_totals(
+                hard_total + index + 1, has_ace or index == 0, next_counts, hit_soft_17
+            )
+        ):
+            chances[final] += weight * chance
+    return tuple(chances)
+
+
+def dealer_distribution(
+    upcard: int | None, shoe_counts: Iterable[int], hit_soft_17: bool = False
+) -> np.ndarray:
+    """Calculate the chance of each final value of the dealers hand.
+
+    Args:
+        upcard (int, optional): Dealers visible card, None if it has not been
+                                dealt yet.
+        shoe_counts (Iterable): Number of cards of each rank left in the shoe,
+                                not counting the upcard.
+        hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                      Defaults to False.
+
+    Returns:
+        chances (np.ndarray): Chance of each final value, index 0 is bust. Laid
+                              out like SimulationStats.dealer_counts.
+    """
+    counts = value_counts(shoe_counts)
+    if upcard is not None:
+        value = card_values[upcard]
+        return np.array(final_totals(value, value == 1, counts, hit_soft_17))
+
+    chances = np.zeros(n_dealer_totals)
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count:
+            next_counts = counts[:index] + (count - 1,) + counts[index + 1 :]
+            chances += (count / remaining) * np.array(
+                final_totals(index + 1, index == 0, next_counts, hit_soft_17)
+            )
+    return chances
+
+
+def clear_cache() -> None:
+    """Forget every memoized dealer distribution."""
+    final_totals.cache_clear()
+
+
+if __name__ == "__main__":
+    pass
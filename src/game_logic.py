@@ -1,101 +1,128 @@
 """All logic connected to the game."""
 
-import random
-from typing import Any
+from math import inf
 
 import numpy as np
 
+from src import history, telemetry
+from src.counting import CountingStrategy, CountingSystem
+from src.hand import Hand
 from src.lookups import (
-    double_down_table_hard,
-    double_down_table_soft,
-    split_combinations,
+    action_double,
+    action_hit,
+    action_play,
+    action_split,
+    action_stand,
+    action_surrender,
+    draw_thresholds,
+    role_kept,
+    role_split_off,
+    role_unsplit,
 )
-from src.util import calculate_hand_value, count_lower_cards, reverse_lookup
+from src.rules import Rules, default_rules
+from src.shoe import HistogramShoe, Shoe
 
+# From this many decks sampling from the rank histogram is cheaper than
+# shuffling every card of the shoe
+histogram_min_decks = 512
 
-def create_deck(n_decks: int) -> list[int]:
-    """Create a deck to play with.
+
+def create_deck(
+    n_decks: int,
+    penetration: float = 0.5,
+    seed: int | np.random.SeedSequence | None = None,
+    counting: CountingSystem | None = None,
+    histogram: bool | None = None,
+) -> Shoe:
+    """Create a shuffled deck to play with.
 
     Args:
         n_decks (int): Number of decks to mix together
+        penetration (float, optional): Fraction of the deck dealt before it is
+                                       reshuffled. Defaults to 0.5.
+        seed (int | np.random.SeedSequence, optional): Seed for every shuffle of
+                                                       the deck. Defaults to None.
+        counting (CountingSystem, optional): System to keep the running count
+                                             with. Defaults to None.
+        histogram (bool, optional): Sample the cards from a HistogramShoe
+                                    instead of shuffling them. Defaults to
+                                    doing so from histogram_min_decks decks.
 
     Returns:
-        total_deck (list): Ready deck.
+        total_deck (Shoe): Ready deck.
     """
-    basic_cards = list(range(13))
-
-    basic_deck = basic_cards * 4
-
-    total_deck = basic_deck * n_decks
+    if histogram is None:
+        histogram = n_decks >= histogram_min_decks
+    shoe_type = HistogramShoe if histogram else Shoe
+    total_deck = shoe_type(
+        n_decks,
+        penetration=penetration,
+        rng=np.random.default_rng(seed),
+        counting=counting,
+    )
 
     return total_deck
 
 
-def draw_card(
-    current_deck: list[int], hand: list[int], n_cards: int
-) -> tuple[list[int], list[int]]:
+def draw_card(current_deck: Shoe, hand: Hand, n_cards: int) -> tuple[Hand, Shoe]:
     """Draw n cards from the current deck.
 
     Args:
-        current_deck (list): Current deck.
-        hand (list): Current hand.
+        current_deck (Shoe): Current deck.
+        hand (Hand): Current hand.
         n_cards (int): Number of cards to draw.
 
     Returns:
-        hand (list): New hand with drawn cards.
-        current_deck (list): Current deck.
+        hand (Hand): New hand with drawn cards.
+        current_deck (Shoe): Current deck.
     """
-    cards = random.sample(current_deck, k=n_cards)
-    for card in cards:
-        del current_deck[current_deck.index(card)]
-    hand.extend(cards)
+    for _ in range(n_cards):
+        hand.add(current_deck.deal())
     return hand, current_deck
 
 
-def check_if_bust(possible_totals: np.ndarray) -> np.ndarray:
-    """Check if the values of the hand go over 21 and remove them.
-
-    Args:
-        possible_totals (list): Possible values of hand.
-
-    Returns:
-        possible_totals (list): Viable card values.
-    """
-    index = possible_totals > 21
-    possible_totals = possible_totals[index]
-    return possible_totals
-
-
 def should_draw(
-    possible_totals: np.ndarray,
-    deck: list[int],
+    hand: Hand,
+    deck: Shoe,
     is_dealer: bool,
     ceartainty: float,
+    counting: CountingStrategy | None = None,
+    upcard: int = 0,
+    rules: Rules = default_rules,
 ) -> bool:
     """Decide if a card should be drawn.
 
     Args:
-        possible_totals (list): Possible values of current hand.
-        deck (list): Current deck.
+        hand (Hand): Current hand.
+        deck (Shoe): Current deck.
         is_dealer (bool): Is the current player the dealer.
         ceartainty (float): How safe must a draw be to take a card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the ceartainty.
+                                               Defaults to None.
+        upcard (int, optional): Dealers visible card, for the index plays.
+                                Defaults to 0.
+        rules (Rules, optional): Rules the dealer draws by.
+                                 Defaults to default_rules.
 
     Returns:
         bool: Should a card be drawn.
     """
-    if np.any(possible_totals > 16) and is_dealer:
+    if is_dealer:
+        draw: bool = rules.dealer_draws.item(hand.state)
+        return draw
+    elif hand.total > 17:
         return False
-    elif is_dealer:
+    elif hand.hard_total < 11:
         return True
-    elif np.any(possible_totals > 17):
-        return False
-    elif np.any(possible_totals < 11):
-        return True
-    desired_cards = reverse_lookup(21 - possible_totals)
-    desired_cards_in_deck = count_lower_cards(
-        deck,
-        list(desired_cards.values())[0][0],
-    )
+    # The true count is only needed for hands with an index play
+    if counting is not None and counting.index_count(hand.state, upcard) < inf:
+        deviation = counting.deviation(hand.state, upcard, deck.true_count)
+        if deviation == action_stand:
+            return False
+        elif deviation == action_hit:
+            return True
+    desired_cards_in_deck = deck.count_below(draw_thresholds[21 - hand.hard_total])
     chance_of_getting_desired_card = desired_cards_in_deck / len(deck)
     if chance_of_getting_desired_card > ceartainty:
         return True
@@ -103,239 +130,459 @@ def should_draw(
         return False
 
 
-def should_double(current_hand: list[int], dealers_hand_open: list[int]) -> bool:
+def decide(
+    state: int,
+    upcard: int,
+    counting: CountingStrategy | None = None,
+    true_count: float = 0.0,
+    rules: Rules = default_rules,
+    split_role: int = role_unsplit,
+) -> int:
+    """Look up the action for a hand, taking index plays into account.
+
+    Args:
+        state (int): Row of the decision table for the hand.
+        upcard (int): Dealers visible card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (float, optional): Current true count. Defaults to 0.0.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+        split_role (int, optional): Role of the hand in a split.
+                                    Defaults to role_unsplit.
+
+    Returns:
+        int: Action to take.
+    """
+    action: int = rules.hand_decisions.item(split_role, state, upcard)
+    if counting is not None:
+        deviation = counting.deviation(state, upcard, true_count)
+        if deviation != action_play and rules.allowed_actions.item(
+            split_role, deviation
+        ):
+            action = deviation
+    return action
+
+
+def should_double(
+    current_hand: Hand,
+    dealers_hand_open: Hand,
+    counting: CountingStrategy | None = None,
+    true_count: float = 0.0,
+    rules: Rules = default_rules,
+) -> bool:
     """Determine if the player should double down.
 
     Args:
-        current_hand (list): Current hand.
-        dealers_hand_open (list): Dealers visible hand.
+        current_hand (Hand): Current hand.
+        dealers_hand_open (Hand): Dealers visible hand.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (float, optional): Current true count. Defaults to 0.0.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
 
     Returns:
         bool: Should the player double down.
     """
-    possibilities = calculate_hand_value(current_hand)
-    try:
-        if 0 in current_hand:
-            return double_down_table_soft[max(possibilities)][dealers_hand_open[0]]
-        else:
-            return double_down_table_hard[possibilities[0]][dealers_hand_open[0]]
-    except KeyError:
+    upcard = dealers_hand_open.first_card
+    if counting is None:
+        action: int = rules.hand_decisions.item(
+            current_hand.split_role, current_hand.state, upcard
+        )
+        return action == action_double
+    return (
+        decide(
+            current_hand.state,
+            upcard,
+            counting,
+            true_count,
+            rules,
+            current_hand.split_role,
+        )
+        == action_double
+    )
+
+
+def should_split(
+    current_hand: Hand,
+    dealers_hand_open: Hand,
+    counting: CountingStrategy | None = None,
+    true_count: float = 0.0,
+    rules: Rules = default_rules,
+) -> bool:
+    """Determine if the player should split.
+
+    Args:
+        current_hand (Hand): Current hand.
+        dealers_hand_open (Hand): Dealers visible hand.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (float, optional): Current true count. Defaults to 0.0.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+
+    Returns:
+        bool: Should the player split.
+    """
+    if not current_hand.is_pair:
         return False
+    upcard = dealers_hand_open.first_card
+    if counting is None:
+        action: int = rules.hand_decisions.item(
+            current_hand.split_role, current_hand.pair_state, upcard
+        )
+        return action == action_split
+    return (
+        decide(
+            current_hand.pair_state,
+            upcard,
+            counting,
+            true_count,
+            rules,
+            current_hand.split_role,
+        )
+        == action_split
+    )
+
+
+def should_surrender(
+    current_hand: Hand,
+    dealers_hand_open: Hand,
+    counting: CountingStrategy | None = None,
+    true_count: float = 0.0,
+    rules: Rules = default_rules,
+) -> bool:
+    """Determine if the player should surrender the first two cards.
+
+    The decisions only hold surrenders when the rules allow them, and a pair
+    the player would rather split is not surrendered.
+
+    Args:
+        current_hand (Hand): The first two cards of a hand.
+        dealers_hand_open (Hand): Dealers visible hand.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table.
+                                               Defaults to None.
+        true_count (float, optional): Current true count. Defaults to 0.0.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+
+    Returns:
+        bool: Should the player surrender.
+    """
+    state = current_hand.pair_state if current_hand.is_pair else current_hand.state
+    return (
+        decide(state, dealers_hand_open.first_card, counting, true_count, rules)
+        == action_surrender
+    )
 
 
 def draw_until_bust_or_hold(
-    current_deck: list[int],
-    current_hand: list[int],
+    current_deck: Shoe,
+    current_hand: Hand,
     is_dealer: bool,
     ceartainty: float,
-) -> tuple[list[int], np.ndarray, list[int]]:
+    counting: CountingStrategy | None = None,
+    upcard: int = 0,
+    rules: Rules = default_rules,
+) -> tuple[Shoe, Hand]:
     """Draw cards until the hand is bust or the player should hold.
 
     Args:
-        current_deck (list): Current deck.
-        current_hand (list): Current hand.
+        current_deck (Shoe): Current deck.
+        current_hand (Hand): Current hand.
         is_dealer (bool): Is the current player the dealer.
         ceartainty (float): How safe must a draw be to take a card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the ceartainty.
+                                               Defaults to None.
+        upcard (int, optional): Dealers visible card, for the index plays.
+                                Defaults to 0.
+        rules (Rules, optional): Rules the dealer draws by.
+                                 Defaults to default_rules.
 
     Returns:
-        current_deck (list): Current deck
-        possibilities (list): Possible values of current hand.
-        current_hand (list): Current hand.
+        current_deck (Shoe): Current deck
+        current_hand (Hand): Current hand.
     """
-    possibilities = calculate_hand_value(current_hand)
-
-    draw = should_draw(possibilities, current_deck, is_dealer, ceartainty)
-
-    while draw:
-        current_hand, current_deck = draw_card(current_deck, current_hand, 2)
-
-        possibilities = calculate_hand_value(current_hand)
-
-        if len(possibilities) < 1:
-            return current_deck, [0], current_hand
-
-        draw = should_draw(possibilities, current_deck, is_dealer, ceartainty)
-    return current_deck, possibilities, current_hand
+    while not current_hand.is_bust and should_draw(
+        current_hand, current_deck, is_dealer, ceartainty, counting, upcard, rules
+    ):
+        current_hand, current_deck = draw_card(current_deck, current_hand, 1)
+    return current_deck, current_hand
 
 
 def check_outcome(
-    dealers_hand_open: list[int],
-    dealer_possibilities: np.ndarray,
-    player_hands: list[np.ndarray],
+    dealers_hand: Hand,
+    player_hands: list[Hand],
+    rules: Rules = default_rules,
 ) -> list[float]:
     """Calculate the outcome of a single game.
 
     Args:
-        dealers_hand_open (list): Dealers hand
-        dealer_possibilities (list): Value of the dealers hand.
+        dealers_hand (Hand): Dealers hand
         player_hands (list): Hands of the players.
+        rules (Rules, optional): Rules the hands are paid by.
+                                 Defaults to default_rules.
 
     Returns:
         outcomes (list): Outcome of the game for each player
     """
-    outcomes = [
-        (
-            1.5
-            if 21 in possibilities
-            and len(hand) == 2
-            and not (
-                21 in dealer_possibilities and len(dealers_hand_open)
-            )  # Blackjack win
-            else (
-                1
-                if max(possibilities) > max(dealer_possibilities)  # Normal win
-                else (
-                    0
-                    if max(possibilities) == max(dealer_possibilities)
-                    and max(possibilities) != 0  # Draw
-                    else -1  # Loss
-                )
-            )
-        )
-        for possibilities, hand in player_hands
+    dealer_outcome = dealers_hand.outcome
+    outcomes: list[float] = [
+        rules.outcomes.item(hand.split_role, hand.outcome, dealer_outcome)
+        for hand in player_hands
     ]
     return outcomes
 
 
 def check_outcome_split(
-    dealers_hand_open: list[int],
-    dealer_possibilities: np.ndarray,
-    split_hands: list[list[np.ndarray]],
-) -> list[tuple[float, Any]]:
+    dealers_hand: Hand,
+    split_hands: list[tuple[Hand, int, float]],
+    rules: Rules = default_rules,
+) -> list[tuple[float, int]]:
     """Calculate the outcome of all split hands in a single game.
 
     Args:
-        dealers_hand_open (list): Dealers hand
-        dealer_possibilities (list): Value of the dealers hand.
-        player_hands (list): Hands of the players.
+        dealers_hand (Hand): Dealers hand
+        split_hands (list): Split hands, the player they belong to and their
+                            multiplyer.
+        rules (Rules, optional): Rules the game is settled by.
+                                 Defaults to default_rules.
 
     Returns:
         outcomes (list): Outcome of the game for each player
     """
-    outcomes = [
-        (
-            (
-                1.5
-                if 21 in possibilities
-                and len(hand) == 2
-                and not (
-                    21 in dealer_possibilities and len(dealers_hand_open)
-                )  # Blackjack win
-                else (
-                    1
-                    if max(possibilities) > max(dealer_possibilities)  # Normal win
-                    else (
-                        0
-                        if max(possibilities) == max(dealer_possibilities)
-                        and max(possibilities) != 0  # Draw
-                        else -1  # Loss
-                    )
-                )
-            ),
-            player,
-        )
-        for possibilities, hand, player in split_hands
+    outcomes = check_outcome(dealers_hand, [hand for hand, _, _ in split_hands], rules)
+    return [
+        (outcome * multiplyer, player)
+        for outcome, (_, player, multiplyer) in zip(outcomes, split_hands)
     ]
-    return outcomes
 
 
-def play_split_hand(
-    split_hands: list[Any],  # TODO: something wrong with split, should be fixed
-    player_id: int,
-    current_hand: list[int],
-    current_deck: list[int],
+def split_pair(
+    current_deck: Shoe, current_hand: Hand, rules: Rules = default_rules
+) -> tuple[Hand, Hand]:
+    """Split a pair into two hands, dealt their second card if the rules say so.
+
+    Args:
+        current_deck (Shoe): Current deck.
+        current_hand (Hand): The pair to split.
+        rules (Rules, optional): Rules that decide when the second cards are
+                                 dealt. Defaults to default_rules.
+
+    Returns:
+        kept_hand (Hand): Hand in the place of the pair.
+        split_hand (Hand): Hand split off.
+    """
+    split_hands = []
+    for role in (role_kept, role_split_off):
+        split_hand = Hand()
+        split_hand.split_role = role
+        split_hand.add(current_hand.first_card)
+        draw_card(current_deck, split_hand, rules.split_cards)
+        split_hands.append(split_hand)
+    return split_hands[0], split_hands[1]
+
+
+def play_hand(
+    current_deck: Shoe,
+    current_hand: Hand,
+    dealers_hand_open: Hand,
     ceartainty: float,
-) -> tuple[list[int], list[Any]]:
-    """Play a split hand.
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+    true_count: float | None = None,
+) -> tuple[Shoe, Hand, float]:
+    """Double down on a hand, or draw until it is bust or should hold.
 
     Args:
-        split_hands (list): List of split hands.
-        Player_id (int): Player id.
-        current_hand (list): Current hand.
-        current_deck (list): Current deck.
+        current_deck (Shoe): Current deck.
+        current_hand (Hand): Current hand.
+        dealers_hand_open (Hand): Dealers visible hand.
         ceartainty (float): How safe must a draw be to take a card.
+        counting (CountingStrategy, optional): Strategy whose index plays
+                                               override the decision table and
+                                               the ceartainty. Defaults to None.
+        rules (Rules, optional): Rules whose decisions to look up.
+                                 Defaults to default_rules.
+        true_count (float, optional): True count of the deck, when the caller
+                                      has taken it already. Defaults to None.
 
     Returns:
-        current_hand (list): Current hand.
-        split_hands (list): list of split hands.
+        current_deck (Shoe): Current deck.
+        current_hand (Hand): The finished hand.
+        multiplyer (float): 2 if the hand doubled down, otherwise 1.
     """
-    split_hand = [current_hand[0]]
-
-    current_deck, possibilities, split_hand = draw_until_bust_or_hold(
-        current_deck, split_hand, is_dealer=False, ceartainty=ceartainty
+    if true_count is None:
+        true_count = current_deck.true_count if counting is not None else 0.0
+    if should_double(current_hand, dealers_hand_open, counting, true_count, rules):
+        current_hand, current_deck = draw_card(current_deck, current_hand, 1)
+        return current_deck, current_hand, 2.0
+    current_deck, current_hand = draw_until_bust_or_hold(
+        current_deck,
+        current_hand,
+        is_dealer=False,
+        ceartainty=ceartainty,
+        counting=counting,
+        upcard=dealers_hand_open.first_card,
+        rules=rules,
     )
-    split_hands.append([possibilities, split_hand, player_id])
-
-    current_hand = [current_hand[1]]
-    return current_hand, split_hands
+    return current_deck, current_hand, 1.0
 
 
 def play_game(
-    current_deck: list[int],
+    current_deck: Shoe,
     n_players: int,
     use_split: bool,
     ceartainty: float,
-) -> tuple[np.ndarray, list[int], np.ndarray]:
+    record: np.void | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> tuple[np.ndarray, Shoe, int]:
     """Play blackjack.
 
     Args:
-        current_deck (list): Current Deck.
+        current_deck (Shoe): Current Deck.
         n_players (int): Number of players.
         use_split (bool): Should split be used.
         ceartainty (float): How safe must a draw be to take a card.
+        record (np.void, optional): Record of src.history.history_dtype to fill
+                                    in with the game. Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player bets and
+                                               deviates with, counting with the
+                                               system of the deck.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of the table. Defaults to default_rules.
 
     Returns:
-        returns (np.ndarray): The result of a game for all players.
-        current_deck (list): Current deck.
-        dealer_posibilities (list): Values of dealers hand.
+        returns (np.ndarray): The result of a game for all players, in units.
+        current_deck (Shoe): Current deck.
+        dealer_score (int): Final value of the dealers hand, 0 if bust.
     """
-    # Dealer draws first card
-    dealers_hand_open, current_deck = draw_card(current_deck, [], 1)
+    timer = telemetry.StageTimer() if telemetry.enabled else None
+    bet = counting.bet(current_deck.true_count) if counting is not None else 1.0
+    # Only index plays need the true count once the bets are placed
+    deviations = counting if counting is not None and counting.deviates else None
+    # Dealer draws first card, and the hole card if the dealer peeks
+    dealers_hand, current_deck = draw_card(current_deck, Hand(), 1)
+    running_count = current_deck.running_count
+    dealers_hand, current_deck = draw_card(current_deck, dealers_hand, rules.hole_cards)
+    # The hole card is only counted once it is turned over
+    hole_tag = current_deck.running_count - running_count
+    current_deck.running_count = running_count
+    dealer_blackjack = dealers_hand.is_blackjack
     multiplyer = np.ones(n_players)
     # Players' turns
     player_hands = []
-    split_hands: list[Any] = []
+    split_hands: list[tuple[Hand, int, float]] = []
+    surrendered = []
     for i in range(n_players):
-        current_hand, current_deck = draw_card(current_deck, [], 2)
-        if (
-            current_hand[0] == current_hand[1]
-            and split_combinations[current_hand[0]][dealers_hand_open[0]]
-        ) and use_split:
-            current_hand, split_hands = play_split_hand(
-                split_hands, i, current_hand, current_deck, ceartainty
-            )
-        if should_double(current_hand, dealers_hand_open):
-            multiplyer[i] = 2
-            current_hand, current_deck = draw_card(current_deck, current_hand, 1)
-            possibilities = calculate_hand_value(current_hand)
+        current_hand, current_deck = draw_card(current_deck, Hand(), 2)
+        if timer is not None:
+            timer.lap(telemetry.deal)
+        true_count = current_deck.true_count if deviations is not None else 0.0
+        if dealer_blackjack:
+            # The dealer peeked, so the game ends before anyone acts
+            pass
+        elif should_surrender(
+            current_hand, dealers_hand, deviations, true_count, rules
+        ):
+            surrendered.append(i)
         else:
-            current_deck, possibilities, current_hand = draw_until_bust_or_hold(
-                current_deck, current_hand, ceartainty=ceartainty, is_dealer=False
-            )
-        player_hands.append([possibilities, current_hand])
-
-    current_deck, dealer_possibilities, dealers_hand_open = draw_until_bust_or_hold(
-        current_deck, dealers_hand_open, ceartainty=ceartainty, is_dealer=True
-    )
-
-    returns = check_outcome(
-        dealers_hand_open,
-        dealer_possibilities,
-        player_hands,
-    )
+            hands = [current_hand]
+            if use_split:
+                k = 0
+                while k < len(hands):
+                    if len(hands) <= rules.max_splits and should_split(
+                        hands[k], dealers_hand, deviations, true_count, rules
+                    ):
+                        hands[k], split_hand = split_pair(current_deck, hands[k], rules)
+                        hands.append(split_hand)
+                        if deviations is not None:
+                            true_count = current_deck.true_count
+                    else:
+                        k += 1
+            # The hands split off are played before the hand kept in place, the
+            # first of them before any card changes the true count
+            hand_count: float | None = true_count
+            for k in [*range(1, len(hands)), 0]:
+                current_deck, hands[k], hand_multiplyer = play_hand(
+                    current_deck,
+                    hands[k],
+                    dealers_hand,
+                    ceartainty,
+                    deviations,
+                    rules,
+                    hand_count,
+                )
+                hand_count = None
+                if k == 0:
+                    multiplyer[i] = hand_multiplyer
+                else:
+                    split_hands.append((hands[k], i, hand_multiplyer))
+            current_hand = hands[0]
+        player_hands.append(current_hand)
+        if timer is not None:
+            timer.lap(telemetry.decide)
+
+    current_deck.running_count += hole_tag
+    if not dealer_blackjack:
+        current_deck, dealers_hand = draw_until_bust_or_hold(
+            current_deck,
+            dealers_hand,
+            ceartainty=ceartainty,
+            is_dealer=True,
+            rules=rules,
+        )
+    if timer is not None:
+        timer.lap(telemetry.dealer)
 
-    returns *= multiplyer
+    returns = np.array(check_outcome(dealers_hand, player_hands, rules)) * multiplyer
+    # A surrendered hand gives up half its bet, whatever the dealer has
+    returns[surrendered] = -0.5
 
-    returns_split = check_outcome_split(
-        dealers_hand_open,
-        dealer_possibilities,
-        split_hands,
-    )
+    returns_split = check_outcome_split(dealers_hand, split_hands, rules)
 
     for result, player in returns_split:
         returns[player] += result
+    if bet != 1.0:
+        returns *= bet
+
+    if timer is not None:
+        timer.lap(telemetry.settle)
+        telemetry.count(telemetry.games)
+        telemetry.count(telemetry.hands, n_players + len(split_hands))
+        telemetry.count(telemetry.splits, len(split_hands))
+        telemetry.count(
+            telemetry.doubles,
+            int((multiplyer == 2).sum())
+            + sum(hand_multiplyer == 2 for _, _, hand_multiplyer in split_hands),
+        )
 
-    return returns, current_deck, dealer_possibilities
+    if record is not None:
+        actions = np.where(multiplyer == 2, history.doubled, 0)
+        for _, player, _ in split_hands:
+            actions[player] |= history.split
+        for player in surrendered:
+            actions[player] |= history.surrendered
+        for i, current_hand in enumerate(player_hands):
+            if (
+                current_hand.is_blackjack
+                and rules.pays_blackjack[current_hand.split_role]
+            ):
+                actions[i] |= history.blackjack
+        record["upcard"] = dealers_hand.first_card
+        record["dealer_total"] = dealers_hand.score
+        record["player_total"] = [current_hand.score for current_hand in player_hands]
+        record["action"] = actions
+        record["payout"] = returns
+
+    return returns, current_deck, dealers_hand.score
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Hand of cards with its value tracked as cards arrive."""
+
+from src.lookups import (
+    blackjack_values,
+    outcome_blackjack,
+    pair_states,
+    role_unsplit,
+    soft_states,
+)
+
+card_values = tuple(blackjack_values[card] for card in range(len(blackjack_values)))
+
+
+class Hand:
+    """A hand of cards that keeps its totals up to date on every card."""
+
+    __slots__ = (
+        "hard_total",
+        "total",
+        "is_soft",
+        "n_cards",
+        "first_card",
+        "is_pair",
+        "split_role",
+    )
+
+    def __init__(self) -> None:
+        """Create an empty hand."""
+        self.hard_total = 0
+        self.total = 0
+        self.is_soft = False
+        self.n_cards = 0
+        self.first_card = -1
+        self.is_pair = False
+        self.split_role = role_unsplit
+
+    def add(self, card: int) -> None:
+        """Add a card to the hand.
+
+        Args:
+            card (int): The card to add.
+        """
+        self.is_pair = self.n_cards == 1 and card == self.first_card
+        if self.n_cards == 0:
+            self.first_card = card
+        self.n_cards += 1
+        self.hard_total += card_values[card]
+        self.is_soft = (self.is_soft or card == 0) and self.hard_total < 12
+        self.total = self.hard_total + 10 if self.is_soft else self.hard_total
+
+    @property
+    def state(self) -> int:
+        """int: Row of the decision table for the hands total."""
+        if self.is_soft:
+            return soft_states + self.total
+        return min(self.hard_total, soft_states - 1)
+
+    @property
+    def pair_state(self) -> int:
+        """int: Row of the decision table for the hand as a pair."""
+        return pair_states + self.first_card
+
+    @property
+    def is_bust(self) -> bool:
+        """bool: Has the hand gone over 21."""
+        return self.total > 21
+
+    @property
+    def is_blackjack(self) -> bool:
+        """bool: Is the hand 21 on its first two cards."""
+        return self.total == 21 and self.n_cards == 2
+
+    @property
+    def score(self) -> int:
+        """int: Value of the hand, 0 if it is bust."""
+        return 0 if self.total > 21 else self.total
+
+    @property
+    def outcome(self) -> int:
+        """int: Row of the payout table for the finished hand."""
+        if self.total == 21 and self.n_cards == 2:
+            return outcome_blackjack
+        return 0 if self.total > 21 else self.total
+
+
+if __name__ == "__main__":
+    pass
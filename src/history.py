@@ -0,0 +1,193 @@
+"""Memory-mapped log of every game, stored a column per field."""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.stats import SimulationStats
+
+# Flags of the action column
+doubled = 1
+split = 2
+blackjack = 4
+surrendered = 8
+
+
+def history_dtype(n_players: int) -> np.dtype:
+    """Get the record of one game.
+
+    Args:
+        n_players (int): Number of players.
+
+    Returns:
+        np.dtype: Structured dtype with the dealers upcard and final value, and
+                  the final value, actions and payout of every player. Final
+                  values are 0 when bust.
+    """
+    return np.dtype(
+        [
+            ("upcard", np.int8),
+            ("dealer_total", np.int8),
+            ("player_total", np.int8, (n_players,)),
+            ("action", np.uint8, (n_players,)),
+            ("payout", np.float32, (n_players,)),
+        ]
+    )
+
+
+class HandHistory:
+    """Log of every game of a run, one memory-mapped .npy file per field.
+
+    Game g of shoe s is row s * games_pr_deck + g, so workers write their
+    shoes straight into the files without coordinating. Reading a field only
+    touches its own file, and nothing is loaded before it is indexed.
+    """
+
+    def __init__(self, path: str | Path, mode: str = "r") -> None:
+        """Open an existing log.
+
+        Args:
+            path (str | Path): Folder of the log.
+            mode (str, optional): "r" to read or "r+" to write.
+                                  Defaults to "r".
+        """
+        self.path = Path(path)
+        self.mode = mode
+        meta = json.loads((self.path / "history.json").read_text())
+        self.n_games: int = meta["n_games"]
+        self.n_players: int = meta["n_players"]
+        self.games_pr_deck: int = meta["games_pr_deck"]
+        self.dtype = history_dtype(self.n_players)
+        self.columns: dict[str, np.memmap] = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode=mode)  # type: ignore
+            for name in self.dtype.names or ()
+        }
+
+    @classmethod
+    def create(
+        cls, path: str | Path, n_games: int, n_players: int, games_pr_deck: int
+    ) -> "HandHistory":
+        """Create an empty log on disk.
+
+        Args:
+            path (str | Path): Folder of the log.
+            n_games (int): Number of games.
+            n_players (int): Number of players.
+            games_pr_deck (int): Number of games each deck is used.
+
+        Returns:
+            HandHistory: The log, open for writing.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        dtype = history_dtype(n_players)
+        for name in dtype.names or ():
+            field = dtype[name]
+            open_memmap(
+                path / f"{name}.npy",
+                mode="w+",
+                dtype=field.base,
+                shape=(n_games, *field.shape),
+            ).flush()
+        meta = {
+            "n_games": n_games,
+            "n_players": n_players,
+            "games_pr_deck": games_pr_deck,
+        }
+        (path / "history.json").write_text(json.dumps(meta))
+        return cls(path, mode="r+")
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle the log by path only.
+
+        Returns:
+            dict: What is needed to open the log.
+        """
+        return {"path": str(self.path), "mode": self.mode}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Open the log in the receiving process.
+
+        Args:
+            state (dict): What is needed to open the log.
+        """
+        self.__init__(state["path"], state["mode"])  # type: ignore[misc]
+
+    def __len__(self) -> int:
+        """Return the number of games in the log."""
+        return self.n_games
+
+    def write(self, rows: slice | np.ndarray, records: np.ndarray) -> None:
+        """Write the records of some games.
+
+        Args:
+            rows (slice | np.ndarray): Rows of the games.
+            records (np.ndarray): Record of each game, of dtype self.dtype.
+        """
+        for name, column in self.columns.items():
+            column[rows] = records[name]
+
+    def read(self, rows: slice | np.ndarray) -> np.ndarray:
+        """Read the records of some games.
+
+        Args:
+            rows (slice | np.ndarray): Rows of the games.
+
+        Returns:
+            records (np.ndarray): Record of each game, of dtype self.dtype.
+        """
+        upcards = self.columns["upcard"][rows]
+        records = np.empty(len(upcards), dtype=self.dtype)
+        for name, column in self.columns.items():
+            records[name] = column[rows]
+        return records
+
+    def chunks(self, chunk_rows: int = 2**20) -> Iterator[slice]:
+        """Split the log into ranges of rows.
+
+        Args:
+            chunk_rows (int, optional): Most rows in a range.
+                                        Defaults to 2**20.
+
+        Yields:
+            slice: Range of rows.
+        """
+        for start in range(0, self.n_games, chunk_rows):
+            yield slice(start, min(start + chunk_rows, self.n_games))
+
+    def stats(
+        self, upcard: int | None = None, chunk_rows: int = 2**20
+    ) -> SimulationStats:
+        """Summarize the logged games a chunk at a time.
+
+        Args:
+            upcard (int, optional): Only count games where the dealer showed
+                                    this card. Defaults to every game.
+            chunk_rows (int, optional): Rows read at a time.
+                                        Defaults to 2**20.
+
+        Returns:
+            stats (SimulationStats): Statistics of the selected games.
+        """
+        stats = SimulationStats(self.n_players)
+        for rows in self.chunks(chunk_rows):
+            payouts = self.columns["payout"][rows]
+            dealer_totals = self.columns["dealer_total"][rows]
+            if upcard is not None:
+                selected = self.columns["upcard"][rows] == upcard
+                payouts, dealer_totals = payouts[selected], dealer_totals[selected]
+            stats.update(payouts, dealer_totals)
+        return stats
+
+    def flush(self) -> None:
+        """Write changes of the memory maps to disk."""
+        for column in self.columns.values():
+            if self.mode != "r":
+                column.flush()
+
+
+if __name__ == "__main__":
+    pass
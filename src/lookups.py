@@ -1,6 +1,8 @@
 """Lookup tables for game logic."""
 
-import pandas as pd
+from typing import Any
+
+import numpy as np
 
 blackjack_values = {
     0: 1,
@@ -18,10 +20,16 @@ blackjack_values = {
     12: 10,
 }
 
+# Lowest card with a given value, the first card that is no longer safe to draw
+draw_thresholds = {
+    value: min(card for card, val in blackjack_values.items() if val == value)
+    for value in set(blackjack_values.values())
+}
+
 true_row = [True for _ in range(13)]
 false_row = [False for _ in range(13)]
 
-split_combinations = pd.DataFrame(
+split_by_upcard = np.array(
     [
         true_row,
         true_row,
@@ -37,31 +45,19 @@ split_combinations = pd.DataFrame(
         false_row,
         false_row,
     ],
-    columns=[
-        0,
-        1,
-        2,
-        3,
-        4,
-        5,
-        6,
-        7,
-        8,
-        9,
-        10,
-        11,
-        12,
-    ],
 )
 
-split_combinations.iloc[5] = False
-split_combinations.iloc[1:7, 7:13] = False
-split_combinations.iloc[1:4, :3] = False
-split_combinations.iloc[0, 1:7] = False
-split_combinations.iloc[5, 2:6] = True
-split_combinations.iloc[8, 9:] = False
-split_combinations.iloc[8, 0] = False
-split_combinations.iloc[8, 6] = False
+split_by_upcard[5] = False
+split_by_upcard[1:7, 7:13] = False
+split_by_upcard[1:4, :3] = False
+split_by_upcard[0, 1:7] = False
+split_by_upcard[5, 2:6] = True
+split_by_upcard[8, 9:] = False
+split_by_upcard[8, 0] = False
+split_by_upcard[8, 6] = False
+
+# Indexed by pair card and then upcard
+split_combinations = split_by_upcard.T
 
 double_down_table_soft = {
     14: {5: True, 6: True},
@@ -87,6 +83,87 @@ double_down_table_hard = {
     },
 }
 
+# When to surrender, keyed on hard total and upcard, with the extra hands that
+# are surrendered when the dealer hits soft 17
+surrender_table_hard = {
+    15: {9: True, 10: True, 11: True, 12: True},
+    16: {0: True, 8: True, 9: True, 10: True, 11: True, 12: True},
+}
+surrender_table_hard_h17 = {
+    15: {0: True},
+    17: {0: True},
+}
+
+# Actions in the decision table, hitting or standing is left to the ceartainty
+action_play = 0
+action_double = 1
+action_split = 2
+# Only taken by index plays of a counting strategy
+action_stand = 3
+action_hit = 4
+# Only in the decision table when the rules allow surrender
+action_surrender = 5
+n_actions = 6
+
+# Rows of the decision table: hard totals, then soft totals, then pairs by card
+soft_states = 32
+pair_states = 64
+n_states = pair_states + len(blackjack_values)
+
+# Roles of a hand, which the rules compile decisions and payouts for: not split,
+# kept in the place of a split pair, or split off it
+role_unsplit = 0
+role_kept = 1
+role_split_off = 2
+n_roles = 3
+
+# Rows of the payout table: the score of a hand, 0 if bust, then 21 on its
+# first two cards
+outcome_blackjack = 22
+n_outcomes = 23
+
+
+def compile_decisions(
+    split: Any,
+    double_soft: dict[int, dict[int, bool]],
+    double_hard: dict[int, dict[int, bool]],
+    surrender: dict[int, dict[int, bool]] | None = None,
+) -> np.ndarray:
+    """Compile the strategy tables into one dense decision array.
+
+    Args:
+        split (Any): When to split, indexed by pair card and then upcard.
+        double_soft (dict): When to double, keyed on soft total and upcard.
+        double_hard (dict): When to double, keyed on hard total and upcard.
+        surrender (dict, optional): When to surrender, keyed on hard total and
+                                    upcard. Defaults to never.
+
+    Returns:
+        decisions (np.ndarray): Action for each player state and upcard.
+    """
+    n_cards = len(blackjack_values)
+    decisions = np.full((n_states, n_cards), action_play, dtype=np.int8)
+    for table, offset in ((double_hard, 0), (double_soft, soft_states)):
+        for total, row in table.items():
+            for upcard, value in row.items():
+                if value:
+                    decisions[offset + total, upcard] = action_double
+    for total, row in (surrender or {}).items():
+        for upcard, value in row.items():
+            if value:
+                decisions[total, upcard] = action_surrender
+    for pair in range(n_cards):
+        if pair == 0:
+            total_state = soft_states + 12
+        else:
+            total_state = 2 * blackjack_values[pair]
+        decisions[pair_states + pair] = decisions[total_state]
+        for upcard in range(n_cards):
+            if split[pair][upcard]:
+                decisions[pair_states + pair, upcard] = action_split
+    return decisions
+
+
 plotting_map = {
     16: "bust",
     17: 17,
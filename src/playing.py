@@ -1,72 +1,385 @@
 """Functions for playing games."""
 
-from multiprocessing import Pool
+import cProfile
+import hashlib
+import json
+import tempfile
+import time
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Iterable, Iterator
 
 import numpy as np
 
+from src import batch, telemetry
+from src.buffers import GameBuffer
+from src.checkpoint import (
+    checkpoint_seed,
+    load_checkpoint,
+    read_checkpoint,
+    remaining_ranges,
+    save_checkpoint,
+)
+from src.counting import CountingStrategy
 from src.game_logic import create_deck, play_game
+from src.history import HandHistory
+from src.rules import Rules, default_rules
+from src.session import Executor, SerialExecutor, SimulationSession
+from src.shoe import Shoe
+from src.stats import SimulationStats
+from src.telemetry import ProgressReporter, SharedTelemetry
+
+# Bump when a change to the games changes their results, so old cached results
+# are not reused
+engine_version = 3
+# Cached runs without a seed share one, so their shoes can be topped up
+cache_seed = 0
+
+
+def task_seed(seed: int | None, index: int) -> np.random.SeedSequence | None:
+    """Derive the seed of a single task from a root seed.
+
+    Args:
+        seed (int, optional): Root seed, None for fresh entropy.
+        index (int): Index of the task.
+
+    Returns:
+        np.random.SeedSequence: Independent seed for the task, None if there is
+                                no root seed.
+    """
+    if seed is None:
+        return None
+    return np.random.SeedSequence(seed, spawn_key=(index,))
 
 
 def play_single_game(
     n_players: int,
     n_decks: int,
-    deck: list[int],
+    deck: Shoe,
     use_split: bool,
     ceartainty: float,
-) -> tuple[np.ndarray, list[int], list[int]]:
+    record: np.void | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> tuple[np.ndarray, int, Shoe]:
     """Play a single game of blackjack.
 
     Args:
         n_players (int): Number of players.
         n_decks (int): Number of decks.
-        deck (list): Current deck.
+        deck (Shoe): Current deck.
         use_split (bool): Should split be used.
         ceartainty (float): How safe must a draw be to take a card.
+        record (np.void, optional): Record to fill in with the game.
+                                    Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with, the deck
+                                               must count with its system.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of the table, the deck must be cut at
+                                 their penetration. Defaults to default_rules.
 
     Returns:
         game_score (nd.array): Score of the game for each player.
-        dealers_hand_open (list): The dealers hand that is visible.
-        modified_deck (list): The deck as it looks after the game is finished.
+        dealer_score (int): Final value of the dealers hand, 0 if bust.
+        modified_deck (Shoe): The deck as it looks after the game is finished.
     """
-    if len(deck) < n_decks / 2 * 52:
-        deck = create_deck(n_decks=n_decks)
-    game_score, modified_deck, dealers_hand_open = play_game(
-        deck, n_players, use_split, ceartainty
+    if deck.needs_shuffle:
+        deck.shuffle()
+    game_score, modified_deck, dealer_score = play_game(
+        deck, n_players, use_split, ceartainty, record, counting, rules
     )
-    return game_score, dealers_hand_open, modified_deck
+    return game_score, dealer_score, modified_deck
 
 
 def play_multiple_games(
     n_players: int,
     n_decks: int,
-    deck: list[int],
+    deck: Shoe,
     use_split: bool,
     games_pr_deck: int,
     ceartainty: float,
-) -> tuple[list[np.ndarray], list[list[int]]]:
+    game_scores: np.ndarray | None = None,
+    dealer_hands: np.ndarray | None = None,
+    records: np.ndarray | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
     """Play multiple games of blackjack.
 
     Args:
         n_players (int): Number of players.
         n_decks (int): Number of decks.
-        deck (list): Current deck.
+        deck (Shoe): Current deck.
         use_split (bool): Should split be used.
         games_pr_deck (int): Number of games each deck should be used.
         ceartainty (float): How safe must a draw be to take a card.
+        game_scores (np.ndarray, optional): Array to write the score of every
+                                            game into. Defaults to a new one.
+        dealer_hands (np.ndarray, optional): Array to write the dealers final
+                                             value of every game into.
+                                             Defaults to a new one.
+        records (np.ndarray, optional): Array of src.history.history_dtype to
+                                        write the record of every game into.
+                                        Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with, the deck
+                                               must count with its system.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of the table, the deck must be cut at
+                                 their penetration. Defaults to default_rules.
 
     Returns:
-        game_scores (list): Scores from every game played.
-        dealer_hands (list): The hand the dealers ended with in every game.
+        stats (SimulationStats): Statistics of every game played.
     """
-    game_scores = []
-    dealer_hands = []
-    for _ in range(games_pr_deck):
-        game_score, dealers_hand_open, deck = play_single_game(
-            n_players, n_decks, deck, use_split, ceartainty
+    if game_scores is None:
+        game_scores = np.empty((games_pr_deck, n_players))
+    if dealer_hands is None:
+        dealer_hands = np.empty(games_pr_deck, dtype=np.int64)
+    for game in range(games_pr_deck):
+        game_scores[game], dealer_hands[game], deck = play_single_game(
+            n_players,
+            n_decks,
+            deck,
+            use_split,
+            ceartainty,
+            records[game] if records is not None else None,
+            counting,
+            rules,
         )
-        game_scores.append(game_score)
-        dealer_hands.append(dealers_hand_open)
-    return game_scores, dealer_hands
+    stats = SimulationStats(n_players)
+    stats.update(game_scores, dealer_hands)
+    return stats
+
+
+def play_shoes(
+    n_players: int,
+    n_decks: int,
+    n_games: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainty: float,
+    engine: str,
+    seed: int | None,
+    start: int,
+    stop: int,
+    game_buffer: GameBuffer | None = None,
+    shared_telemetry: SharedTelemetry | None = None,
+    hand_history: HandHistory | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
+    """Play a range of the shoes in a run.
+
+    Every shoe plays games_pr_deck games, except the last shoe of the run which
+    plays whatever is left of n_games. Each shoe is shuffled from a seed derived
+    from the root seed and its place in the run, so the cards dealt do not
+    depend on how the run is split into ranges. The batch engine derives one
+    seed for each block of batch.shuffle_block shoes, so its ranges must start
+    on a block.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        n_games (int): Total number of games in the run.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainty (float): How safe must a draw be to take a card.
+        engine (str): "scalar" or "batch".
+        seed (int, optional): Root seed of the run.
+        start (int): First shoe to play.
+        stop (int): Shoe to stop before.
+        game_buffer (GameBuffer, optional): Buffer to write every game into,
+                                            game g of shoe s at row
+                                            s * games_pr_deck + g.
+                                            Defaults to None.
+        shared_telemetry (SharedTelemetry, optional): Counters to count the
+                                                      games into.
+                                                      Defaults to None.
+        hand_history (HandHistory, optional): Log to write every game into,
+                                              at the same rows as game_buffer.
+                                              Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
+
+    Returns:
+        stats (SimulationStats): Statistics of every game played.
+    """
+    if shared_telemetry is not None:
+        telemetry.attach(shared_telemetry)
+    try:
+        first_game = start * games_pr_deck
+        last_game = min(stop * games_pr_deck, n_games)
+        game_scores = dealer_hands = None
+        if game_buffer is not None:
+            game_scores = game_buffer.scores[first_game:last_game]
+            dealer_hands = game_buffer.dealer_hands[first_game:last_game]
+
+        if engine == "batch":
+            return batch.play_multiple_games(
+                n_players,
+                n_decks,
+                stop - start,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                seed=[
+                    task_seed(seed, block)
+                    for block in range(start, stop, batch.shuffle_block)
+                ],
+                n_games=last_game - first_game,
+                game_scores=game_scores,
+                dealer_hands=dealer_hands,
+                hand_history=hand_history,
+                first_game=first_game,
+                counting=counting,
+                rules=rules,
+            )
+
+        stats = SimulationStats(n_players)
+        for shoe in range(start, stop):
+            rows = slice(
+                shoe * games_pr_deck - first_game,
+                min(shoe * games_pr_deck + games_pr_deck, n_games) - first_game,
+            )
+            records = None
+            if hand_history is not None:
+                records = np.empty(rows.stop - rows.start, dtype=hand_history.dtype)
+            stats.merge(
+                play_multiple_games(
+                    n_players,
+                    n_decks,
+                    create_deck(
+                        n_decks=n_decks,
+                        penetration=rules.penetration,
+                        seed=task_seed(seed, shoe),
+                        counting=counting.system if counting is not None else None,
+                    ),
+                    use_split,
+                    rows.stop - rows.start,
+                    ceartainty,
+                    game_scores=game_scores[rows] if game_scores is not None else None,
+                    dealer_hands=dealer_hands[rows]
+                    if dealer_hands is not None
+                    else None,
+                    records=records,
+                    counting=counting,
+                    rules=rules,
+                )
+            )
+            if hand_history is not None and records is not None:
+                hand_history.write(
+                    slice(first_game + rows.start, first_game + rows.stop), records
+                )
+            if telemetry.enabled:
+                telemetry.flush()
+        return stats
+    finally:
+        if shared_telemetry is not None:
+            telemetry.detach()
+
+
+def play_chunk(*task: Any) -> tuple[int, int, SimulationStats]:
+    """Play a range of shoes, reporting which range was played.
+
+    Args:
+        task (Any): Arguments of play_shoes.
+
+    Returns:
+        start (int): First shoe played.
+        stop (int): Shoe the range stopped before.
+        stats (SimulationStats): Statistics of every game played.
+    """
+    return task[8], task[9], play_shoes(*task)
+
+
+def chunk_shoes(
+    n_shoes: int,
+    n_workers: int,
+    chunk_size: int | None = None,
+    min_shoes: int = 1,
+    max_shoes: int | None = None,
+) -> Iterator[tuple[int, int]]:
+    """Split the shoes of a run into chunks of work.
+
+    Without a fixed size the chunks shrink as the run progresses, each taking
+    half of the remaining shoes divided by the number of workers. Early chunks
+    are large to keep overhead low and late chunks are small so every worker
+    finishes at about the same time.
+
+    Args:
+        n_shoes (int): Number of shoes in the run.
+        n_workers (int): Number of workers.
+        chunk_size (int, optional): Fixed number of shoes in each chunk.
+                                    Defaults to sizing adaptively.
+        min_shoes (int, optional): Fewest shoes in an adaptive chunk.
+                                   Defaults to 1.
+        max_shoes (int, optional): Most shoes in any chunk. Defaults to no
+                                   limit.
+
+    Yields:
+        tuple: First shoe of the chunk and the shoe to stop before.
+    """
+    start = 0
+    while start < n_shoes:
+        if chunk_size is not None:
+            size = chunk_size
+        else:
+            size = max(-(-(n_shoes - start) // (2 * n_workers)), min_shoes)
+        if max_shoes is not None:
+            size = min(size, max_shoes)
+        stop = min(start + max(size, 1), n_shoes)
+        yield start, stop
+        start = stop
+
+
+def plan_chunks(
+    n_games: int,
+    games_pr_deck: int,
+    n_workers: int,
+    engine: str = "scalar",
+    chunk_size: int | str = "auto",
+    batch_size: int = 4096,
+    done: list[tuple[int, int]] | None = None,
+) -> Iterator[tuple[int, int]]:
+    """Split the shoes of a run that are left to play into chunks of work.
+
+    Args:
+        n_games (int): Total number of games in the run.
+        games_pr_deck (int): Number of games each deck should be used.
+        n_workers (int): Number of workers.
+        engine (str, optional): Engine to play with, the batch engine is
+                                chunked in whole shuffle blocks.
+                                Defaults to "scalar".
+        chunk_size (int | str, optional): Number of games in each chunk,
+                                          rounded up to whole decks, or "auto"
+                                          to size chunks adaptively.
+                                          Defaults to "auto".
+        batch_size (int, optional): Most tables in a batch chunk.
+                                    Defaults to 4096.
+        done (list, optional): Ranges of shoes already played.
+                               Defaults to None.
+
+    Yields:
+        tuple: First shoe of the chunk and the shoe to stop before.
+    """
+    n_shoes = -(-n_games // games_pr_deck)
+    block = batch.shuffle_block if engine == "batch" else 1
+    for gap_start, gap_stop in remaining_ranges(n_shoes, done or []):
+        for start, stop in chunk_shoes(
+            -(-(gap_stop - gap_start) // block),
+            n_workers,
+            chunk_size=(
+                None
+                if chunk_size == "auto"
+                else -(-int(chunk_size) // (games_pr_deck * block))
+            ),
+            max_shoes=max(batch_size // block, 1) if engine == "batch" else None,
+        ):
+            yield gap_start + start * block, min(gap_start + stop * block, gap_stop)
 
 
 def play_multiple_decks(
@@ -76,9 +389,28 @@ def play_multiple_decks(
     use_split: bool,
     games_pr_deck: int,
     ceartainty: float = 0.9,
-) -> tuple[list[list[np.ndarray]], list[list[int]]]:
+    engine: str = "scalar",
+    batch_size: int = 4096,
+    session: SimulationSession | None = None,
+    seed: int | None = None,
+    chunk_size: int | str = "auto",
+    game_buffer: GameBuffer | None = None,
+    checkpoint: str | Path | None = None,
+    resume: bool = False,
+    checkpoint_interval: float = 60.0,
+    progress: bool = False,
+    shared_telemetry: SharedTelemetry | None = None,
+    profile: str | Path | None = None,
+    hand_history: HandHistory | None = None,
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
     """Play multiple decks at the same time.
 
+    Workers only receive the seed and the range of shoes to play, and build the
+    shoes themselves. With a seed the statistics are identical however many
+    workers run and however the shoes are chunked.
+
     Args:
         n_players (int): Number of players.
         n_decks (int): Number of decks.
@@ -87,35 +419,664 @@ def play_multiple_decks(
         games_pr_deck (int): Number of games each deck should be used.
         ceartainty (float, optional): How safe must a draw be to take a card.
                                       Defaults to 0.9.
+        engine (str, optional): "scalar" to play one table at a time or "batch"
+                                to play many tables in lockstep.
+                                Defaults to "scalar".
+        batch_size (int, optional): Most tables a batch task plays at once.
+                                    Defaults to 4096.
+        session (SimulationSession, optional): Session whose workers run the
+                                               games. Defaults to a session
+                                               that only lives for this call.
+        seed (int, optional): Root seed every deck is shuffled from. The same
+                              seed deals the same cards. Defaults to None.
+        chunk_size (int | str, optional): Number of games sent to a worker at a
+                                          time, rounded up to whole decks, or
+                                          "auto" to size chunks adaptively.
+                                          Defaults to "auto".
+        game_buffer (GameBuffer, optional): Shared buffer of n_games rows the
+                                            workers write the score and dealer
+                                            value of every game into.
+                                            Defaults to None.
+        checkpoint (str | Path, optional): File the progress of the run is saved
+                                           to, regularly and when it stops.
+                                           Defaults to None.
+        resume (bool, optional): Continue from the checkpoint if it exists,
+                                 only playing the shoes it is missing.
+                                 Defaults to False.
+        checkpoint_interval (float, optional): Seconds between checkpoints.
+                                               Defaults to 60.0.
+        progress (bool, optional): Print progress, hands each second and the
+                                   time left to stderr while playing.
+                                   Defaults to False.
+        shared_telemetry (SharedTelemetry, optional): Counters and stage times
+                                                      the workers add to.
+                                                      Defaults to None.
+        profile (str | Path, optional): File to write a cProfile profile of
+                                        the run to. The games are then played
+                                        in this process. Defaults to None.
+        hand_history (HandHistory, optional): Log of n_games rows, opened for
+                                              writing, the workers write the
+                                              record of every game into.
+                                              Defaults to None.
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with, scores
+                                               are then in units.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
 
     Returns:
-        all_game_scores (list): Scores from every game played.
-        all_dealer_hands (list): The hand the dealers ended with in every game.
+        stats (SimulationStats): Statistics of every game played, merged from
+                                 the workers as they finish.
     """
-    all_game_scores = []
-    all_dealer_hands = []
+    if engine not in ("scalar", "batch"):
+        raise ValueError(f"Unknown engine: {engine}")
+    if counting is not None:
+        rules.check_bet(counting.max_bet)
+    if session is None:
+        with SimulationSession() as session:
+            return play_multiple_decks(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                engine,
+                batch_size,
+                session,
+                seed,
+                chunk_size,
+                game_buffer,
+                checkpoint,
+                resume,
+                checkpoint_interval,
+                progress,
+                shared_telemetry,
+                profile,
+                hand_history,
+                counting,
+                rules,
+            )
+    if game_buffer is not None and game_buffer.n_games < n_games:
+        raise ValueError("The game buffer has fewer rows than there are games")
+    if hand_history is not None and len(hand_history) < n_games:
+        raise ValueError("The hand history has fewer rows than there are games")
+    if checkpoint is not None and seed is None:
+        # A resumed run must deal the same shoes, so it needs a root seed
+        seed = checkpoint_seed(checkpoint) if resume else None
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
 
-    # Create a list of decks
-    decks = [create_deck(n_decks=n_decks) for _ in range(int(n_games / games_pr_deck))]
+    config = {
+        "n_players": n_players,
+        "n_decks": n_decks,
+        "n_games": n_games,
+        "use_split": use_split,
+        "games_pr_deck": games_pr_deck,
+        "ceartainty": ceartainty,
+        "engine": engine,
+        "seed": seed,
+        "counting": counting.settings() if counting is not None else None,
+        "rules": rules.settings(),
+    }
+    stats = SimulationStats(n_players)
+    done: list[tuple[int, int]] = []
+    if checkpoint is not None and resume:
+        loaded = load_checkpoint(checkpoint, config)
+        if loaded is not None:
+            stats, done = loaded
+
+    if profile is not None:
+        # The profiler only sees games played in this process
+        executor: Executor = SerialExecutor()
+    else:
+        executor = session.get_executor(n_hands=n_games * n_players)
+    counters = shared_telemetry
+    if progress and counters is None:
+        counters = SharedTelemetry(executor.n_workers + 1)
+    chunks = plan_chunks(
+        n_games,
+        games_pr_deck,
+        executor.n_workers,
+        engine=engine,
+        chunk_size=chunk_size,
+        batch_size=batch_size,
+        done=done,
+    )
+    tasks = (
+        (
+            n_players,
+            n_decks,
+            n_games,
+            use_split,
+            games_pr_deck,
+            ceartainty,
+            engine,
+            seed,
+            start,
+            stop,
+            game_buffer,
+            counters,
+            hand_history,
+            counting,
+            rules,
+        )
+        for start, stop in chunks
+    )
+    reporter = None
+    if progress and counters is not None:
+        reporter = ProgressReporter(counters, n_games - stats.n_games).start()
+    profiler = cProfile.Profile() if profile is not None else None
+    last_saved = time.monotonic()
     try:
-        with Pool() as pool:
-            results = pool.starmap(
-                play_multiple_games,
-                [
-                    (n_players, n_decks, deck, use_split, games_pr_deck, ceartainty)
-                    for deck in decks
-                ],
+        if profiler is not None:
+            profiler.enable()
+        for start, stop, result in executor.imap_unordered(play_chunk, tasks):
+            stats.merge(result)
+            done.append((start, stop))
+            if (
+                checkpoint is not None
+                and time.monotonic() - last_saved > checkpoint_interval
+            ):
+                save_checkpoint(checkpoint, config, stats, done)
+                last_saved = time.monotonic()
+    except KeyboardInterrupt:
+        # Keep what the finished chunks played, then let the caller stop too
+        executor.terminate()
+        if hand_history is not None:
+            hand_history.flush()
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, config, stats, done)
+        raise
+    finally:
+        if profiler is not None and profile is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if reporter is not None:
+            reporter.stop()
+        if counters is not None and counters is not shared_telemetry:
+            counters.close()
+    if hand_history is not None:
+        hand_history.flush()
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, config, stats, done)
+
+    return stats
+
+
+def play_cached(
+    n_players: int,
+    n_decks: int,
+    n_games: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainty: float = 0.9,
+    engine: str = "scalar",
+    session: SimulationSession | None = None,
+    seed: int | None = None,
+    cache_dir: str | Path = ".cache/results",
+    counting: CountingStrategy | None = None,
+    rules: Rules = default_rules,
+) -> SimulationStats:
+    """Play multiple decks, reusing the games of earlier runs with the settings.
+
+    Results are stored under a hash of the settings and the engine version.
+    Only the shoes that are not cached yet are played, and they are added to
+    the cache. Cached runs always play whole decks, and the batch engine whole
+    shuffle blocks, so the statistics hold at least n_games games, and every
+    game cached so far if that is more.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        n_games (int): Total number of games.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainty (float, optional): How safe must a draw be to take a card.
+                                      Defaults to 0.9.
+        engine (str, optional): Engine to play with. Defaults to "scalar".
+        session (SimulationSession, optional): Session whose workers run the
+                                               games. Defaults to None.
+        seed (int, optional): Root seed every deck is shuffled from.
+                              Defaults to cache_seed.
+        cache_dir (str | Path, optional): Folder to cache results in.
+                                          Defaults to ".cache/results".
+        counting (CountingStrategy, optional): Strategy every player counts,
+                                               bets and deviates with.
+                                               Defaults to None.
+        rules (Rules, optional): Rules of every table.
+                                 Defaults to default_rules.
+
+    Returns:
+        stats (SimulationStats): Statistics of every game cached.
+    """
+    if seed is None:
+        seed = cache_seed
+    settings = {
+        "n_players": n_players,
+        "n_decks": n_decks,
+        "use_split": use_split,
+        "games_pr_deck": games_pr_deck,
+        "ceartainty": ceartainty,
+        "engine": engine,
+        "seed": seed,
+        "counting": counting.settings() if counting is not None else None,
+        "rules": rules.settings(),
+        "version": engine_version,
+    }
+    key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+    path = Path(cache_dir) / f"{key[:16]}.npz"
+
+    # Whole shuffle blocks keep topped up batch runs identical to single runs
+    block = batch.shuffle_block if engine == "batch" else 1
+    n_shoes = -(-n_games // (games_pr_deck * block)) * block
+    cached_games = 0
+    saved = read_checkpoint(path)
+    if saved is not None:
+        config, stats, done = saved
+        if not remaining_ranges(n_shoes, done):
+            return stats
+        # Grow the cached run, so only its missing shoes are played
+        cached_games = config["n_games"]
+        config["n_games"] = max(n_shoes * games_pr_deck, cached_games)
+        save_checkpoint(path, config, stats, done)
+    return play_multiple_decks(
+        n_players,
+        n_decks,
+        max(n_shoes * games_pr_deck, cached_games),
+        use_split,
+        games_pr_deck,
+        ceartainty,
+        engine=engine,
+        session=session,
+        seed=seed,
+        checkpoint=path,
+        resume=True,
+        counting=counting,
+        rules=rules,
+    )
+
+
+def play_until_precise(
+    n_players: int,
+    n_decks: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainty: float = 0.9,
+    target_se: float | Iterable[float] | None = None,
+    target_width: float | Iterable[float] | None = None,
+    confidence: float = 0.95,
+    max_games: int | None = None,
+    max_seconds: float | None = None,
+    initial_games: int = 20_000,
+    engine: str = "scalar",
+    session: SimulationSession | None = None,
+    seed: int | None = None,
+    cache_dir: str | Path | None = None,
+) -> tuple[np.ndarray, np.ndarray, int, SimulationStats]:
+    """Play games until the average score of every player is precise enough.
+
+    Games are played in rounds. After each round the number of games needed to
+    reach the target is estimated from the standard errors so far, and only the
+    missing games are played. Playing stops when every player reaches the
+    target or a budget runs out.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainty (float, optional): How safe must a draw be to take a card.
+                                      Defaults to 0.9.
+        target_se (float | Iterable, optional): Largest standard error of the
+                                                average score, for all or each
+                                                player. Defaults to None.
+        target_width (float | Iterable, optional): Largest width of the
+                                                   confidence interval, used
+                                                   when target_se is not given.
+                                                   Defaults to None.
+        confidence (float, optional): Confidence of the intervals.
+                                      Defaults to 0.95.
+        max_games (int, optional): Most games to play. Defaults to no limit.
+        max_seconds (float, optional): Longest time to play for. Defaults to no
+                                       limit.
+        initial_games (int, optional): Games in the first round.
+                                       Defaults to 20_000.
+        engine (str, optional): Engine to play with. Defaults to "scalar".
+        session (SimulationSession, optional): Session whose workers run the
+                                               games. Defaults to None.
+        seed (int, optional): Root seed every deck is shuffled from.
+                              Defaults to a random one.
+        cache_dir (str | Path, optional): Folder of cached results to reuse and
+                                          add to, see play_cached. Defaults to
+                                          a temporary folder.
+
+    Raises:
+        ValueError: If neither target_se nor target_width is given.
+
+    Returns:
+        mean (np.ndarray): Average score of each player.
+        interval (np.ndarray): Lower and upper bound of the confidence interval
+                               of each player.
+        n_hands (int): Number of hands played, one for each player in a game.
+        stats (SimulationStats): Statistics of every game played.
+    """
+    if target_se is None:
+        if target_width is None:
+            raise ValueError("Give either target_se or target_width")
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        target_se = np.asarray(target_width, dtype=float) / (2 * z)
+    targets = np.broadcast_to(np.asarray(target_se, dtype=float), (n_players,))
+    if cache_dir is None:
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            if seed is None:
+                seed = int(np.random.SeedSequence().generate_state(1)[0])
+            return play_until_precise(
+                n_players,
+                n_decks,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                targets,
+                None,
+                confidence,
+                max_games,
+                max_seconds,
+                initial_games,
+                engine,
+                session,
+                seed,
+                temporary_dir,
             )
 
-        for game_scores, dealer_hands in results:
-            all_game_scores.extend(game_scores)
-            all_dealer_hands.extend(dealer_hands)
-        return all_game_scores, all_dealer_hands
-    except KeyboardInterrupt:
-        pool.terminate()
-        pool.join()
+    if seed is None:
+        seed = cache_seed
+    # Cached runs play whole decks, and the batch engine whole shuffle blocks
+    block_games = games_pr_deck * (batch.shuffle_block if engine == "batch" else 1)
+    start = time.monotonic()
+    n_games = initial_games if max_games is None else min(initial_games, max_games)
+    played = 0
+    while True:
+        round_start = time.monotonic()
+        stats = None
+        if max_games is None or -(-n_games // block_games) * block_games <= max_games:
+            stats = play_cached(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                engine=engine,
+                session=session,
+                seed=seed,
+                cache_dir=cache_dir,
+            )
+        if stats is None or (max_games is not None and stats.n_games > max_games):
+            # The cache would pass the budget, so exactly the games asked for
+            # are played, dealing the same shoes as the cached run
+            stats = play_multiple_decks(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                engine=engine,
+                session=session,
+                seed=seed,
+            )
+        elapsed = time.monotonic() - start
+        if (stats.std_error <= targets).all():
+            break
+        if max_games is not None and stats.n_games >= max_games:
+            break
+        if max_seconds is not None and elapsed >= max_seconds:
+            break
+
+        # The standard error falls with the square root of the games, the
+        # estimate is padded a little as the errors so far are noisy too
+        needed = stats.n_games * np.max((stats.std_error / targets) ** 2) * 1.1
+        next_games = min(max(int(needed), stats.n_games + 1), 4 * stats.n_games)
+        if max_games is not None:
+            next_games = min(next_games, max_games)
+        if max_seconds is not None:
+            rate = (stats.n_games - played) / max(time.monotonic() - round_start, 1e-9)
+            next_games = min(
+                next_games, stats.n_games + int(rate * (max_seconds - elapsed))
+            )
+        if next_games <= stats.n_games:
+            break
+        played, n_games = stats.n_games, next_games
+
+    return (
+        stats.mean,
+        stats.confidence_interval(confidence),
+        stats.n_games * n_players,
+        stats,
+    )
+
 
-    return all_game_scores, all_dealer_hands
+def sweep_ceartainty(
+    n_players: int,
+    n_decks: int,
+    n_games: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainties: Iterable[float],
+    seed: int | None = None,
+    engine: str = "scalar",
+    session: SimulationSession | None = None,
+    checkpoint_dir: str | Path | None = None,
+    resume: bool = False,
+    cache_dir: str | Path | None = None,
+) -> list[tuple[float, np.ndarray]]:
+    """Play the same decks for every ceartainty.
+
+    Every ceartainty is dealt the same shoe orderings, so the differences between
+    neighbouring ceartainties come from the decisions rather than the cards.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        n_games (int): Number of games for each ceartainty.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainties (Iterable): Ceartainties to play.
+        seed (int, optional): Root seed of the shared shoes. Defaults to a
+                              random one.
+        engine (str, optional): Engine to play with. Defaults to "scalar".
+        session (SimulationSession, optional): Session whose workers run the
+                                               games. Defaults to None.
+        checkpoint_dir (str | Path, optional): Folder with a checkpoint for
+                                               each ceartainty.
+                                               Defaults to None.
+        resume (bool, optional): Continue from the checkpoints, skipping the
+                                 games already played. Defaults to False.
+        cache_dir (str | Path, optional): Folder of cached results to reuse and
+                                          add to, see play_cached. Replaces
+                                          checkpoints. Defaults to None.
+
+    Returns:
+        ceartainty_results (list): Ceartainty and average score of each player.
+    """
+    if seed is None and checkpoint_dir is not None and resume:
+        # Continue with the seed the interrupted sweep was started with
+        for path in sorted(Path(checkpoint_dir).glob("ceartainty_*.npz")):
+            seed = checkpoint_seed(path)
+            break
+    if seed is None and cache_dir is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    ceartainty_results = []
+    for ceartainty in ceartainties:
+        if cache_dir is not None:
+            stats = play_cached(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                engine=engine,
+                session=session,
+                seed=seed,
+                cache_dir=cache_dir,
+            )
+        else:
+            stats = play_multiple_decks(
+                n_players,
+                n_decks,
+                n_games,
+                use_split,
+                games_pr_deck,
+                ceartainty,
+                engine=engine,
+                session=session,
+                seed=seed,
+                checkpoint=(
+                    Path(checkpoint_dir) / f"ceartainty_{ceartainty:.4f}.npz"
+                    if checkpoint_dir is not None
+                    else None
+                ),
+                resume=resume,
+            )
+        ceartainty_results.append((ceartainty, stats.mean))
+    return ceartainty_results
+
+
+def optimize_ceartainty(
+    n_players: int,
+    n_decks: int,
+    use_split: bool,
+    games_pr_deck: int,
+    ceartainties: Iterable[float] = tuple(np.arange(0, 1.05, 0.05)),
+    max_games: int = 100_000,
+    initial_games: int = 2_000,
+    confidence: float = 0.95,
+    tolerance: float = 0.0,
+    engine: str = "scalar",
+    session: SimulationSession | None = None,
+    seed: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Find the best ceartainty of each player by racing the candidates.
+
+    The candidates still in the race play the same new shoes every round, each
+    round twice as many games as the one before. A candidate drops out for a
+    player once the confidence interval of its paired difference to the
+    leader of that player is below tolerance. Candidates that are out for
+    every player stop playing, so the games go to the candidates that cannot
+    be told apart yet. Playing the same shoes makes the paired differences far
+    less noisy than the scores themselves.
+
+    Args:
+        n_players (int): Number of players.
+        n_decks (int): Number of decks.
+        use_split (bool): Should split be used.
+        games_pr_deck (int): Number of games each deck should be used.
+        ceartainties (Iterable, optional): Candidates to race.
+                                           Defaults to 0 to 1 in steps of 0.05.
+        max_games (int, optional): Most games any candidate plays.
+                                   Defaults to 100_000.
+        initial_games (int, optional): Games in the first round.
+                                       Defaults to 2_000.
+        confidence (float, optional): Confidence of the intervals.
+                                      Defaults to 0.95.
+        tolerance (float, optional): Difference in average score small enough
+                                     not to matter. Defaults to 0.0.
+        engine (str, optional): Engine to play with. Defaults to "scalar".
+        session (SimulationSession, optional): Session whose workers run the
+                                               games. Defaults to None.
+        seed (int, optional): Root seed of the shared shoes. Defaults to a
+                              random one.
+
+    Returns:
+        best (np.ndarray): Best ceartainty of each player.
+        mean (np.ndarray): Average score of each player at its best ceartainty.
+        interval (np.ndarray): Lower and upper bound of the confidence interval
+                               of each of those averages.
+        n_hands (int): Number of hands played, one for each player in a game.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    values = np.array(list(ceartainties), dtype=float)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    alive = np.ones((len(values), n_players), dtype=bool)
+    # Sums of the scores and of the products of the scores of every pair of
+    # candidates, enough to get the variance of any paired difference
+    sums = np.zeros((len(values), n_players))
+    products = np.zeros((n_players, len(values), len(values)))
+    n_games = 0
+    n_hands = 0
+    round_games = initial_games
+    round_index = 0
+    while n_games < max_games and alive.sum(axis=0).max() > 1:
+        playing = np.flatnonzero(alive.any(axis=1))
+        n_round = min(round_games, max_games - n_games)
+        # Every round deals new shoes, the same for every candidate
+        round_sequence = np.random.SeedSequence(seed, spawn_key=(round_index,))
+        round_seed = int(round_sequence.generate_state(1)[0])
+        scores = np.empty((len(playing), n_round, n_players))
+        with GameBuffer(n_round, n_players) as game_buffer:
+            for row, candidate in enumerate(playing):
+                play_multiple_decks(
+                    n_players,
+                    n_decks,
+                    n_round,
+                    use_split,
+                    games_pr_deck,
+                    values[candidate],
+                    engine=engine,
+                    session=session,
+                    seed=round_seed,
+                    game_buffer=game_buffer,
+                )
+                scores[row] = game_buffer.scores[:n_round]
+        sums[playing] += scores.sum(axis=1)
+        products[:, playing[:, None], playing] += np.einsum(
+            "anp,bnp->pab", scores, scores
+        )
+        n_games += n_round
+        n_hands += len(playing) * n_round * n_players
+
+        for player in range(n_players):
+            candidates = np.flatnonzero(alive[:, player])
+            means = sums[candidates, player] / n_games
+            leader = candidates[np.argmax(means)]
+            difference = means - sums[leader, player] / n_games
+            square_mean = (
+                products[player, candidates, candidates]
+                + products[player, leader, leader]
+                - 2 * products[player, candidates, leader]
+            ) / n_games
+            variance = np.maximum(square_mean - difference**2, 0) * (
+                n_games / max(n_games - 1, 1)
+            )
+            std_error = np.sqrt(variance / n_games)
+            # Candidates that play exactly like the leader can never be told
+            # apart from it, so they drop out too
+            out = (candidates != leader) & (
+                (difference + z * std_error < tolerance)
+                | ((std_error == 0) & (difference <= 0))
+            )
+            alive[candidates[out], player] = False
+        round_games *= 2
+        round_index += 1
+
+    best = np.empty(n_players)
+    mean = np.empty(n_players)
+    interval = np.empty((n_players, 2))
+    for player in range(n_players):
+        candidates = np.flatnonzero(alive[:, player])
+        leader = candidates[np.argmax(sums[candidates, player])]
+        best[player] = values[leader]
+        mean[player] = sums[leader, player] / n_games
+        variance = max(
+            products[player, leader, leader] / n_games - mean[player] ** 2, 0
+        )
+        std_error = np.sqrt(variance / max(n_games - 1, 1))
+        interval[player] = mean[player] - z * std_error, mean[player] + z * std_error
+    return best, mean, interval, n_hands
 
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+"""Table rules, compiled into the lookup tables the engines index."""
+
+from typing import Any
+
+import numpy as np
+
+from src.counting import bet_step
+from src.lookups import (
+    action_double,
+    action_play,
+    action_surrender,
+    compile_decisions,
+    double_down_table_hard,
+    double_down_table_soft,
+    n_actions,
+    n_outcomes,
+    n_roles,
+    n_states,
+    outcome_blackjack,
+    role_kept,
+    role_split_off,
+    role_unsplit,
+    soft_states,
+    split_combinations,
+    surrender_table_hard,
+    surrender_table_hard_h17,
+)
+from src.stats import max_payout, payout_step
+
+
+class Rules:
+    """Rules of a table, compiled once so the engines never branch on them.
+
+    The dealer draws when dealer_draws is True for the state of the hand, and
+    takes hole_cards before the players act. The actions of a player come from
+    hand_decisions for the role of the hand, and index plays may only take the
+    actions in allowed_actions. A hand is settled by looking up its outcome
+    against the dealers in outcomes. The other rules are plain constants.
+    """
+
+    def __init__(
+        self,
+        hit_soft_17: bool = False,
+        blackjack_payout: float = 1.5,
+        double_after_split: bool = False,
+        max_splits: int = 1,
+        surrender: bool = False,
+        penetration: float = 0.5,
+        dealer_peek: bool = False,
+        deal_split_cards: bool = False,
+        split_blackjack: bool = True,
+        blackjack_beats_21: bool = False,
+        tables: dict[str, dict[int, dict[int, bool]]] | None = None,
+    ) -> None:
+        """Compile the rules.
+
+        Args:
+            hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                          Defaults to False.
+            blackjack_payout (float, optional): Payout of a blackjack.
+                                                Defaults to 1.5.
+            double_after_split (bool, optional): May a split hand double down.
+                                                 Defaults to False.
+            max_splits (int, optional): Most times a player may split in a
+                                        game, 0 to never split. Defaults to 1.
+            surrender (bool, optional): May a player give up half the bet on
+                                        the first two cards. Defaults to False.
+            penetration (float, optional): Fraction of the shoe dealt before it
+                                           is reshuffled. Defaults to 0.5.
+            dealer_peek (bool, optional): Does the dealer take a hole card and
+                                          end the game at once on a blackjack.
+                                          Defaults to False.
+            deal_split_cards (bool, optional): Deal both hands of a split pair
+                                               their second card at once, so
+                                               they play like any two card
+                                               hand. Without it the hand split
+                                               off is drawn to without doubling
+                                               and the hand kept in place plays
+                                               on like a fresh hand.
+                                               Defaults to False.
+            split_blackjack (bool, optional): Does 21 on the first two cards of
+                                              a split hand pay as a blackjack.
+                                              Defaults to True.
+            blackjack_beats_21 (bool, optional): Does a dealer blackjack beat a
+                                                 21 that is not paid as a
+                                                 blackjack, instead of a push.
+                                                 Defaults to False.
+            tables (dict, optional): When to split and double, laid out like
+                                     src.solver.solve_tables returns them.
+                                     Defaults to the tables of src.lookups.
+
+        Raises:
+            ValueError: If the blackjack payout is not a positive multiple of
+                        a tenth, a setting is out of range, or a one unit bet
+                        could win more than the statistics hold.
+        """
+        # Every bet times the payout must land on a column of the statistics
+        steps = blackjack_payout * bet_step / payout_step
+        if blackjack_payout <= 0 or abs(steps - round(steps)) > 1e-9:
+            raise ValueError(
+                f"The blackjack payout must be a multiple of {payout_step / bet_step}"
+            )
+        if max_splits < 0:
+            raise ValueError("max_splits can not be negative")
+        if not 0 < penetration <= 1:
+            raise ValueError("The penetration must be above 0 and at most 1")
+        if (double_after_split or max_splits > 1) and not deal_split_cards:
+            raise ValueError(
+                "double_after_split and max_splits above 1 need deal_split_cards"
+            )
+        self.hit_soft_17 = hit_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.double_after_split = double_after_split
+        self.max_splits = max_splits
+        self.surrender = surrender
+        self.penetration = penetration
+        self.dealer_peek = dealer_peek
+        self.deal_split_cards = deal_split_cards
+        self.split_blackjack = split_blackjack
+        self.blackjack_beats_21 = blackjack_beats_21
+        self.tables = tables
+        self.hole_cards = int(dealer_peek)
+        self.split_cards = int(deal_split_cards)
+        # Most a one unit bet can win or lose, every hand of a player doubled
+        # or paid as a blackjack
+        self.max_stake = (max_splits + 1) * max(2.0, blackjack_payout)
+        self.check_bet(1.0)
+
+        # Hard totals first, then soft totals, like the decision table
+        totals = np.arange(n_states)
+        totals = np.where(totals >= soft_states, totals - soft_states, totals)
+        self.dealer_draws = totals < 17
+        if hit_soft_17:
+            self.dealer_draws[soft_states + 17] = True
+
+        surrender_tables = []
+        if surrender:
+            surrender_tables.append(surrender_table_hard)
+            if hit_soft_17:
+                surrender_tables.append(surrender_table_hard_h17)
+        surrenders: dict[int, dict[int, bool]] = {}
+        for table in surrender_tables:
+            for total, row in table.items():
+                surrenders.setdefault(total, {}).update(row)
+        compiled: dict[str, Any] = tables or {
+            "split": split_combinations,
+            "double_soft": double_down_table_soft,
+            "double_hard": double_down_table_hard,
+        }
+        self.decisions = compile_decisions(
+            compiled["split"],
+            compiled["double_soft"],
+            compiled["double_hard"],
+            surrenders,
+        )
+
+        # Only the first two cards of a hand that was not split may surrender
+        self.allowed_actions = np.ones((n_roles, n_actions), dtype=bool)
+        self.allowed_actions[:, action_surrender] = False
+        self.allowed_actions[role_unsplit, action_surrender] = surrender
+        self.allowed_actions[role_kept, action_double] = (
+            double_after_split or not deal_split_cards
+        )
+        self.allowed_actions[role_split_off, action_double] = double_after_split
+        self.hand_decisions = np.stack([self.decisions] * n_roles)
+        for role in range(n_roles):
+            for action in range(n_actions):
+                if not self.allowed_actions[role, action]:
+                    self.hand_decisions[role][
+                        self.hand_decisions[role] == action
+                    ] = action_play
+
+        self.pays_blackjack = np.array([True, split_blackjack, split_blackjack])
+        scores = np.minimum(np.arange(n_outcomes), 21)
+        self.outcomes = np.zeros((n_roles, n_outcomes, n_outcomes))
+        for role in range(n_roles):
+            for player in range(n_outcomes):
+                for dealer in range(n_outcomes):
+                    blackjack = (
+                        player == outcome_blackjack and self.pays_blackjack[role]
+                    )
+                    dealer_blackjack = dealer == outcome_blackjack
+                    if blackjack and not dealer_blackjack:
+                        outcome = blackjack_payout
+                    elif dealer_blackjack and not blackjack and blackjack_beats_21:
+                        outcome = -1.0
+                    elif scores[player] > scores[dealer]:
+                        outcome = 1.0
+                    elif scores[player] == scores[dealer] and scores[player] != 0:
+                        outcome = 0.0
+                    else:
+                        outcome = -1.0
+                    self.outcomes[role, player, dealer] = outcome
+
+    def check_bet(self, units: float) -> None:
+        """Check that every payout of a bet fits in the statistics.
+
+        Args:
+            units (float): Largest bet in units.
+
+        Raises:
+            ValueError: If the bet could win or lose more than max_payout.
+        """
+        if units * self.max_stake > max_payout:
+            raise ValueError(
+                f"A bet of {units} units with {self.max_splits} splits could pay "
+                f"{units * self.max_stake}, more than {max_payout}"
+            )
+
+    def settings(self) -> dict[str, Any]:
+        """Describe the rules, ready for json.
+
+        Returns:
+            dict: Every rule, and the decisions they were compiled into.
+        """
+        return {
+            "hit_soft_17": self.hit_soft_17,
+            "blackjack_payout": self.blackjack_payout,
+            "double_after_split": self.double_after_split,
+            "max_splits": self.max_splits,
+            "surrender": self.surrender,
+            "penetration": self.penetration,
+            "dealer_peek": self.dealer_peek,
+            "deal_split_cards": self.deal_split_cards,
+            "split_blackjack": self.split_blackjack,
+            "blackjack_beats_21": self.blackjack_beats_21,
+            "decisions": self.decisions.tolist(),
+        }
+
+
+# The rules the engines play by unless told otherwise
+default_rules = Rules()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,471 @@
+"""Warm simulation service answering queries over a local socket."""
+
+import argparse
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from src.counting import CountingStrategy, illustrious_18, systems
+from src.playing import play_cached
+from src.rules import Rules
+from src.session import PoolExecutor, SimulationSession
+from src.stats import SimulationStats
+
+# Settings of a query, and the value used when a query leaves one out
+default_query: dict[str, Any] = {
+    "n_players": 1,
+    "n_decks": 6,
+    "n_games": 100_000,
+    "use_split": True,
+    "games_pr_deck": 40,
+    "ceartainty": 0.9,
+    "engine": "batch",
+    "seed": None,
+    "rules": {},
+    "counting": None,
+    "confidence": 0.95,
+}
+# Largest request body read, queries are small
+max_body = 1 << 16
+reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Server Error"}
+
+
+def parse_query(query: Any) -> dict[str, Any]:
+    """Fill in the settings a query leaves out.
+
+    Args:
+        query (Any): Decoded json body of the query.
+
+    Raises:
+        ValueError: If the query is not an object, or has unknown or invalid
+                    settings.
+
+    Returns:
+        config (dict): Every setting of default_query, converted to the type of
+                       its default, so equal queries give equal configs.
+    """
+    if not isinstance(query, dict):
+        raise ValueError("The query must be a json object")
+    unknown = set(query) - set(default_query)
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    config = {**default_query, **query}
+    for name in ("n_players", "n_decks", "n_games", "games_pr_deck"):
+        config[name] = int(config[name])
+        if config[name] < 1:
+            raise ValueError(f"{name} must be at least 1")
+    for name in ("ceartainty", "confidence"):
+        config[name] = float(config[name])
+    config["use_split"] = bool(config["use_split"])
+    if config["engine"] not in ("scalar", "batch"):
+        raise ValueError(f"Unknown engine: {config['engine']}")
+    if config["seed"] is not None:
+        config["seed"] = int(config["seed"])
+    if not isinstance(config["rules"], dict):
+        raise ValueError("The rules must be a json object")
+    if config["counting"] is not None and not isinstance(config["counting"], dict):
+        raise ValueError("The counting strategy must be a json object or null")
+    return config
+
+
+def summarize(stats: SimulationStats, confidence: float) -> dict[str, Any]:
+    """Describe the statistics of a run, ready for json.
+
+    Args:
+        stats (SimulationStats): Statistics of the run.
+        confidence (float): Chance the intervals hold the true average.
+
+    Returns:
+        dict: Games played and the expected value of each player, with its
+              standard error and confidence interval.
+    """
+    return {
+        "n_games": stats.n_games,
+        "mean": stats.mean.tolist(),
+        "std_error": stats.std_error.tolist(),
+        "confidence_interval": stats.confidence_interval(confidence).tolist(),
+    }
+
+
+class SimulationService:
+    """Answers queries from warm workers, sharing runs and caching results.
+
+    Queries with the same settings share one run while it plays, and the
+    statistics are kept in memory, so repeats are answered without playing.
+    A query for more games than are known tops the cached run up. Runs are
+    played one at a time by the workers of the session, on top of the result
+    cache of play_cached, so results also outlive the service.
+    """
+
+    def __init__(
+        self,
+        session: SimulationSession | None = None,
+        cache_dir: str | Path = ".cache/results",
+        max_cached: int = 1024,
+    ) -> None:
+        """Set up the service.
+
+        Args:
+            session (SimulationSession, optional): Session whose workers play
+                                                   the runs. Defaults to a new
+                                                   one owned by the service.
+            cache_dir (str | Path, optional): Folder to cache results in.
+                                              Defaults to ".cache/results".
+            max_cached (int, optional): Most runs kept in memory.
+                                        Defaults to 1024.
+        """
+        self.owns_session = session is None
+        self.session = session if session is not None else SimulationSession()
+        self.cache_dir = cache_dir
+        self.max_cached = max_cached
+        # A run already uses every worker, so runs are queued one at a time
+        self._runner = ThreadPoolExecutor(max_workers=1)
+        self._results: OrderedDict[str, SimulationStats] = OrderedDict()
+        self._running: dict[str, asyncio.Future[None]] = {}
+        self._rules: dict[str, Rules] = {}
+        self._strategies: dict[str, CountingStrategy] = {}
+        self.n_queries = 0
+        self.n_runs = 0
+
+    def warm(self) -> None:
+        """Start the workers and compile the default tables before any query."""
+        executor = self.session.get_executor(n_hands=self.session.serial_threshold)
+        if isinstance(executor, PoolExecutor):
+            # Reading the pool starts it
+            executor.pool
+        self.compile_rules({})
+
+    def compile_rules(self, settings: dict[str, Any]) -> Rules:
+        """Get the rules of a query, compiled once for every query using them.
+
+        Args:
+            settings (dict): Arguments of Rules.
+
+        Raises:
+            ValueError: If a setting is unknown, out of range or the tables,
+                        which only code may set.
+
+        Returns:
+            Rules: The compiled rules.
+        """
+        if "tables" in settings:
+            raise ValueError("The tables of the rules can not be set by a query")
+        key = json.dumps(settings, sort_keys=True)
+        if key not in self._rules:
+            try:
+                self._rules[key] = Rules(**settings)
+            except TypeError as error:
+                raise ValueError(f"Invalid rules: {error}") from error
+        return self._rules[key]
+
+    def compile_counting(
+        self, settings: dict[str, Any] | None
+    ) -> CountingStrategy | None:
+        """Get the counting strategy of a query, compiled once.
+
+        Args:
+            settings (dict, optional): Name of the "system", its "bet_spread" as
+                                       pairs of true count and bet, and its
+                                       "index_plays", or "illustrious_18".
+
+        Raises:
+            ValueError: If the system is unknown or a bet is invalid.
+
+        Returns:
+            CountingStrategy: The strategy, None without settings.
+        """
+        if settings is None:
+            return None
+        key = json.dumps(settings, sort_keys=True)
+        if key not in self._strategies:
+            if settings.get("system") not in systems:
+                raise ValueError(f"Unknown counting system: {settings.get('system')}")
+            index_plays = settings.get("index_plays", [])
+            if index_plays == "illustrious_18":
+                index_plays = illustrious_18
+            self._strategies[key] = CountingStrategy(
+                systems[settings["system"]],
+                dict(settings.get("bet_spread", [])),
+                [tuple(play) for play in index_plays],
+            )
+        return self._strategies[key]
+
+    def run_key(
+        self,
+        config: dict[str, Any],
+        rules: Rules,
+        counting: CountingStrategy | None,
+    ) -> str:
+        """Get the key of the run answering a query.
+
+        Args:
+            config (dict): Settings of the query.
+            rules (Rules): Compiled rules of the query.
+            counting (CountingStrategy, optional): Strategy of the query.
+
+        Returns:
+            str: Hash of every setting that changes the games, so queries
+                 asking for the same games share a run whatever they spell
+                 out.
+        """
+        settings = {
+            name: value
+            for name, value in config.items()
+            if name not in ("n_games", "confidence", "rules", "counting")
+        }
+        settings["rules"] = rules.settings()
+        settings["counting"] = counting.settings() if counting is not None else None
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def _play(
+        self,
+        config: dict[str, Any],
+        rules: Rules,
+        counting: CountingStrategy | None,
+    ) -> SimulationStats:
+        """Play a run, topping up its cached games.
+
+        Args:
+            config (dict): Settings of the query.
+            rules (Rules): Compiled rules of the query.
+            counting (CountingStrategy, optional): Strategy of the query.
+
+        Returns:
+            SimulationStats: Statistics of every game cached for the settings.
+        """
+        return play_cached(
+            config["n_players"],
+            config["n_decks"],
+            config["n_games"],
+            config["use_split"],
+            config["games_pr_deck"],
+            config["ceartainty"],
+            engine=config["engine"],
+            session=self.session,
+            seed=config["seed"],
+            cache_dir=self.cache_dir,
+            counting=counting,
+            rules=rules,
+        )
+
+    async def query(self, query: Any) -> dict[str, Any]:
+        """Answer a query.
+
+        Args:
+            query (Any): Decoded json body of the query, any setting of
+                         default_query.
+
+        Raises:
+            ValueError: If the query is invalid, or a setting has the wrong
+                        type.
+
+        Returns:
+            dict: Summary of the run, see summarize, and whether it was
+                  answered from memory without playing.
+        """
+        self.n_queries += 1
+        try:
+            config = parse_query(query)
+            rules = self.compile_rules(config["rules"])
+            counting = self.compile_counting(config["counting"])
+        except (TypeError, KeyError) as error:
+            # Settings of the wrong type, like null for a number
+            raise ValueError(f"Invalid query: {error}") from error
+        key = self.run_key(config, rules, counting)
+        n_games = config["n_games"]
+
+        played = False
+        while True:
+            stats = self._results.get(key)
+            if stats is not None and stats.n_games >= n_games:
+                self._results.move_to_end(key)
+                summary = summarize(stats, config["confidence"])
+                summary["cached"] = not played
+                return summary
+            running = self._running.get(key)
+            if running is None:
+                break
+            # Share the run playing the settings, then play more if it is short
+            await asyncio.wait([running])
+            running.result()
+            played = True
+
+        loop = asyncio.get_running_loop()
+        running = loop.create_future()
+        self._running[key] = running
+        try:
+            stats = await loop.run_in_executor(
+                self._runner, self._play, config, rules, counting
+            )
+            self.n_runs += 1
+            self._results[key] = stats
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+            running.set_result(None)
+        except Exception as error:
+            running.set_exception(error)
+            # Mark the error as seen, the queries sharing the run raise it
+            running.exception()
+            raise
+        finally:
+            del self._running[key]
+        summary = summarize(stats, config["confidence"])
+        summary["cached"] = False
+        return summary
+
+    def health(self) -> dict[str, Any]:
+        """Describe the state of the service.
+
+        Returns:
+            dict: Queries answered, runs played, runs in memory and running.
+        """
+        return {
+            "status": "ok",
+            "n_queries": self.n_queries,
+            "n_runs": self.n_runs,
+            "cached": len(self._results),
+            "running": len(self._running),
+        }
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the http requests of a connection until it closes.
+
+        POST /query takes a json query and answers with its summary, GET
+        /health describes the service.
+
+        Args:
+            reader (asyncio.StreamReader): Incoming side of the connection.
+            writer (asyncio.StreamWriter): Outgoing side of the connection.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > max_body:
+                    await self._respond(writer, 400, {"error": "Body too large"})
+                    break
+                body = await reader.readexactly(length)
+                status, response = await self._route(method, path, body)
+                await self._respond(writer, status, response)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[int, dict[str, Any]]:
+        """Answer a request.
+
+        Args:
+            method (str): Http method.
+            path (str): Requested path.
+            body (bytes): Body of the request.
+
+        Returns:
+            status (int): Http status code.
+            response (dict): Body of the response.
+        """
+        if method == "GET" and path == "/health":
+            return 200, self.health()
+        if method != "POST" or path != "/query":
+            return 404, {"error": f"No route for {method} {path}"}
+        try:
+            return 200, await self.query(json.loads(body or b"{}"))
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except Exception as error:
+            return 500, {"error": repr(error)}
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, status: int, response: dict[str, Any]
+    ) -> None:
+        """Write a json response.
+
+        Args:
+            writer (asyncio.StreamWriter): Outgoing side of the connection.
+            status (int): Http status code.
+            response (dict): Body of the response.
+        """
+        body = json.dumps(response).encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {reasons[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+
+    async def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: str | Path | None = None,
+    ) -> None:
+        """Serve queries until cancelled.
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 8765.
+            unix_socket (str | Path, optional): Path of a unix socket to listen
+                                                on instead of host and port.
+                                                Defaults to None.
+        """
+        self.warm()
+        if unix_socket is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_socket)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        """Stop taking runs, and release the workers of an owned session."""
+        self._runner.shutdown(wait=True)
+        if self.owns_session:
+            self.session.close()
+
+
+def main() -> None:
+    """Run the service until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve simulation queries.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="listen on a unix socket instead")
+    parser.add_argument("--cache-dir", default=".cache/results")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    with SimulationSession(processes=args.processes) as session:
+        service = SimulationService(session, cache_dir=args.cache_dir)
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Reusable executors for running simulation tasks."""
+
+import os
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Any, Callable, Iterable, Iterator
+
+
+def _call(task: tuple[Callable[..., Any], tuple[Any, ...]]) -> Any:
+    """Call a function with its arguments, so pools can map over both.
+
+    Args:
+        task (tuple): Function and its arguments.
+
+    Returns:
+        Any: The result of the call.
+    """
+    func, args = task
+    return func(*args)
+
+
+class Executor(ABC):
+    """Runs simulation tasks, serially or on a pool of workers."""
+
+    def __init__(
+        self, processes: int | None = None, start_method: str | None = None
+    ) -> None:
+        """Prepare the executor.
+
+        Args:
+            processes (int, optional): Number of workers. Defaults to one per
+                                       core.
+            start_method (str, optional): How worker processes are started,
+                                          "fork", "spawn" or "forkserver".
+                                          Defaults to the platform default.
+        """
+        self.processes = processes
+        self.start_method = start_method
+
+    @abstractmethod
+    def starmap(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> list[Any]:
+        """Call a function with every set of arguments.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call.
+
+        Returns:
+            list: The result of each call, in order.
+        """
+
+    @abstractmethod
+    def imap_unordered(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> Iterator[Any]:
+        """Call a function with every set of arguments, yielding as they finish.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call, consumed lazily.
+
+        Yields:
+            Any: The result of each call, in the order they finish.
+        """
+
+    @property
+    def n_workers(self) -> int:
+        """int: Number of tasks that run at the same time."""
+        return self.processes or os.cpu_count() or 1
+
+    def close(self) -> None:
+        """Release the workers after their tasks are done."""
+
+    def terminate(self) -> None:
+        """Stop the workers without waiting for their tasks."""
+        self.close()
+
+
+class SerialExecutor(Executor):
+    """Runs every task in the calling process."""
+
+    def starmap(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> list[Any]:
+        """Call a function with every set of arguments.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call.
+
+        Returns:
+            list: The result of each call, in order.
+        """
+        return [func(*args) for args in iterable]
+
+    def imap_unordered(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> Iterator[Any]:
+        """Call a function with every set of arguments, yielding as they finish.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call, consumed lazily.
+
+        Yields:
+            Any: The result of each call, in order.
+        """
+        for args in iterable:
+            yield func(*args)
+
+    @property
+    def n_workers(self) -> int:
+        """int: Number of tasks that run at the same time."""
+        return 1
+
+
+class PoolExecutor(Executor):
+    """Runs tasks on a pool that is started once and kept warm."""
+
+    def __init__(
+        self, processes: int | None = None, start_method: str | None = None
+    ) -> None:
+        """Prepare the executor, the pool itself is started on first use.
+
+        Args:
+            processes (int, optional): Number of workers. Defaults to one per
+                                       core.
+            start_method (str, optional): How worker processes are started,
+                                          "fork", "spawn" or "forkserver".
+                                          Defaults to the platform default.
+        """
+        self.processes = processes
+        self.start_method = start_method
+        self._pool: Any = None
+
+    @abstractmethod
+    def _start_pool(self) -> Any:
+        """Start the worker pool.
+
+        Returns:
+            Pool: The started pool.
+        """
+
+    @property
+    def pool(self) -> Any:
+        """Pool: The worker pool, started if it is not running."""
+        if self._pool is None:
+            self._pool = self._start_pool()
+        return self._pool
+
+    def starmap(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> list[Any]:
+        """Call a function with every set of arguments on the pool.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call.
+
+        Returns:
+            list: The result of each call, in order.
+        """
+        results: list[Any] = self.pool.starmap(func, iterable)
+        return results
+
+    def imap_unordered(
+        self, func: Callable[..., Any], iterable: Iterable[tuple[Any, ...]]
+    ) -> Iterator[Any]:
+        """Call a function with every set of arguments, yielding as they finish.
+
+        Args:
+            func (Callable): Function to call.
+            iterable (Iterable): Arguments for each call, consumed lazily.
+
+        Yields:
+            Any: The result of each call, in the order they finish.
+        """
+        yield from self.pool.imap_unordered(_call, ((func, args) for args in iterable))
+
+    def close(self) -> None:
+        """Release the workers after their tasks are done."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def terminate(self) -> None:
+        """Stop the workers without waiting for their tasks."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+class ThreadExecutor(PoolExecutor):
+    """Runs tasks on a warm pool of threads."""
+
+    def _start_pool(self) -> Any:
+        """Start the worker pool.
+
+        Returns:
+            ThreadPool: The started pool.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        return ThreadPool(self.processes)
+
+
+class ProcessExecutor(PoolExecutor):
+    """Runs tasks on a warm pool of processes."""
+
+    def _start_pool(self) -> Any:
+        """Start the worker pool.
+
+        Returns:
+            Pool: The started pool.
+        """
+        import multiprocessing
+
+        return multiprocessing.get_context(self.start_method).Pool(self.processes)
+
+
+executors: dict[str, type[Executor]] = {
+    "serial": SerialExecutor,
+    "thread": ThreadExecutor,
+    "process": ProcessExecutor,
+}
+
+
+class SimulationSession:
+    """Keeps executors alive across many simulation calls.
+
+    Use it as a context manager so the workers are released at the end::
+
+        with SimulationSession() as session:
+            play_multiple_decks(..., session=session)
+    """
+
+    def __init__(
+        self,
+        executor: str | Executor = "auto",
+        processes: int | None = None,
+        serial_threshold: int = 20000,
+        start_method: str | None = None,
+    ) -> None:
+        """Set up the session.
+
+        Args:
+            executor (str | Executor, optional): "serial", "thread", "process",
+                                                 an executor instance, or "auto"
+                                                 to choose per job.
+                                                 Defaults to "auto".
+            processes (int, optional): Number of workers. Defaults to one per
+                                       core.
+            serial_threshold (int, optional): In auto mode, jobs with fewer hands
+                                              than this run serially.
+                                              Defaults to 20000.
+            start_method (str, optional): How worker processes are started,
+                                          "fork", "spawn" or "forkserver".
+                                          Defaults to the platform default.
+        """
+        if isinstance(executor, str) and executor not in [*executors, "auto"]:
+            raise ValueError(f"Unknown executor: {executor}")
+        self.executor = executor
+        self.processes = processes
+        self.serial_threshold = serial_threshold
+        self.start_method = start_method
+        self._executors: dict[str, Executor] = {}
+
+    def get_executor(self, n_hands: int = 0) -> Executor:
+        """Get the executor that should run a job.
+
+        Args:
+            n_hands (int, optional): Number of hands in the job. Defaults to 0.
+
+        Returns:
+            executor (Executor): Executor to run the job on.
+        """
+        if isinstance(self.executor, Executor):
+            return self.executor
+        name = self.executor
+        if name == "auto":
+            n_workers = self.processes or os.cpu_count() or 1
+            if n_hands < self.serial_threshold or n_workers == 1:
+                name = "serial"
+            else:
+                name = "process"
+        if name not in self._executors:
+            self._executors[name] = executors[name](self.processes, self.start_method)
+        return self._executors[name]
+
+    def terminate(self) -> None:
+        """Stop every worker without waiting for their tasks."""
+        for executor in self._executors.values():
+            executor.terminate()
+
+    def close(self) -> None:
+        """Release every worker."""
+        for executor in self._executors.values():
+            executor.close()
+        if isinstance(self.executor, Executor):
+            self.executor.close()
+
+    def __enter__(self) -> "SimulationSession":
+        """Enter the session.
+
+        Returns:
+            SimulationSession: The session.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Leave the session and release its workers.
+
+        Args:
+            exc_type (type, optional): Type of a raised exception.
+            exc_value (BaseException, optional): Raised exception.
+            traceback (TracebackType, optional): Traceback of a raised exception.
+        """
+        if exc_type is KeyboardInterrupt:
+            self.terminate()
+        self.close()
+
+
+if __name__ == "__main__":
+    pass
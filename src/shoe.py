@@ -0,0 +1,212 @@
+"""Shoe of shuffled cards to deal from."""
+
+from itertools import accumulate
+
+import numpy as np
+
+from src import telemetry
+from src.counting import CountingSystem
+
+basic_cards = np.arange(13, dtype=np.int8)
+
+
+class Shoe:
+    """A shoe of one or more decks, shuffled once and dealt by moving a cursor."""
+
+    def __init__(
+        self,
+        n_decks: int,
+        penetration: float = 0.5,
+        rng: np.random.Generator | None = None,
+        counting: CountingSystem | None = None,
+    ) -> None:
+        """Fill the shoe and shuffle it.
+
+        Args:
+            n_decks (int): Number of decks to mix together.
+            penetration (float, optional): Fraction of the shoe dealt before the
+                                           cut card is reached. Defaults to 0.5.
+            rng (np.random.Generator, optional): Random generator used for
+                                                 shuffling. Defaults to a freshly
+                                                 seeded one.
+            counting (CountingSystem, optional): System to keep the running
+                                                 count with. Defaults to None.
+        """
+        self.n_decks = n_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._set_counting(counting)
+        self.size = 52 * n_decks
+        self.cut_card = int(self.size * penetration)
+        self.counts = [0] * len(basic_cards)
+        self.cursor = 0
+        self._lay_out()
+        self.shuffle()
+
+    def _lay_out(self) -> None:
+        """Lay out every card of the shoe, ready to be shuffled."""
+        self.cards = np.tile(basic_cards, 4 * self.n_decks)
+
+    def _set_counting(self, counting: CountingSystem | None) -> None:
+        """Prepare the running count.
+
+        Args:
+            counting (CountingSystem, optional): System to keep the count with.
+        """
+        self.counting = counting
+        # Without a system every tag is 0, so dealing costs the same
+        self.tags = counting.tags if counting is not None else (0,) * len(basic_cards)
+        self.initial_count = (
+            counting.initial_count(self.n_decks) if counting is not None else 0
+        )
+        self.running_count = self.initial_count
+        # Balanced counts are divided by the decks left for the true count
+        self.balanced = counting is not None and counting.balanced
+
+    def shuffle(self) -> None:
+        """Shuffle every card back into the shoe."""
+        if telemetry.enabled:
+            telemetry.count(telemetry.shuffles)
+        self.rng.shuffle(self.cards)
+        self.cursor = 0
+        self._reset_counts()
+
+    def _reset_counts(self) -> None:
+        """Refill the rank histogram."""
+        self.counts = [4 * self.n_decks] * len(basic_cards)
+        self.running_count = self.initial_count
+
+    def _remove(self, card: int) -> None:
+        """Take a dealt card out of the rank histogram.
+
+        Args:
+            card (int): The dealt card.
+        """
+        self.counts[card] -= 1
+        self.running_count += self.tags[card]
+
+    def deal(self) -> int:
+        """Deal the next card, reshuffling if the shoe has run dry.
+
+        Returns:
+            card (int): The dealt card.
+        """
+        if self.cursor >= self.size:
+            self.shuffle()
+        card = self.cards.item(self.cursor)
+        self.cursor += 1
+        self._remove(card)
+        return card
+
+    def count_below(self, threshold: int) -> int:
+        """Count the cards left in the shoe lower than a threshold.
+
+        Args:
+            threshold (int): Value of card.
+
+        Returns:
+            int: Number of cards lower than threshold.
+        """
+        return sum(self.counts[:threshold])
+
+    @property
+    def cumulative(self) -> list[int]:
+        """list: Number of cards left below each rank, derived when needed."""
+        return list(accumulate(self.counts, initial=0))
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """bool: Has the cut card been passed."""
+        return self.cursor > self.cut_card
+
+    @property
+    def true_count(self) -> float:
+        """float: Running count per deck left, the running count if unbalanced."""
+        if not self.balanced:
+            return float(self.running_count)
+        return self.running_count * 52 / max(self.size - self.cursor, 1)
+
+    @property
+    def remaining(self) -> np.ndarray:
+        """np.ndarray: The cards that have not been dealt yet."""
+        return self.cards[self.cursor :]
+
+    def __len__(self) -> int:
+        """Return the number of cards left in the shoe."""
+        return self.size - self.cursor
+
+
+class HistogramShoe(Shoe):
+    """A shoe that samples cards from its rank histogram.
+
+    The individual cards are never laid out, so memory and shuffling cost stay
+    constant no matter how many decks are mixed together.
+    """
+
+    def __init__(
+        self,
+        n_decks: int,
+        penetration: float = 0.5,
+        rng: np.random.Generator | None = None,
+        buffer_size: int = 1024,
+        counting: CountingSystem | None = None,
+    ) -> None:
+        """Fill the shoe.
+
+        Args:
+            n_decks (int): Number of decks to mix together.
+            penetration (float, optional): Fraction of the shoe dealt before the
+                                           cut card is reached. Defaults to 0.5.
+            rng (np.random.Generator, optional): Random generator used for
+                                                 sampling. Defaults to a freshly
+                                                 seeded one.
+            buffer_size (int, optional): Number of uniform draws generated at a
+                                         time. Defaults to 1024.
+            counting (CountingSystem, optional): System to keep the running
+                                                 count with. Defaults to None.
+        """
+        self.buffer_size = buffer_size
+        super().__init__(n_decks, penetration, rng, counting)
+
+    def _lay_out(self) -> None:
+        """Prepare the uniform draws, the cards themselves are never laid out."""
+        self._uniforms = self.rng.random(self.buffer_size)
+        self._next_uniform = 0
+
+    def shuffle(self) -> None:
+        """Put every card back into the shoe."""
+        if telemetry.enabled:
+            telemetry.count(telemetry.shuffles)
+        self.cursor = 0
+        self._reset_counts()
+
+    def deal(self) -> int:
+        """Sample the next card from the remaining cards.
+
+        Returns:
+            card (int): The dealt card.
+        """
+        if self.cursor >= self.size:
+            self.shuffle()
+        if self._next_uniform == self.buffer_size:
+            self._uniforms = self.rng.random(self.buffer_size)
+            self._next_uniform = 0
+        position = int(self._uniforms.item(self._next_uniform) * len(self))
+        self._next_uniform += 1
+        # Walking the 13 ranks is cheaper than building the cumulative counts
+        for card, count in enumerate(self.counts):
+            if position < count:
+                break
+            position -= count
+        self.cursor += 1
+        self._remove(card)
+        return card
+
+    @property
+    def remaining(self) -> np.ndarray:
+        """np.ndarray: The cards that have not been dealt yet, in rank order."""
+        return np.repeat(basic_cards, self.counts)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,293 @@
+"""Expected value solver that generates the strategy lookup tables."""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.dealer import final_totals, n_values, value_counts
+from src.hand import card_values
+
+# Ranks grouped by value, aces first and all ten valued cards last
+ranks_by_value = [
+    [rank for rank, value in enumerate(card_values) if value == index + 1]
+    for index in range(n_values)
+]
+solver_version = 1
+
+
+class HandSolver:
+    """Expected values of every play against one upcard and shoe composition.
+
+    The shoe composition is fixed when the solver is created, which makes the
+    values exact for the first decision and a close approximation afterwards.
+    """
+
+    def __init__(
+        self,
+        upcard_value: int,
+        counts: tuple[int, ...],
+        hit_soft_17: bool = False,
+        double_after_split: bool = False,
+    ) -> None:
+        """Calculate the dealers outcomes for the composition.
+
+        Args:
+            upcard_value (int): Value of the dealers visible card, 1 for aces.
+            counts (tuple): Number of cards of each value left, aces first.
+            hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                          Defaults to False.
+            double_after_split (bool, optional): May a split hand double down.
+                                                 Defaults to False.
+        """
+        remaining = sum(counts)
+        self.chances = [count / remaining for count in counts]
+        self.dealer = final_totals(upcard_value, upcard_value == 1, counts, hit_soft_17)
+        self.double_after_split = double_after_split
+        self._best: dict[tuple[int, bool], float] = {}
+
+    def stand(self, total: int) -> float:
+        """Calculate the expected value of standing.
+
+        Args:
+            total (int): Value of the hand.
+
+        Returns:
+            float: Expected value.
+        """
+        if total > 21:
+            return -1.0
+        win = self.dealer[0] + sum(self.dealer[17:total])
+        lose = sum(self.dealer[max(total + 1, 17) :])
+        return win - lose
+
+    def _after_card(
+        self, hard_total: int, has_ace: bool, index: int
+    ) -> tuple[int, bool, int]:
+        """Get the hand after drawing a card.
+
+        Args:
+            hard_total (int): Value of the hand counting aces as 1.
+            has_ace (bool): Does the hand hold an ace.
+            index (int): Value bin of the drawn card.
+
+        Returns:
+            hand (tuple): New hard total, ace flag and best total.
+        """
+        hard_total += index + 1
+        has_ace = has_ace or index == 0
+        total = hard_total + 10 if has_ace and hard_total < 12 else hard_total
+        return hard_total, has_ace, total
+
+    def best(self, hard_total: int, has_ace: bool) -> float:
+        """Calculate the expected value of the best of hitting and standing.
+
+        Args:
+            hard_total (int): Value of the hand counting aces as 1.
+            has_ace (bool): Does the hand hold an ace.
+
+        Returns:
+            float: Expected value.
+        """
+        key = (hard_total, has_ace)
+        if key not in self._best:
+            total = hard_total + 10 if has_ace and hard_total < 12 else hard_total
+            if total > 21:
+                self._best[key] = -1.0
+            else:
+                self._best[key] = max(self.stand(total), self.hit(hard_total, has_ace))
+        return self._best[key]
+
+    def hit(self, hard_total: int, has_ace: bool) -> float:
+        """Calculate the expected value of taking a card and playing on.
+
+        Args:
+            hard_total (int): Value of the hand counting aces as 1.
+            has_ace (bool): Does the hand hold an ace.
+
+        Returns:
+            float: Expected value.
+        """
+        ev = 0.0
+        for index, chance in enumerate(self.chances):
+            if chance:
+                new_hard, new_ace, _ = self._after_card(hard_total, has_ace, index)
+                ev += chance * self.best(new_hard, new_ace)
+        return ev
+
+    def double(self, hard_total: int, has_ace: bool) -> float:
+        """Calculate the expected value of doubling down.
+
+        Args:
+            hard_total (int): Value of the hand counting aces as 1.
+            has_ace (bool): Does the hand hold an ace.
+
+        Returns:
+            float: Expected value.
+        """
+        ev = 0.0
+        for index, chance in enumerate(self.chances):
+            if chance:
+                _, _, total = self._after_card(hard_total, has_ace, index)
+                ev += chance * self.stand(total)
+        return 2 * ev
+
+    def split(self, pair_value: int) -> float:
+        """Calculate the expected value of splitting a pair.
+
+        Args:
+            pair_value (int): Value of each card in the pair, 1 for aces.
+
+        Returns:
+            float: Expected value of both hands together.
+        """
+        ev = 0.0
+        for index, chance in enumerate(self.chances):
+            if chance:
+                hard_total, has_ace, _ = self._after_card(
+                    pair_value, pair_value == 1, index
+                )
+                options = [self.best(hard_total, has_ace)]
+                if self.double_after_split:
+                    options.append(self.double(hard_total, has_ace))
+                ev += chance * max(options)
+        return 2 * ev
+
+
+def _remove(counts: tuple[int, ...], *indices: int) -> tuple[int, ...]:
+    """Take cards out of a value histogram.
+
+    Args:
+        counts (tuple): Number of cards of each value, aces first.
+        indices (int): Value bins of the cards to take out.
+
+    Returns:
+        counts (tuple): The histogram without the cards.
+    """
+    reduced = list(counts)
+    for index in indices:
+        reduced[index] -= 1
+    return tuple(reduced)
+
+
+def compute_tables(
+    n_decks: int,
+    hit_soft_17: bool = False,
+    double_after_split: bool = False,
+) -> dict[str, dict[int, dict[int, bool]]]:
+    """Compute when to split and double down.
+
+    Every starting hand is solved against the shoe without the players two cards
+    and the dealers upcard. Totals made by several hands are decided on their
+    expected values weighted by how likely each hand is.
+
+    Args:
+        n_decks (int): Number of decks.
+        hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                      Defaults to False.
+        double_after_split (bool, optional): May a split hand double down.
+                                             Defaults to False.
+
+    Returns:
+        tables (dict): "split" keyed on pair card and upcard, "double_soft" and
+                       "double_hard" keyed on hand total and upcard, all by rank
+                       like src.lookups.
+    """
+    shoe = value_counts([4 * n_decks] * len(card_values))
+    split: dict[int, dict[int, bool]] = {}
+    double_soft: dict[int, dict[int, bool]] = {}
+    double_hard: dict[int, dict[int, bool]] = {}
+    for upcard in range(n_values):
+        after_upcard = _remove(shoe, upcard)
+        soft_evs: dict[int, np.ndarray] = {}
+        hard_evs: dict[int, np.ndarray] = {}
+        for first in range(n_values):
+            for second in range(first, n_values):
+                counts = _remove(after_upcard, first, second)
+                if min(counts) < 0:
+                    continue
+                weight = after_upcard[first] * (
+                    after_upcard[second] - (first == second)
+                )
+                if first != second:
+                    weight *= 2
+                solver = HandSolver(upcard + 1, counts, hit_soft_17, double_after_split)
+                hard_total = first + second + 2
+                has_ace = first == 0
+                no_double = solver.best(hard_total, has_ace)
+                double = solver.double(hard_total, has_ace)
+                if has_ace and hard_total < 12:
+                    if hard_total + 10 == 21:
+                        continue
+                    evs = soft_evs.setdefault(hard_total + 10, np.zeros(2))
+                else:
+                    evs = hard_evs.setdefault(hard_total, np.zeros(2))
+                evs += weight * np.array([no_double, double])
+                if first == second:
+                    should_split = solver.split(first + 1) > max(no_double, double)
+                    for pair_rank in ranks_by_value[first]:
+                        for upcard_rank in ranks_by_value[upcard]:
+                            split.setdefault(pair_rank, {})[upcard_rank] = should_split
+        for table, evs_by_total in ((double_soft, soft_evs), (double_hard, hard_evs)):
+            for total, (no_double, double) in evs_by_total.items():
+                if double > no_double:
+                    for upcard_rank in ranks_by_value[upcard]:
+                        table.setdefault(total, {})[upcard_rank] = True
+    for pair_rank in split:
+        split[pair_rank] = dict(sorted(split[pair_rank].items()))
+    return {
+        "split": dict(sorted(split.items())),
+        "double_soft": dict(sorted(double_soft.items())),
+        "double_hard": dict(sorted(double_hard.items())),
+    }
+
+
+def solve_tables(
+    n_decks: int = 8,
+    hit_soft_17: bool = False,
+    double_after_split: bool = False,
+    cache_dir: str | Path | None = ".cache/tables",
+) -> dict[str, dict[int, dict[int, bool]]]:
+    """Get the strategy tables for a deck count and rule set, cached on disk.
+
+    Args:
+        n_decks (int, optional): Number of decks. Defaults to 8.
+        hit_soft_17 (bool, optional): Does the dealer draw on a soft 17.
+                                      Defaults to False.
+        double_after_split (bool, optional): May a split hand double down.
+                                             Defaults to False.
+        cache_dir (str | Path, optional): Folder to cache tables in, None to
+                                          always recompute.
+                                          Defaults to ".cache/tables".
+
+    Returns:
+        tables (dict): The tables, laid out as returned by compute_tables.
+    """
+    config = {
+        "n_decks": n_decks,
+        "hit_soft_17": hit_soft_17,
+        "double_after_split": double_after_split,
+        "version": solver_version,
+    }
+    key = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+    path = Path(cache_dir) / f"{key[:16]}.json" if cache_dir is not None else None
+    if path is not None and path.exists():
+        cached = json.loads(path.read_text())
+        return {
+            name: {
+                int(total): {int(upcard): value for upcard, value in row.items()}
+                for total, row in table.items()
+            }
+            for name, table in cached["tables"].items()
+        }
+
+    tables = compute_tables(n_decks, hit_soft_17, double_after_split)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"config": config, "tables": tables}))
+    return tables
+
+
+if __name__ == "__main__":
+    pass
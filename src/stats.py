@@ -0,0 +1,158 @@
+"""Fixed-size accumulators for simulation results."""
+
+from statistics import NormalDist
+from typing import Mapping
+
+import numpy as np
+
+# Payouts lie between -max_payout and max_payout, leaving room for the bets of
+# a counting strategy. Bets in half units paying a surrender or a blackjack
+# payout in tenths land on multiples of payout_step.
+payout_step = 0.05
+max_payout = 64
+n_payouts = int(2 * max_payout / payout_step) + 1
+# Dealer totals are 0 when bust, otherwise at most 21
+n_dealer_totals = 22
+
+
+class SimulationStats:
+    """Running totals of a simulation that can be merged in any order."""
+
+    def __init__(self, n_players: int) -> None:
+        """Create empty statistics.
+
+        Args:
+            n_players (int): Number of players.
+        """
+        self.n_players = n_players
+        self.n_games = 0
+        self.score_sum = np.zeros(n_players)
+        self.score_sq_sum = np.zeros(n_players)
+        self.payout_counts = np.zeros((n_players, n_payouts), dtype=np.int64)
+        self.dealer_counts = np.zeros(n_dealer_totals, dtype=np.int64)
+        self.dealer_score_sum = np.zeros((n_dealer_totals, n_players))
+
+    def update(self, game_scores: np.ndarray, dealer_hands: np.ndarray) -> None:
+        """Add a block of games.
+
+        Args:
+            game_scores (np.ndarray): Score of every player in each game.
+            dealer_hands (np.ndarray): Final value of the dealers hand in each
+                                       game, 0 if bust.
+        """
+        game_scores = np.asarray(game_scores, dtype=float).reshape(-1, self.n_players)
+        dealer_hands = np.asarray(dealer_hands, dtype=np.int64)
+        self.n_games += len(dealer_hands)
+        self.score_sum += game_scores.sum(axis=0)
+        self.score_sq_sum += np.square(game_scores).sum(axis=0)
+
+        payout_bins = np.rint((game_scores + max_payout) / payout_step).astype(int)
+        payout_bins = np.clip(payout_bins, 0, n_payouts - 1)
+        payout_bins += np.arange(self.n_players) * n_payouts
+        self.payout_counts += np.bincount(
+            payout_bins.ravel(), minlength=self.n_players * n_payouts
+        ).reshape(self.n_players, n_payouts)
+
+        self.dealer_counts += np.bincount(dealer_hands, minlength=n_dealer_totals)
+        dealer_bins = dealer_hands[:, None] * self.n_players + np.arange(self.n_players)
+        self.dealer_score_sum += np.bincount(
+            dealer_bins.ravel(),
+            weights=game_scores.ravel(),
+            minlength=n_dealer_totals * self.n_players,
+        ).reshape(n_dealer_totals, self.n_players)
+
+    def merge(self, other: "SimulationStats") -> "SimulationStats":
+        """Add the games of other statistics to these.
+
+        Args:
+            other (SimulationStats): Statistics to add.
+
+        Returns:
+            SimulationStats: These statistics, now holding both.
+        """
+        self.n_games += other.n_games
+        self.score_sum += other.score_sum
+        self.score_sq_sum += other.score_sq_sum
+        self.payout_counts += other.payout_counts
+        self.dealer_counts += other.dealer_counts
+        self.dealer_score_sum += other.dealer_score_sum
+        return self
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Get the statistics as plain arrays, ready for np.savez.
+
+        Returns:
+            arrays (dict): Every running total keyed by its attribute name.
+        """
+        return {
+            "n_games": np.array(self.n_games),
+            "score_sum": self.score_sum,
+            "score_sq_sum": self.score_sq_sum,
+            "payout_counts": self.payout_counts,
+            "dealer_counts": self.dealer_counts,
+            "dealer_score_sum": self.dealer_score_sum,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "SimulationStats":
+        """Rebuild statistics saved with to_arrays.
+
+        Args:
+            arrays (Mapping): Every running total keyed by its attribute name.
+
+        Returns:
+            SimulationStats: The rebuilt statistics.
+        """
+        stats = cls(len(arrays["score_sum"]))
+        stats.n_games = int(arrays["n_games"])
+        stats.score_sum = np.array(arrays["score_sum"], dtype=float)
+        stats.score_sq_sum = np.array(arrays["score_sq_sum"], dtype=float)
+        stats.payout_counts = np.array(arrays["payout_counts"], dtype=np.int64)
+        stats.dealer_counts = np.array(arrays["dealer_counts"], dtype=np.int64)
+        stats.dealer_score_sum = np.array(arrays["dealer_score_sum"], dtype=float)
+        return stats
+
+    @property
+    def payouts(self) -> np.ndarray:
+        """np.ndarray: The payout each column of payout_counts stands for."""
+        return np.arange(n_payouts) * payout_step - max_payout
+
+    @property
+    def mean(self) -> np.ndarray:
+        """np.ndarray: Average score of each player."""
+        return self.score_sum / max(self.n_games, 1)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """np.ndarray: Sample variance of the score of each player."""
+        if self.n_games < 2:
+            return np.full(self.n_players, np.inf)
+        variance: np.ndarray = (self.score_sq_sum - self.n_games * self.mean**2) / (
+            self.n_games - 1
+        )
+        return variance
+
+    @property
+    def std_error(self) -> np.ndarray:
+        """np.ndarray: Standard error of the average score of each player."""
+        std_error: np.ndarray = np.sqrt(
+            np.maximum(self.variance, 0) / max(self.n_games, 1)
+        )
+        return std_error
+
+    def confidence_interval(self, confidence: float = 0.95) -> np.ndarray:
+        """Calculate a normal confidence interval for the average scores.
+
+        Args:
+            confidence (float, optional): Chance the interval holds the true
+                                          average. Defaults to 0.95.
+
+        Returns:
+            np.ndarray: Lower and upper bound for each player.
+        """
+        half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * self.std_error
+        return np.stack([self.mean - half_width, self.mean + half_width], axis=1)
+
+
+if __name__ == "__main__":
+    pass
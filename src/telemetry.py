@@ -0,0 +1,331 @@
+"""Optional counters and stage timers for the game loop."""
+
+import sys
+import threading
+import time
+from multiprocessing import current_process, shared_memory
+from types import TracebackType
+from typing import Any, TextIO
+
+import numpy as np
+
+# Counters, then the time spent in each stage of a game in ns
+counter_names = ("games", "hands", "splits", "doubles", "shuffles")
+stage_names = ("deal", "decide", "dealer", "settle")
+fields = counter_names + stage_names
+games, hands, splits, doubles, shuffles, deal, decide, dealer, settle = range(
+    len(fields)
+)
+
+# Checked once per game by the engines, so disabled telemetry costs next to
+# nothing
+enabled = False
+_shared: "SharedTelemetry | None" = None
+_row = 0
+_users = 0
+# Guards the shared counters and the attached users across threads
+_lock = threading.Lock()
+
+
+class _ThreadTotals(threading.local):
+    """Counts of one thread since they were last flushed to the shared buffer.
+
+    Every thread counts on its own, so counting needs no lock.
+    """
+
+    def __init__(self) -> None:
+        """Start the counts of the thread at zero."""
+        self.values = [0] * len(fields)
+
+
+_totals = _ThreadTotals()
+
+
+class StageTimer:
+    """Stopwatch that adds the time since its last lap to a stage."""
+
+    __slots__ = ("last", "totals")
+
+    def __init__(self) -> None:
+        """Start the stopwatch."""
+        self.totals = _totals.values
+        self.last = time.perf_counter_ns()
+
+    def lap(self, stage: int) -> None:
+        """Add the time since the last lap to a stage.
+
+        Args:
+            stage (int): Field of the stage, like telemetry.deal.
+        """
+        now = time.perf_counter_ns()
+        self.totals[stage] += now - self.last
+        self.last = now
+
+
+def count(field: int, n: int = 1) -> None:
+    """Add to a counter.
+
+    Args:
+        field (int): Field of the counter, like telemetry.games.
+        n (int, optional): Amount to add. Defaults to 1.
+    """
+    _totals.values[field] += n
+
+
+class SharedTelemetry:
+    """Counters of every worker in one shared memory block, a row each.
+
+    Row 0 holds the counts of the process running the simulation and of its
+    threads, the other rows the counts of pool workers.
+    """
+
+    def __init__(self, n_rows: int, name: str | None = None) -> None:
+        """Create a new block of counters, or attach to an existing one.
+
+        Args:
+            n_rows (int): Number of rows, one more than the number of workers.
+            name (str, optional): Name of an existing block to attach to.
+                                  Defaults to creating a new one.
+        """
+        self.n_rows = max(n_rows, 2)
+        self.owner = name is None
+        self._memory = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=self.n_rows * len(fields) * 8
+        )
+        self.values = np.ndarray(
+            (self.n_rows, len(fields)), dtype=np.int64, buffer=self._memory.buf
+        )
+        if self.owner:
+            self.values[:] = 0
+
+    @property
+    def name(self) -> str:
+        """str: Name of the shared memory block."""
+        return self._memory.name
+
+    @property
+    def totals(self) -> dict[str, int]:
+        """dict: Every counter and stage time summed over the workers."""
+        return dict(zip(fields, self.values.sum(axis=0).tolist()))
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle the counters by name only.
+
+        Returns:
+            dict: What is needed to attach to the counters.
+        """
+        return {"n_rows": self.n_rows, "name": self.name}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attach to the counters in the receiving process.
+
+        Args:
+            state (dict): What is needed to attach to the counters.
+        """
+        self.__init__(state["n_rows"], name=state["name"])  # type: ignore[misc]
+
+    def close(self) -> None:
+        """Detach from the counters, freeing them if this process owns them."""
+        del self.values
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+    def __enter__(self) -> "SharedTelemetry":
+        """Enter the counters.
+
+        Returns:
+            SharedTelemetry: The counters.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Detach from the counters.
+
+        Args:
+            exc_type (type, optional): Type of a raised exception.
+            exc_value (BaseException, optional): Raised exception.
+            traceback (TracebackType, optional): Traceback of a raised exception.
+        """
+        self.close()
+
+
+def worker_row(n_rows: int) -> int:
+    """Get the row of the current process.
+
+    Args:
+        n_rows (int): Number of rows.
+
+    Returns:
+        int: Row of the pool worker, 0 outside of a pool.
+    """
+    name = current_process().name
+    if "PoolWorker" not in name:
+        return 0
+    return int(name.rsplit("-", 1)[-1]) % (n_rows - 1) + 1
+
+
+def attach(shared: SharedTelemetry) -> None:
+    """Start counting into shared counters.
+
+    Args:
+        shared (SharedTelemetry): Counters to flush into.
+    """
+    global enabled, _shared, _row, _users
+    with _lock:
+        _shared = shared
+        _row = worker_row(shared.n_rows)
+        _users += 1
+        enabled = True
+
+
+def detach() -> None:
+    """Flush the counts and stop counting once every user has detached."""
+    global enabled, _shared, _users
+    flush()
+    with _lock:
+        _users -= 1
+        if _users <= 0:
+            _users = 0
+            enabled = False
+            _shared = None
+
+
+def flush() -> None:
+    """Move the counts of the calling thread into the shared counters."""
+    with _lock:
+        if _shared is not None:
+            _shared.values[_row] += _totals.values
+    _totals.values[:] = [0] * len(fields)
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as hours, minutes and seconds.
+
+    Args:
+        seconds (float): Duration.
+
+    Returns:
+        str: The duration like 1:02:03.
+    """
+    if not np.isfinite(seconds):
+        return "?:??:??"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressReporter:
+    """Background thread printing progress, throughput and time left."""
+
+    def __init__(
+        self,
+        shared: SharedTelemetry,
+        n_games: int,
+        interval: float = 1.0,
+        stream: TextIO | None = None,
+    ) -> None:
+        """Prepare the reporter.
+
+        Args:
+            shared (SharedTelemetry): Counters the workers flush into.
+            n_games (int): Number of games the run will play.
+            interval (float, optional): Seconds between reports.
+                                        Defaults to 1.0.
+            stream (TextIO, optional): Where to print. Defaults to stderr.
+        """
+        self.shared = shared
+        self.n_games = n_games
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        """Report until stopped."""
+        start = time.monotonic()
+        first = self.shared.values.copy()
+        previous, previous_time = first, start
+        while not self._stop.wait(self.interval):
+            values = self.shared.values.copy()
+            now = time.monotonic()
+            line = self.report(
+                values, first, now - start, previous, now - previous_time
+            )
+            self.stream.write("\r" + line)
+            self.stream.flush()
+            previous, previous_time = values, now
+
+    def report(
+        self,
+        values: np.ndarray,
+        first: np.ndarray,
+        elapsed: float,
+        previous: np.ndarray,
+        since_previous: float,
+    ) -> str:
+        """Describe the progress of the run.
+
+        Args:
+            values (np.ndarray): Counters now.
+            first (np.ndarray): Counters when the run started.
+            elapsed (float): Seconds since the run started.
+            previous (np.ndarray): Counters at the previous report.
+            since_previous (float): Seconds since the previous report.
+
+        Returns:
+            str: Games played, hands each second overall and by worker, and the
+                 time left.
+        """
+        played = int(values[:, games].sum() - first[:, games].sum())
+        rate = (values[:, hands] - previous[:, hands]) / max(since_previous, 1e-9)
+        games_rate = played / max(elapsed, 1e-9)
+        eta = (self.n_games - played) / games_rate if games_rate else np.inf
+        workers = " ".join(f"{worker_rate:,.0f}" for worker_rate in rate if worker_rate)
+        return (
+            f"{played / max(self.n_games, 1):6.1%} {played:,}/{self.n_games:,} games "
+            f"{rate.sum():,.0f} hands/s [{workers}] ETA {format_duration(eta)}"
+        )
+
+    def start(self) -> "ProgressReporter":
+        """Start reporting.
+
+        Returns:
+            ProgressReporter: The reporter.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop reporting and print where the time was spent."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+            self.stream.write("\n" + stage_summary(self.shared.totals) + "\n")
+            self.stream.flush()
+
+
+def stage_summary(shared_totals: dict[str, int]) -> str:
+    """Describe where the time of a run was spent.
+
+    Args:
+        shared_totals (dict): Totals of SharedTelemetry.
+
+    Returns:
+        str: Time and share of every stage.
+    """
+    total_ns = sum(shared_totals[stage] for stage in stage_names) or 1
+    return ", ".join(
+        f"{stage} {shared_totals[stage] / 1e9:.2f} s "
+        f"({shared_totals[stage] / total_ns:.0%})"
+        for stage in stage_names
+    )
+
+
+if __name__ == "__main__":
+    pass
@@ -3,37 +3,39 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from src.history import HandHistory
 from src.lookups import plotting_map
+from src.stats import SimulationStats
 from src.util import format_data
 
 
 def plot_score_vs_dealer(
-    scores: list[np.ndarray],
-    dealer_hands: list[list[int]],
+    stats: SimulationStats | HandHistory,
     use_split: bool,
 ) -> None:
     """Plot the score of players vs the final value of the dealers hand.
 
     Args:
-        scores (list): Scores of all players.
-        dealer_hands (list): The hands of the dealers.
+        stats (SimulationStats | HandHistory): Statistics of the games played,
+                                               or a log to summarize.
         use_split (bool): Was split used.
     """
-    n_players, df = format_data(scores, dealer_hands)
+    n_players, dealer_hands, payouts = format_data(stats)
 
-    grouped_df = df.groupby("Dealer Hand").sum().reset_index()
-
-    grouped_df.loc[0, "Dealer Hand"] = 16  # Eliminate dead space
+    dealer_hands = np.where(dealer_hands == 0, 16, dealer_hands)  # No dead space
 
     plt.figure(figsize=(10, 6))
 
     width = 0.15
     multiplier = (1 - n_players) / 2
 
-    for player in grouped_df.columns[1:]:
+    for player in range(n_players):
         offset = width * multiplier
         plt.bar(
-            grouped_df["Dealer Hand"] + offset, grouped_df[player], width, label=player
+            dealer_hands + offset,
+            payouts[:, player],
+            width,
+            label=f"Player {player + 1}",
         )
         multiplier += 1
 
@@ -53,23 +55,21 @@ def plot_score_vs_dealer(
     plt.savefig(f"Figures/{path}.png")
 
 
-def plot_score_vs_ceartainty(
-    ceartainty_scores: list[list[tuple[np.float64, np.ndarray]]]
-) -> None:
+def plot_score_vs_ceartainty(ceartainty_scores: list[tuple[float, np.ndarray]]) -> None:
     """Plot the scores of players as a function of ceartainty.
 
     Args:
         ceartainty_scores (list): Ceartainty and scores of players.
     """
-    n_players = len(ceartainty_scores[0][1])
-    certainties = [entry[0] for entry in ceartainty_scores]
-    scores = [entry[1] for entry in ceartainty_scores]
-    scores_by_player = [[row[i] for row in scores] for i in range(n_players)]
+    certainties = np.array([ceartainty for ceartainty, _ in ceartainty_scores])
+    scores = np.stack([score for _, score in ceartainty_scores])
 
     plt.figure(figsize=(10, 6))
 
-    for i, scores in enumerate(scores_by_player):
-        plt.plot(certainties, scores, label=f"Player {i + 1}")
+    # Every column of scores is a line, one for each player
+    lines = plt.plot(certainties, scores)
+    for i, line in enumerate(lines):
+        line.set_label(f"Player {i + 1}")
 
     plt.axhline(0, color="black", linewidth=0.5)
 
@@ -0,0 +1,36 @@
+"""Shared fixtures of the tests."""
+
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+from src.shoe import Shoe
+
+
+def stack(cards: np.ndarray, order: list[int]) -> None:
+    """Move cards to the front of a shuffled shoe, in order.
+
+    Args:
+        cards (np.ndarray): Cards of the shoe, stacked in place.
+        order (list): Cards to deal first.
+    """
+    for position, card in enumerate(order):
+        swap = position + int(np.flatnonzero(cards[position:] == card)[0])
+        cards[[position, swap]] = cards[[swap, position]]
+
+
+@pytest.fixture
+def stacked_shoe() -> Callable[[list[int]], Shoe]:
+    """Make shoes that deal the given cards first.
+
+    Returns:
+        Callable: Takes the cards to deal first and returns a one deck shoe.
+    """
+
+    def make(order: list[int]) -> Shoe:
+        shoe = Shoe(1, rng=np.random.default_rng(0))
+        stack(shoe.cards, order)
+        return shoe
+
+    return make
@@ -0,0 +1,52 @@
+"""The batch engine plays every table like the scalar engine plays one shoe."""
+
+import numpy as np
+import pytest
+
+from src import batch, game_logic
+from src.counting import CountingStrategy, hi_lo, illustrious_18
+from src.rules import Rules, default_rules
+from src.shoe import Shoe
+
+strategies = [None, CountingStrategy(hi_lo, {1: 2, 3: 6}, illustrious_18)]
+casino_rules = Rules(
+    hit_soft_17=True,
+    double_after_split=True,
+    max_splits=3,
+    surrender=True,
+    dealer_peek=True,
+    deal_split_cards=True,
+    split_blackjack=False,
+    blackjack_beats_21=True,
+)
+
+
+@pytest.mark.parametrize("rules", [default_rules, casino_rules])
+@pytest.mark.parametrize("counting", strategies)
+@pytest.mark.parametrize("ceartainty", [0.0, 0.5])
+def test_tables_match_scalar_games(
+    counting: CountingStrategy | None, ceartainty: float, rules: Rules
+) -> None:
+    n_tables, n_players, n_games = 64, 3, 4
+    system = counting.system if counting is not None else None
+    shoes = batch.BatchShoe(n_tables, 6, rng=np.random.default_rng(1), counting=system)
+    batch_returns = []
+    batch_scores = []
+    for _ in range(n_games):
+        returns, dealer_score = batch.play_game(
+            shoes, n_players, True, ceartainty, counting=counting, rules=rules
+        )
+        batch_returns.append(returns)
+        batch_scores.append(dealer_score)
+    assert not shoes.needs_shuffle.any()
+
+    for table in range(n_tables):
+        shoe = Shoe(6, counting=system)
+        shoe.cards[:] = shoes.cards[table]
+        for game in range(n_games):
+            outcome, shoe, score = game_logic.play_game(
+                shoe, n_players, True, ceartainty, counting=counting, rules=rules
+            )
+            assert list(outcome) == list(batch_returns[game][table])
+            assert score == batch_scores[game][table]
+        assert shoe.cursor == shoes.cursor[table]
@@ -0,0 +1,73 @@
+"""Cached runs top up to the games asked for and are reused until stale."""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from src import batch, playing
+from src.playing import play_cached, play_multiple_decks
+from src.session import SimulationSession
+from src.stats import SimulationStats
+
+games_pr_deck = 4
+
+
+def cached(engine: str, n_games: int, cache_dir: Path) -> SimulationStats:
+    with SimulationSession("serial") as session:
+        return play_cached(
+            2,
+            6,
+            n_games,
+            True,
+            games_pr_deck,
+            0.5,
+            engine=engine,
+            session=session,
+            seed=9,
+            cache_dir=cache_dir,
+        )
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batch"])
+def test_top_up_matches_a_single_run(
+    engine: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    runs: list[int] = []
+
+    def counted(*args: Any, **kwargs: Any) -> SimulationStats:
+        runs.append(args[2])
+        return play_multiple_decks(*args, **kwargs)
+
+    monkeypatch.setattr(playing, "play_multiple_decks", counted)
+    # Cached batch runs play whole shuffle blocks
+    n_games = 2 * batch.shuffle_block * games_pr_deck
+    cached(engine, n_games // 2, tmp_path)
+    stats = cached(engine, n_games, tmp_path)
+    assert runs == [n_games // 2, n_games]
+    with SimulationSession("serial") as session:
+        expected = play_multiple_decks(
+            2,
+            6,
+            n_games,
+            True,
+            games_pr_deck,
+            0.5,
+            engine=engine,
+            session=session,
+            seed=9,
+        )
+    arrays = stats.to_arrays()
+    for name, array in expected.to_arrays().items():
+        np.testing.assert_array_equal(arrays[name], array, err_msg=name)
+
+    # Asking again, or for fewer games, is answered from the cache
+    assert cached(engine, n_games, tmp_path).n_games == n_games
+    assert cached(engine, n_games // 2, tmp_path).n_games == n_games
+    assert len(runs) == 2
+
+    monkeypatch.setattr(playing, "engine_version", playing.engine_version + 1)
+    assert cached(engine, n_games, tmp_path).n_games == n_games
+    assert runs == [n_games // 2, n_games, n_games]
+    assert len(list(tmp_path.glob("*.npz"))) == 2
@@ -0,0 +1,66 @@
+"""An interrupted run resumed from its checkpoint plays like one that was not."""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from src import playing
+from src.checkpoint import merge_ranges, read_checkpoint
+from src.playing import play_chunk, play_multiple_decks
+from src.session import SimulationSession
+from src.stats import SimulationStats
+
+# Games, games of each deck and games of each chunk, four chunks in all. The
+# batch engine chunks whole shuffle blocks, so it needs many short shoes
+runs = {"scalar": (4_000, 20, 1_000), "batch": (5_120, 5, 1_280)}
+
+
+def play(engine: str, checkpoint: Path | None = None) -> SimulationStats:
+    n_games, games_pr_deck, chunk_size = runs[engine]
+    with SimulationSession("serial") as session:
+        return play_multiple_decks(
+            2,
+            6,
+            n_games,
+            True,
+            games_pr_deck,
+            0.5,
+            engine=engine,
+            batch_size=512,
+            session=session,
+            seed=7,
+            chunk_size=chunk_size,
+            checkpoint=checkpoint,
+            resume=True,
+        )
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batch"])
+def test_resumed_run_matches_uninterrupted(
+    engine: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    checkpoint = tmp_path / "run.npz"
+    played: list[tuple[int, int]] = []
+
+    def interrupted_chunk(*task: Any) -> tuple[int, int, SimulationStats]:
+        if len(played) == 2:
+            raise KeyboardInterrupt
+        played.append((task[8], task[9]))
+        return play_chunk(*task)
+
+    monkeypatch.setattr(playing, "play_chunk", interrupted_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        play(engine, checkpoint)
+    monkeypatch.undo()
+    saved = read_checkpoint(checkpoint)
+    assert saved is not None
+    _, stats, done = saved
+    assert len(played) == 2 and done == merge_ranges(played)
+    assert 0 < stats.n_games < runs[engine][0]
+
+    expected = play(engine).to_arrays()
+    arrays = play(engine, checkpoint).to_arrays()
+    for name, array in expected.items():
+        np.testing.assert_array_equal(arrays[name], array, err_msg=name)
@@ -0,0 +1,56 @@
+"""A run played by local cluster workers matches a serial run."""
+
+import numpy as np
+
+from src.cluster import is_loopback, play_distributed
+from src.counting import CountingStrategy, hi_lo, illustrious_18
+from src.playing import play_multiple_decks
+from src.rules import Rules
+
+
+def test_local_workers_match_a_serial_run() -> None:
+    args = (2, 6, 3_000, True, 20, 0.5)
+    stats = play_distributed(
+        *args, seed=21, n_local_workers=3, chunk_size=200, lease_seconds=10.0
+    )
+    expected = play_multiple_decks(*args, seed=21).to_arrays()
+    arrays = stats.to_arrays()
+    for name, array in expected.items():
+        np.testing.assert_array_equal(arrays[name], array, err_msg=name)
+
+
+def test_workers_play_the_counting_and_rules_given() -> None:
+    args = (2, 6, 2_000, True, 20, 0.5)
+    counting = CountingStrategy(hi_lo, {2: 2, 4: 4}, illustrious_18)
+    rules = Rules(
+        hit_soft_17=True,
+        surrender=True,
+        dealer_peek=True,
+        max_splits=3,
+        double_after_split=True,
+        deal_split_cards=True,
+    )
+    stats = play_distributed(
+        *args,
+        seed=5,
+        n_local_workers=2,
+        chunk_size=400,
+        lease_seconds=10.0,
+        counting=counting,
+        rules=rules,
+    )
+    expected = play_multiple_decks(
+        *args, seed=5, counting=counting, rules=rules
+    ).to_arrays()
+    arrays = stats.to_arrays()
+    for name, array in expected.items():
+        np.testing.assert_array_equal(arrays[name], array, err_msg=name)
+    # Workers that fell back on the defaults would play a different game
+    default = play_multiple_decks(*args, seed=5).to_arrays()
+    assert not np.array_equal(default["score_sum"], expected["score_sum"])
+
+
+def test_loopback_hosts() -> None:
+    assert is_loopback("127.0.0.1")
+    assert is_loopback("localhost")
+    assert not is_loopback("0.0.0.0")
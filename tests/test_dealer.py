@@ -0,0 +1,40 @@
+"""The exact dealer distribution against the engine and itself."""
+
+import numpy as np
+import pytest
+
+from src.batch import BatchHand, BatchShoe, draw_until_bust_or_hold
+from src.dealer import dealer_distribution
+from src.rules import Rules
+from src.shoe import basic_cards
+
+one_deck = [4] * len(basic_cards)
+
+
+@pytest.mark.parametrize("hit_soft_17", [False, True])
+def test_upcards_add_up_to_the_whole(hit_soft_17: bool) -> None:
+    whole = dealer_distribution(None, one_deck, hit_soft_17)
+    combined = np.zeros_like(whole)
+    for upcard in basic_cards:
+        counts = list(one_deck)
+        counts[upcard] -= 1
+        combined += dealer_distribution(int(upcard), counts, hit_soft_17) / len(
+            basic_cards
+        )
+    assert whole.sum() == pytest.approx(1.0)
+    assert combined == pytest.approx(whole)
+
+
+@pytest.mark.parametrize("hit_soft_17", [False, True])
+def test_matches_the_dealer_of_the_engine(hit_soft_17: bool) -> None:
+    n_tables = 200_000
+    shoe = BatchShoe(n_tables, 1, rng=np.random.default_rng(8))
+    hand = BatchHand(n_tables)
+    everyone = np.arange(n_tables)
+    draw_until_bust_or_hold(
+        hand, shoe, everyone, True, 0.0, rules=Rules(hit_soft_17=hit_soft_17)
+    )
+    chances = dealer_distribution(None, one_deck, hit_soft_17)
+    observed = np.bincount(hand.score, minlength=len(chances)) / n_tables
+    std_error = np.sqrt(chances * (1 - chances) / n_tables)
+    assert np.all(np.abs(observed - chances) <= 5 * std_error + 1e-12)
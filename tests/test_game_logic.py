@@ -0,0 +1,136 @@
+"""Regression tests of single games on a stacked shoe."""
+
+from collections.abc import Callable
+
+import pytest
+
+from src.game_logic import play_game
+from src.hand import Hand
+from src.rules import Rules
+from src.shoe import Shoe
+
+# Cards are ranks, ace first
+ace, two, three, five, six, seven, eight, nine, ten, king = (
+    0,
+    1,
+    2,
+    4,
+    5,
+    6,
+    7,
+    8,
+    9,
+    12,
+)
+
+
+def test_hit_draws_one_card(stacked_shoe: Callable[[list[int]], Shoe]) -> None:
+    shoe = stacked_shoe([ten, five, three, king, seven])
+    returns, shoe, dealer_score = play_game(shoe, 1, False, 1.0)
+    # 8 takes a single card to 18, the dealer stands on 17
+    assert list(returns) == [1.0]
+    assert dealer_score == 17
+    assert shoe.cursor == 5
+
+
+def test_bust_loses_to_bust_dealer(stacked_shoe: Callable[[list[int]], Shoe]) -> None:
+    shoe = stacked_shoe([six, ten, six, king, ten, ten])
+    returns, shoe, dealer_score = play_game(shoe, 1, False, 0.0)
+    assert list(returns) == [-1.0]
+    assert dealer_score == 0
+    assert shoe.cursor == 6
+
+
+def test_blackjack_pays_one_and_a_half(
+    stacked_shoe: Callable[[list[int]], Shoe],
+) -> None:
+    shoe = stacked_shoe([nine, ace, king, eight])
+    returns, shoe, dealer_score = play_game(shoe, 1, False, 0.0)
+    assert list(returns) == [1.5]
+    assert dealer_score == 17
+
+
+def test_blackjacks_push(stacked_shoe: Callable[[list[int]], Shoe]) -> None:
+    shoe = stacked_shoe([ace, ten, ace, king])
+    returns, _, dealer_score = play_game(shoe, 1, False, 0.0)
+    assert list(returns) == [0.0]
+    assert dealer_score == 21
+
+
+def test_dealer_stands_on_soft_17(stacked_shoe: Callable[[list[int]], Shoe]) -> None:
+    shoe = stacked_shoe([ace, ten, eight, six])
+    returns, shoe, dealer_score = play_game(shoe, 1, False, 0.0)
+    assert list(returns) == [1.0]
+    assert dealer_score == 17
+    assert shoe.cursor == 4
+
+
+def test_split_21_pays_as_blackjack(
+    stacked_shoe: Callable[[list[int]], Shoe],
+) -> None:
+    # The hand split off draws a king, the hand kept draws to a hard 16
+    shoe = stacked_shoe([eight, ace, ace, king, five, ten, nine])
+    returns, shoe, dealer_score = play_game(shoe, 1, True, 1.0)
+    assert list(returns) == [0.5]
+    assert dealer_score == 17
+    assert shoe.cursor == 7
+
+
+@pytest.mark.parametrize("split_blackjack, outcome", [(True, 0.5), (False, 0.0)])
+def test_split_hands_dealt_second_cards(
+    stacked_shoe: Callable[[list[int]], Shoe], split_blackjack: bool, outcome: float
+) -> None:
+    rules = Rules(deal_split_cards=True, split_blackjack=split_blackjack)
+    shoe = stacked_shoe([eight, ace, ace, king, five, ten, nine])
+    returns, shoe, dealer_score = play_game(shoe, 1, True, 1.0, rules=rules)
+    assert list(returns) == [outcome]
+    assert dealer_score == 17
+    assert shoe.cursor == 7
+
+
+@pytest.mark.parametrize("blackjack_beats_21, outcome", [(False, 0.0), (True, -1.0)])
+def test_dealer_blackjack_against_21(
+    stacked_shoe: Callable[[list[int]], Shoe],
+    blackjack_beats_21: bool,
+    outcome: float,
+) -> None:
+    rules = Rules(blackjack_beats_21=blackjack_beats_21)
+    shoe = stacked_shoe([ace, five, six, king, king])
+    returns, shoe, dealer_score = play_game(shoe, 1, False, 0.0, rules=rules)
+    assert list(returns) == [outcome]
+    assert dealer_score == 21
+    assert shoe.cursor == 5
+
+
+def test_peeked_blackjack_ends_the_game(
+    stacked_shoe: Callable[[list[int]], Shoe],
+) -> None:
+    shoe = stacked_shoe([ace, king, ten, nine])
+    returns, shoe, dealer_score = play_game(
+        shoe, 1, False, 0.0, rules=Rules(dealer_peek=True)
+    )
+    assert list(returns) == [-1.0]
+    assert dealer_score == 21
+    assert shoe.cursor == 4
+
+
+@pytest.mark.parametrize(
+    "cards, total, is_soft, is_blackjack",
+    [
+        ([ace, king], 21, True, True),
+        ([ace, ace, nine], 21, True, False),
+        ([king, ten, ace], 21, False, False),
+        ([ace, six, ten], 17, False, False),
+        ([ten, two, king], 22, False, False),
+    ],
+)
+def test_hand_totals(
+    cards: list[int], total: int, is_soft: bool, is_blackjack: bool
+) -> None:
+    hand = Hand()
+    for card in cards:
+        hand.add(card)
+    assert hand.total == total
+    assert hand.is_soft == is_soft
+    assert hand.is_blackjack == is_blackjack
+    assert hand.score == (0 if total > 21 else total)
@@ -0,0 +1,65 @@
+"""Seeded runs give the same statistics however they are split up, within budget."""
+
+import numpy as np
+import pytest
+
+from src.playing import play_multiple_decks, play_until_precise
+from src.session import SimulationSession
+from src.stats import SimulationStats
+
+
+def play(
+    engine: str, executor: str, processes: int, chunk_size: int | str
+) -> SimulationStats:
+    with SimulationSession(executor, processes) as session:
+        return play_multiple_decks(
+            3,
+            6,
+            6_000,
+            True,
+            20,
+            0.5,
+            engine=engine,
+            batch_size=64,
+            session=session,
+            seed=13,
+            chunk_size=chunk_size,
+        )
+
+
+splits: list[tuple[str, int, int | str]] = [
+    ("process", 2, 100),
+    ("process", 3, 1_000),
+    ("thread", 2, "auto"),
+]
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batch"])
+def test_stats_do_not_depend_on_workers_or_chunks(engine: str) -> None:
+    expected = play(engine, "serial", 1, "auto").to_arrays()
+    for executor, processes, chunk_size in splits:
+        arrays = play(engine, executor, processes, chunk_size).to_arrays()
+        assert arrays.keys() == expected.keys()
+        for name, array in expected.items():
+            np.testing.assert_array_equal(arrays[name], array, err_msg=name)
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batch"])
+@pytest.mark.parametrize("max_games", [1_000, 25_000])
+def test_precise_runs_keep_to_the_budget(engine: str, max_games: int) -> None:
+    with SimulationSession("serial") as session:
+        *_, n_hands, stats = play_until_precise(
+            2,
+            6,
+            True,
+            30,
+            0.5,
+            target_se=1e-6,
+            max_games=max_games,
+            initial_games=600,
+            engine=engine,
+            session=session,
+            seed=4,
+        )
+    assert stats.n_games == max_games
+    assert n_hands == 2 * max_games
@@ -0,0 +1,71 @@
+"""Rules are checked and compiled into the tables the engines index."""
+
+import pytest
+
+from src.counting import CountingStrategy, hi_lo
+from src.lookups import (
+    action_double,
+    action_surrender,
+    outcome_blackjack,
+    role_kept,
+    role_split_off,
+    role_unsplit,
+)
+from src.playing import play_multiple_decks
+from src.rules import Rules, default_rules
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"blackjack_payout": 1.23},
+        {"max_splits": -1},
+        {"penetration": 0.0},
+        {"double_after_split": True},
+        {"max_splits": 2},
+        {"max_splits": 32, "deal_split_cards": True},
+    ],
+)
+def test_rejects_bad_settings(settings: dict[str, float]) -> None:
+    with pytest.raises(ValueError):
+        Rules(**settings)  # type: ignore[arg-type]
+
+
+def test_roles_only_get_the_allowed_actions() -> None:
+    assert not (default_rules.hand_decisions == action_surrender).any()
+    assert (default_rules.hand_decisions[role_kept] == action_double).any()
+    assert not (default_rules.hand_decisions[role_split_off] == action_double).any()
+
+    rules = Rules(surrender=True, deal_split_cards=True)
+    assert (rules.hand_decisions[role_unsplit] == action_surrender).any()
+    assert not (rules.hand_decisions[role_kept:] == action_surrender).any()
+    assert not (rules.hand_decisions[role_kept:] == action_double).any()
+    das = Rules(double_after_split=True, deal_split_cards=True)
+    assert (das.hand_decisions == das.decisions).all()
+
+
+def test_outcomes() -> None:
+    rules = Rules(blackjack_payout=1.2, split_blackjack=False, blackjack_beats_21=True)
+    assert rules.outcomes[role_unsplit, outcome_blackjack, 20] == 1.2
+    assert rules.outcomes[role_unsplit, outcome_blackjack, outcome_blackjack] == 0
+    assert rules.outcomes[role_split_off, outcome_blackjack, 20] == 1
+    assert rules.outcomes[role_kept, outcome_blackjack, outcome_blackjack] == -1
+    assert rules.outcomes[role_unsplit, 21, outcome_blackjack] == -1
+    assert default_rules.outcomes[role_unsplit, 21, outcome_blackjack] == 0
+    assert default_rules.outcomes[role_kept, outcome_blackjack, 21] == 1.5
+    assert default_rules.outcomes[role_unsplit, 0, 0] == -1
+    assert default_rules.outcomes[role_unsplit, 18, 18] == 0
+    assert default_rules.outcomes[role_unsplit, 17, 0] == 1
+
+
+def test_bets_must_fit_every_split_and_double() -> None:
+    rules = Rules(max_splits=3, double_after_split=True, deal_split_cards=True)
+    # Four hands doubled pay eight bets
+    assert rules.max_stake == 8
+    rules.check_bet(8)
+    with pytest.raises(ValueError):
+        rules.check_bet(8.5)
+    counting = CountingStrategy(hi_lo, {2: 2, 4: 16})
+    default_rules.check_bet(counting.max_bet)
+    with pytest.raises(ValueError):
+        play_multiple_decks(2, 6, 100, True, 20, counting=counting, rules=rules)
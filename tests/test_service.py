@@ -0,0 +1,129 @@
+"""The service answers queries over http, sharing runs and rejecting bad ones."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.service import SimulationService
+from src.session import SimulationSession
+
+query = {"n_players": 2, "n_games": 400, "engine": "batch", "seed": 3}
+
+
+async def request(
+    port: int, method: str, path: str, body: Any = None
+) -> tuple[int, dict[str, Any]]:
+    """Send one http request to the service.
+
+    Args:
+        port (int): Port the service listens on.
+        method (str): Http method.
+        path (str): Requested path.
+        body (Any, optional): Body of the request, encoded as json unless it
+                              is bytes. Defaults to no body.
+
+    Returns:
+        status (int): Http status code.
+        response (dict): Decoded body of the response.
+    """
+    if body is None:
+        payload = b""
+    elif isinstance(body, bytes):
+        payload = body
+    else:
+        payload = json.dumps(body).encode()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+        + payload
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, response = raw.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), json.loads(response)
+
+
+def serve(test: Any, tmp_path: Path) -> None:
+    """Run a test against a service listening on a free port.
+
+    Args:
+        test (Any): Coroutine function taking the service and its port.
+        tmp_path (Path): Folder to cache results in.
+    """
+
+    async def run() -> None:
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        async with server:
+            await test(service, server.sockets[0].getsockname()[1])
+
+    with SimulationSession("serial") as session:
+        service = SimulationService(session, cache_dir=tmp_path)
+        try:
+            asyncio.run(run())
+        finally:
+            service.close()
+
+
+def test_query_and_health(tmp_path: Path) -> None:
+    async def test(service: SimulationService, port: int) -> None:
+        status, response = await request(port, "POST", "/query", query)
+        assert status == 200
+        assert response["n_games"] >= query["n_games"]
+        assert len(response["mean"]) == query["n_players"]
+        assert not response["cached"]
+        status, response = await request(port, "POST", "/query", query)
+        assert status == 200
+        assert response["cached"]
+        status, response = await request(port, "GET", "/health")
+        assert status == 200
+        assert response["n_queries"] == 2
+        assert response["n_runs"] == 1
+        status, _ = await request(port, "GET", "/missing")
+        assert status == 404
+
+    serve(test, tmp_path)
+
+
+def test_identical_queries_share_a_run(tmp_path: Path) -> None:
+    async def test(service: SimulationService, port: int) -> None:
+        responses = await asyncio.gather(
+            *(request(port, "POST", "/query", query) for _ in range(4))
+        )
+        assert [status for status, _ in responses] == [200] * 4
+        assert len({json.dumps(response) for _, response in responses}) == 1
+        assert service.n_runs == 1
+
+    serve(test, tmp_path)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not json",
+        [1, 2],
+        {"n_players": None},
+        {"n_games": "many"},
+        {"unknown": 1},
+        {"engine": "gpu"},
+        {"rules": {"penetration": 2}},
+        {"rules": {"unknown": 1}},
+        {"rules": {"tables": {"split": {}}}},
+        {"counting": {"system": "hi_lo", "bet_spread": [1]}},
+    ],
+)
+def test_bad_queries_are_rejected(tmp_path: Path, body: Any) -> None:
+    async def test(service: SimulationService, port: int) -> None:
+        status, response = await request(port, "POST", "/query", body)
+        assert status == 400
+        assert response["error"]
+        assert service.n_runs == 0
+
+    serve(test, tmp_path)
@@ -0,0 +1,45 @@
+"""The histogram shoe deals like a shuffled shoe."""
+
+import numpy as np
+import pytest
+
+from src.game_logic import create_deck, histogram_min_decks
+from src.shoe import HistogramShoe, Shoe
+
+
+def test_create_deck_samples_large_shoes() -> None:
+    assert type(create_deck(8, seed=0)) is Shoe
+    assert type(create_deck(histogram_min_decks, seed=0)) is HistogramShoe
+    assert type(create_deck(8, seed=0, histogram=True)) is HistogramShoe
+
+
+@pytest.mark.parametrize("shoe_type", [Shoe, HistogramShoe])
+def test_count_below_follows_the_dealt_cards(shoe_type: type[Shoe]) -> None:
+    shoe = shoe_type(2, rng=np.random.default_rng(5))
+    left = np.full(13, 8)
+    for _ in range(shoe.size):
+        left[shoe.deal()] -= 1
+        assert [shoe.count_below(threshold) for threshold in range(14)] == [
+            int(left[:threshold].sum()) for threshold in range(14)
+        ]
+    assert not left.any()
+
+
+def test_deal_distribution_matches_shoe() -> None:
+    n_shoes, n_dealt = 2_000, 52
+    dealt = {}
+    for shoe_type in (Shoe, HistogramShoe):
+        shoe = shoe_type(6, rng=np.random.default_rng(11))
+        counts = np.zeros((n_dealt, 13))
+        for _ in range(n_shoes):
+            shoe.shuffle()
+            for position in range(n_dealt):
+                counts[position, shoe.deal()] += 1
+        dealt[shoe_type] = counts / n_shoes
+
+    # Every position of the shoe deals each rank with chance 1/13
+    std_error = np.sqrt(1 / 13 * 12 / 13 / n_shoes)
+    for frequencies in dealt.values():
+        assert np.abs(frequencies - 1 / 13).max() < 5 * std_error
+    difference = dealt[Shoe].sum(axis=0) - dealt[HistogramShoe].sum(axis=0)
+    assert np.abs(difference).max() < 5 * std_error * np.sqrt(2 * n_dealt)
@@ -0,0 +1,61 @@
+"""The solver agrees with known basic strategy."""
+
+import pytest
+
+from src.dealer import value_counts
+from src.hand import card_values
+from src.solver import HandSolver, _remove, solve_tables
+
+# Ranks of the cards, 0 is an ace and 9 a ten
+ace, two, five, six, seven, nine, ten = 0, 1, 4, 5, 6, 8, 9
+
+
+def solver(upcard: int, first: int, second: int) -> HandSolver:
+    """Solve a starting hand against an upcard from a fresh 8 deck shoe.
+
+    Args:
+        upcard (int): Rank of the upcard.
+        first (int): Rank of the first card of the player.
+        second (int): Rank of the second card of the player.
+
+    Returns:
+        HandSolver: Solver for the hand.
+    """
+    shoe = value_counts([4 * 8] * len(card_values))
+    return HandSolver(upcard + 1, _remove(shoe, upcard, first, second))
+
+
+@pytest.mark.parametrize(
+    "upcard, first, second, hits",
+    [
+        (ten, ten, six, True),
+        (ten, nine, seven, True),
+        (nine, ace, seven, True),
+        (six, ace, seven, False),
+        (five, ten, two, False),
+        (ten, ten, seven, False),
+    ],
+)
+def test_hit_or_stand(upcard: int, first: int, second: int, hits: bool) -> None:
+    hand = solver(upcard, first, second)
+    hard_total = first + second + 2
+    total = hard_total + 10 if ace in (first, second) else hard_total
+    assert (hand.hit(hard_total, first == ace) > hand.stand(total)) == hits
+
+
+@pytest.fixture(scope="module")
+def tables() -> dict[str, dict[int, dict[int, bool]]]:
+    return solve_tables(cache_dir=None)
+
+
+def test_solved_tables(tables: dict[str, dict[int, dict[int, bool]]]) -> None:
+    # The dealer does not peek for a blackjack, so hard 11 only doubles against
+    # a 2 to a 9
+    assert tables["double_hard"][11] == {upcard: True for upcard in range(1, 9)}
+    # Hard 9 and soft 17 double against a 3 to a 6
+    assert set(tables["double_hard"][9]) == {2, 3, 4, 5}
+    assert set(tables["double_soft"][17]) == {2, 3, 4, 5}
+    assert 16 not in tables["double_hard"]
+    assert all(tables["split"][ace].values())
+    assert not any(tables["split"][ten].values())
+    assert not any(tables["split"][five].values())
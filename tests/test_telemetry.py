@@ -0,0 +1,30 @@
+"""Telemetry counts every game, whatever runs the games."""
+
+import pytest
+
+from src.playing import play_multiple_decks
+from src.session import SimulationSession
+from src.telemetry import SharedTelemetry
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batch"])
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_counts_every_game(engine: str, executor: str) -> None:
+    n_games = 4_000
+    with SimulationSession(executor, 4) as session, SharedTelemetry(5) as shared:
+        play_multiple_decks(
+            2,
+            6,
+            n_games,
+            True,
+            20,
+            0.5,
+            engine=engine,
+            batch_size=32,
+            session=session,
+            seed=3,
+            chunk_size=200,
+            shared_telemetry=shared,
+        )
+        assert shared.totals["games"] == n_games
+        assert shared.totals["hands"] >= 2 * n_games